@@ -1,15 +1,77 @@
 import os
+import sys
 
-try:
-    __version__ = __import__('pkg_resources') \
-        .get_distribution(__name__).version
-except Exception as e:
-    __version__ = 'unknown'
+_VERSION = []
+
+
+def get_version():
+    """
+    Gets the version of the installed package, looked up once. It's slow \
+        with pkg_resources, so importlib.metadata is used when available.
+
+    :return: a string with the version or 'unknown'
+    """
+    if not _VERSION:
+        try:
+            try:
+                from importlib.metadata import version
+            except ImportError:
+                version = None
+            if version is not None:
+                _VERSION.append(version(__name__))
+            else:
+                _VERSION.append(__import__('pkg_resources')
+                                .get_distribution(__name__).version)
+        except Exception as e:
+            _VERSION.append('unknown')
+    return _VERSION[0]
+
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        """
+        Gets __version__ only when it's used, to import the package faster.
+        """
+        if name == '__version__':
+            return get_version()
+        raise AttributeError(
+            "module {!r} has no attribute {!r}".format(__name__, name)
+        )
+else:
+    __version__ = get_version()
 
 _ROOT = os.path.abspath(os.path.dirname(__file__))
 
+_DATA = {}
+
 
 def get_data(path):
+    """
+    Finds a data file of the package or of primestgplus. The files found \
+        are searched once by process, the ones not found every time, as \
+        they can be installed or decrypted later.
+
+    :param path: a string with the name of the file or a list with it
+    :return: a string with the path of the file or False if it's not found
+    """
+    key = tuple(path) if isinstance(path, list) else path
+    wsdl_path = _DATA.get(key)
+    if not wsdl_path:
+        wsdl_path = find_data(path)
+        if wsdl_path:
+            _DATA[key] = wsdl_path
+    return wsdl_path
+
+
+def find_data(path):
+    """
+    Searches a data file in the data directory of the package and, if \
+        it's not there, in the one of primestgplus, checking that it can \
+        be opened.
+
+    :param path: a string with the name of the file or a list with it
+    :return: a string with the path of the file or False if it's not found
+    """
     wsdl_path = False
 
     try:
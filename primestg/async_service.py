@@ -0,0 +1,214 @@
+# -*- coding: UTF-8 -*-
+import os
+from functools import partial
+from threading import Lock
+from timeit import default_timer
+
+try:
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    asyncio = None
+
+from primestg.service import WSDL, Service
+
+CONCURRENCY = 32
+"""
+Calls to the concentrators made at the same time by default, see \
+    get_executor.
+"""
+
+_EXECUTORS = {}
+"""
+Default executor of every process, see get_executor.
+"""
+
+_EXECUTORS_LOCK = Lock()
+
+STREAMING_METHODS = ('send_batches', 'fetch_report')
+"""
+Methods of Service whose results read from the connection while they are \
+    used, an iterator and a streamed Report, which would block the event \
+    loop. AsyncService doesn't give them.
+"""
+
+
+def get_asyncio():
+    """
+    Gets the asyncio module, only available in Python 3.
+
+    :return: the asyncio module
+    """
+    if asyncio is None:
+        raise ImportError('AsyncService needs asyncio (Python 3)')
+    return asyncio
+
+
+def get_executor():
+    """
+    Gets the default executor of the process, with CONCURRENCY threads.
+
+    :return: a ThreadPoolExecutor
+    """
+    get_asyncio()
+    key = os.getpid()
+    executor = _EXECUTORS.get(key)
+    if executor is None:
+        with _EXECUTORS_LOCK:
+            executor = _EXECUTORS.get(key)
+            if executor is None:
+                executor = _EXECUTORS[key] = ThreadPoolExecutor(CONCURRENCY)
+    return executor
+
+
+class Call(object):
+    """
+    A call to a concentrator running in an executor, awaitable from the \
+        event loop that awaits it.
+    """
+
+    def __init__(self, future, timeout=None):
+        """
+        Creates a Call object.
+
+        :param future: the concurrent.futures.Future of the call
+        :param timeout: the seconds to wait for the result since the call \
+            was made, without limit by default
+        :return: a Call object
+        """
+        self.future = future
+        self.timeout = timeout
+        self.start = default_timer()
+
+    def __await__(self):
+        """
+        Waits for the result of the call. If the waiting is cancelled or \
+            times out the call is cancelled too, unless it's running.
+
+        :return: an iterator of the event loop
+        """
+        result = asyncio.wrap_future(self.future)
+        if self.timeout is not None:
+            timeout = max(self.timeout - (default_timer() - self.start), 0)
+            result = asyncio.wait_for(result, timeout)
+        return result.__await__()
+
+    def cancel(self):
+        """
+        Cancels the call if it isn't running yet.
+
+        :return: True if it's cancelled
+        """
+        return self.future.cancel()
+
+
+class AsyncService(object):
+    """
+    Concentrator service for asyncio, with the methods of Service \
+        returning awaitables instead of blocking.
+
+    It isn't native asynchronous I/O: the calls are the blocking zeep \
+        calls of the Service, run in the threads of an executor, so the \
+        event loop isn't blocked while they wait. The number of threads \
+        bounds the calls made at the same time by \
+        all the services sharing it. The operation_timeout of every \
+        concentrator bounds the time of each call once started, and \
+        cancelling the awaitable drops the calls not started yet. The \
+        Service is created by the first call, in the executor too, as it \
+        may load the WSDL.
+    """
+
+    def __init__(self, fact_id, cnc_url, sync=True, source=None,
+                 priority=None, timeout=20, operation_timeout=60,
+                 session=None, wsdl=WSDL, executor=None):
+        """
+        Creates an AsyncService object.
+
+        :param fact_id: the request id, like the one of Service
+        :param cnc_url: a string with the URL of the concentrator
+        :param sync: if True the reports are asked synchronously
+        :param source: the source of the data, 'DCF' by default
+        :param priority: the priority of the requests
+        :param timeout: the seconds to wait loading the WSDL
+        :param operation_timeout: the seconds to wait for the answer of \
+            the concentrator
+        :param session: the requests Session of the calls, see \
+            primestg.service.get_session
+        :param wsdl: a string with the name of the WSDL file
+        :param executor: the executor of the calls, see get_executor
+        :return: an AsyncService object
+        """
+        get_asyncio()
+        self.fact_id = fact_id
+        self.cnc_url = cnc_url
+        self.executor = executor
+        self._service_kwargs = {
+            'sync': sync, 'source': source, 'priority': priority,
+            'timeout': timeout, 'operation_timeout': operation_timeout,
+            'session': session, 'wsdl': wsdl,
+        }
+        self._service = None
+        self._service_lock = Lock()
+
+    def get_service(self):
+        """
+        Gets the Service making the calls, creating it the first time. It \
+            blocks while the WSDL is loaded, it's called in the executor.
+
+        :return: a Service
+        """
+        if self._service is None:
+            with self._service_lock:
+                if self._service is None:
+                    self._service = Service(
+                        self.fact_id, self.cnc_url, **self._service_kwargs
+                    )
+        return self._service
+
+    def call(self, method, *args, **kwargs):
+        """
+        Calls a method of the Service in the executor.
+
+        :param method: a string with the name of the method, like \
+            'get_daily_absolute'
+        :param args: the arguments of the method
+        :param kwargs: the keyword arguments of the method, 'timeout' are \
+            the seconds to wait for the result, including the time waiting \
+            for a free thread. Without it, it's only bound by the \
+            operation_timeout
+        :raises ValueError: if the method is one of STREAMING_METHODS
+        :return: a Call, awaitable with the result of the method
+        """
+        if method in STREAMING_METHODS:
+            raise ValueError(
+                'Service.{} reads from the connection while its result is '
+                'used, it can\'t be called from asyncio'.format(method)
+            )
+        timeout = kwargs.pop('timeout', None)
+        executor = self.executor or get_executor()
+        future = executor.submit(self._call, method, args, kwargs)
+        return Call(future, timeout)
+
+    def _call(self, method, args, kwargs):
+        """
+        Calls a method of the Service, in the executor.
+
+        :param method: a string with the name of the method
+        :param args: a tuple with the arguments of the method
+        :param kwargs: a dict with the keyword arguments of the method
+        :return: the result of the method
+        """
+        return getattr(self.get_service(), method)(*args, **kwargs)
+
+    def __getattr__(self, name):
+        """
+        Gets the methods of the Service as methods calling them in the \
+            executor, see call. The STREAMING_METHODS aren't given.
+
+        :param name: a string with the name of the method
+        :return: the method
+        """
+        if (name.startswith('_') or name in STREAMING_METHODS or
+                not callable(getattr(Service, name, None))):
+            raise AttributeError(name)
+        return partial(self.call, name)
@@ -0,0 +1,6 @@
+# coding=utf-8
+from primestg.benchmark.generators import (
+    REPORT_TYPES, generate_report, write_report
+)
+from primestg.benchmark.runner import MODES, run_benchmark
+from primestg.benchmark.startup import measure_command, measure_startup
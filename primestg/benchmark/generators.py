@@ -0,0 +1,477 @@
+# coding=utf-8
+import gzip
+import os
+import random
+from datetime import datetime, timedelta
+
+import six
+
+
+START = datetime(2015, 9, 1)
+"""
+First day of the measures of the generated reports.
+"""
+
+CORRUPTION = '\x00\x00\x00\x00'
+"""
+Null chars appended to an attribute value to corrupt it, like the ones sent \
+    by some concentrators. They are deleted with the rest of the value when \
+    the report is read.
+"""
+
+
+def format_timestamp(value):
+    """
+    Formats a datetime like the timestamps of the reports, with the season.
+
+    :param value: a datetime
+    :return: a string like '20150901010000000S'
+    """
+    season = 'S' if 4 <= value.month <= 10 else 'W'
+    return '{}000{}'.format(value.strftime('%Y%m%d%H%M%S'), season)
+
+
+def concentrator_name(index):
+    """
+    Name of a generated concentrator.
+
+    :param index: the number of the concentrator
+    :return: a string with the name
+    """
+    return 'CIR{:010d}'.format(4621000000 + index)
+
+
+def meter_name(index):
+    """
+    Name of a generated meter.
+
+    :param index: the number of the meter
+    :return: a string with the name
+    """
+    return 'ZIV{:010d}'.format(34000000 + index)
+
+
+class Generator(object):
+    """
+    Generates the elements of a report with random values.
+
+    The lines of every measure set go through corrupt, which appends null \
+        chars to one of its attribute values with the probability given.
+    """
+
+    def __init__(self, seed=0, corrupt=0.0):
+        """
+        Creates a Generator object.
+
+        :param seed: the seed of the random values
+        :param corrupt: the probability of corrupting a measure set, from 0 \
+            to 1
+        """
+        self.random = random.Random(seed)
+        self.corrupt_probability = corrupt
+
+    def integer(self, maximum=20000):
+        """
+        A random integer for a measure.
+
+        :param maximum: the maximum integer
+        :return: a string with the integer
+        """
+        return str(self.random.randint(0, maximum))
+
+    def corrupt(self, line):
+        """
+        Corrupts a line of the XML, with the probability of the generator.
+
+        :param line: a string with an element with attributes
+        :return: the string with null chars in an attribute value or the \
+            same string
+        """
+        if not self.corrupt_probability:
+            return line
+        if self.random.random() >= self.corrupt_probability:
+            return line
+        quotes = [
+            index for index, char in enumerate(line) if char == '"'
+        ][1::2]
+        if not quotes:
+            return line
+        position = self.random.choice(quotes)
+        return line[:position] + CORRUPTION + line[position:]
+
+    def active_reactive(self, suffix=''):
+        """
+        Attributes of the active and reactive measures.
+
+        :param suffix: the suffix of the attributes, like 'a' or 'i'
+        :return: a string with the attributes
+        """
+        return ' '.join(
+            '{}{}="{}"'.format(name, suffix, self.integer())
+            for name in ('AI', 'AE', 'R1', 'R2', 'R3', 'R4')
+        )
+
+    def timestamps(self, day, measures):
+        """
+        Timestamps of the measures of a day, spread along the day.
+
+        :param day: the number of the day from START
+        :param measures: the number of measures of the day
+        :return: a list of strings with the timestamps
+        """
+        step = timedelta(seconds=24 * 3600 // max(measures, 1))
+        first = START + timedelta(days=day)
+        return [
+            format_timestamp(first + step * (number + 1))
+            for number in range(measures)
+        ]
+
+    def hourly(self, tag, day, measures):
+        """
+        Hourly measure sets of a day, like the ones of S02.
+
+        :param tag: a string with the name of the elements
+        :param day: the number of the day from START
+        :param measures: the number of hours
+        :return: a list of strings with the lines of the XML
+        """
+        return [
+            self.corrupt(
+                '<{} Fh="{}" Bc="00" {}/>'.format(
+                    tag, timestamp, self.active_reactive()
+                )
+            )
+            for timestamp in self.timestamps(day, measures)
+        ]
+
+    def S02(self, day, measures):
+        """
+        Measure sets of a meter of report S02 for a day.
+
+        :param day: the number of the day from START
+        :param measures: the number of hours
+        :return: a list of strings with the lines of the XML
+        """
+        return self.hourly('S02', day, measures)
+
+    def S04(self, day, measures):
+        """
+        Measure sets of a meter of report S04 for a day, a closure by \
+            period.
+
+        :param day: the number of the day from START
+        :param measures: the number of periods
+        :return: a list of strings with the lines of the XML
+        """
+        begin = format_timestamp(START + timedelta(days=day))
+        end = format_timestamp(START + timedelta(days=day + 1))
+        lines = []
+        for period in range(measures):
+            lines.extend([
+                self.corrupt(
+                    '<S04 Fhi="{}" Fhf="{}" Ctr="1" Pt="{}" Mx="{}" '
+                    'Fx="{}">'.format(
+                        begin, end, period, self.integer(1000), begin
+                    )
+                ),
+                '<Value {}/>'.format(self.active_reactive('a')),
+                '<Value {}/>'.format(self.active_reactive('i')),
+                '</S04>',
+            ])
+        return lines
+
+    def S05(self, day, measures):
+        """
+        Measure sets of a meter of report S05 for a day.
+
+        :param day: the number of the day from START
+        :param measures: the number of periods
+        :return: a list of strings with the lines of the XML
+        """
+        timestamp = format_timestamp(START + timedelta(days=day))
+        lines = []
+        for period in range(measures):
+            lines.extend([
+                '<S05 Fh="{}" Ctr="1" Pt="{}">'.format(timestamp, period),
+                self.corrupt(
+                    '<Value {}/>'.format(self.active_reactive('a'))
+                ),
+                '</S05>',
+            ])
+        return lines
+
+    def S09(self, day, measures):
+        """
+        Events of a meter of report S09 for a day.
+
+        :param day: the number of the day from START
+        :param measures: the number of events
+        :return: a list of strings with the lines of the XML
+        """
+        return [
+            self.corrupt(
+                '<S09 Fh="{}" Et="{}" C="{}">'.format(
+                    timestamp, self.random.randint(1, 6),
+                    self.random.randint(1, 20)
+                )
+            ) + '</S09>'
+            for timestamp in self.timestamps(day, measures)
+        ]
+
+    def S12(self, day, measures):
+        """
+        Parameters of a concentrator of report S12 for a day.
+
+        :param day: the number of the day from START
+        :param measures: the number of tasks
+        :return: a list of strings with the lines of the XML
+        """
+        timestamp = format_timestamp(START + timedelta(days=day))
+        lines = [self.corrupt(
+            '<S12 Fh="{}" Mod="SGE-PLC50" Af="2012" Te="concentrator" '
+            'Vf="0.8.7" VfComm="2223" Pro="ISDIP" Com="PLC" Bat="99" '
+            'ipCom="192.168.42.30" PortWS="8080" ipMask="255.255.255.0" '
+            'ipGtw="192.168.42.1" ipDhcp="N" Slave1="" Slave2="" Slave3="" '
+            'ipLoc="100.0.0.1" ipMaskLoc="255.255.255.0" '
+            'Macplc="00:80:E1:0F:1A:9D" Pse="38400" Priority="Y" IPstg="" '
+            'IPNTP="0.pool.ntp.org" IPftp="ftp.example.com" '
+            'FTPUserReport="telegestion" IPftpDCUpg="" '
+            'UserftpDCUpg="DCUPGRADE" IPftpMeterUpg="" '
+            'UserftpMeterUpg="CNTUPGRADE" RetryFtp="3" TimeBetwFtp="300" '
+            'IPftpCycles="" UserftpCycles="user" DestDirCycles="/" '
+            'SyncMeter="N" TimeOutMeterFwU="604800" TimeDev="30" '
+            'TimeDevOver="3600" ResetMsg="N" NumMeters="100" '
+            'TimeSendReq="0" TimeDisconMeter="86400" RetryDisconMeter="6" '
+            'TimeRetryInterval="7200" MeterRegData="010000600100FF02" '
+            'ReportFormat="0" S26Content="Pimp,AIa,L1v" '
+            'ValuesCheckDelay="30" MaxOrderOutdate="86400" '
+            'TimeDelayRestart="300" NTPMaxDeviation="30" '
+            'AccInacTimeout="30" AccSimulMax="10">'.format(timestamp)
+        )]
+        reports = ('S02', 'S04', 'S05', 'S12')
+        for task in range(measures):
+            lines.extend([
+                '<TP TpTar="{}" TpHi="{}" TpPer="00000001000000" '
+                'TpCompl="Y" TpMet="" TpPrio="2">'.format(
+                    task + 1, timestamp
+                ),
+                '<TpPro TpReq="{}" TpSend="Y" TpStore="Y">'.format(
+                    reports[task % len(reports)]
+                ),
+                '<TpAttr/>',
+                '</TpPro>',
+                '</TP>',
+            ])
+        lines.append('</S12>')
+        return lines
+
+    def _contract(self, number, measures, timestamp):
+        """
+        Lines of a contract of the calendars of report S23.
+
+        :param number: the number of the contract
+        :param measures: the number of tariff changes by day
+        :param timestamp: a string with the activation date
+        :return: a list of strings with the lines of the XML
+        """
+        lines = [
+            '<Contract c="{}" CalendarType="01" '
+            'CalendarName="322E30444841" ActDate="{}">'.format(
+                number, timestamp
+            ),
+            '<Season Name="01" Start="FFFF0101FF00000000800000" Week="02"/>',
+            '<Season Name="02" Start="FFFF03FE0700000000800080" Week="01"/>',
+            '<Week Name="01" Week="01010101010101"/>',
+            '<Week Name="02" Week="02020202020202"/>',
+        ]
+        for day in ('01', '02'):
+            lines.append('<Day id="{}">'.format(day))
+            for change in range(measures):
+                lines.append(
+                    '<Change Hour="{:02X}000000" TariffRate="000{}"/>'.format(
+                        change * 24 // max(measures, 1), change % 3 + 1
+                    )
+                )
+            lines.append('</Day>')
+        lines.extend([
+            '<SpecialDays DT="FFFF0101000000000W" DTCard="Y" DayID="02"/>',
+            '<SpecialDays DT="FFFF1225000000000W" DTCard="Y" DayID="02"/>',
+            '</Contract>',
+        ])
+        return lines
+
+    def S23(self, day, measures):
+        """
+        Contract of a meter of report S23 for a day.
+
+        :param day: the number of the day from START
+        :param measures: the number of tariff changes of every day of the \
+            calendars
+        :return: a list of strings with the lines of the XML
+        """
+        timestamp = format_timestamp(START + timedelta(days=day))
+        powers = ' '.join(
+            'TR{}="{}"'.format(period, self.integer(15000))
+            for period in range(1, 7)
+        )
+        lines = [
+            '<S23 Fh="{}">'.format(timestamp),
+            '<PCact ActDate="{}">'.format(timestamp),
+            self.corrupt('<Contrato1 {}/>'.format(powers)),
+            '</PCact>',
+            '<PCLatent ActDate="07E5060102000000FF800080">',
+            '<Contrato1 {}/>'.format(powers),
+            '</PCLatent>',
+        ]
+        for calendars in ('ActiveCalendars', 'LatentCalendars'):
+            lines.append('<{}>'.format(calendars))
+            for number in (1, 2, 3):
+                lines.extend(self._contract(number, measures, timestamp))
+            lines.append('</{}>'.format(calendars))
+        lines.append('</S23>')
+        return lines
+
+    def S52(self, day, measures):
+        """
+        Measure sets of a line supervisor of report S52 for a day.
+
+        :param day: the number of the day from START
+        :param measures: the number of hours
+        :return: a list of strings with the lines of the XML
+        """
+        return self.hourly('S52', day, measures)
+
+    def G02(self, day, measures):
+        """
+        Availability of a meter of report G02 for a day.
+
+        :param day: the number of the day from START
+        :param measures: unused, there is one by day
+        :return: a list of strings with the lines of the XML
+        """
+        timestamp = format_timestamp(START + timedelta(days=day))
+        atime = self.random.randint(1000, 1439)
+        return [self.corrupt(
+            '<G02 Fh="{}" Atime="{}" Nchanges="{}" Aconc="1439" '
+            'Atimeperc="{:.2f}"/>'.format(
+                timestamp, atime, self.random.randint(0, 10),
+                atime * 100.0 / 1439
+            )
+        )]
+
+
+REPORT_TYPES = {
+    'S02': {'version': '3.1.c', 'measures': 24},
+    'S04': {'version': '3.1.c', 'measures': 7},
+    'S05': {'version': '3.1.c', 'measures': 7},
+    'S09': {'version': '3.1.c', 'measures': 4},
+    'S12': {'version': '3.1.c', 'measures': 4},
+    'S23': {'version': '3.1.c', 'measures': 3},
+    'S52': {'version': '1.6-MRT', 'measures': 24},
+    'G02': {'version': '3.4', 'measures': 1},
+}
+"""
+Report types that can be generated, with their version and the default \
+    number of measures of a meter by day: hours for S02 and S52, periods \
+    for S04 and S05, events for S09, tasks of the concentrator for S12 and \
+    tariff changes by day of the calendars for S23.
+"""
+
+
+def generate_report(report_type, meters=10, days=1, measures=None,
+                    concentrators=1, corrupt=0.0, seed=0):
+    """
+    Generates a report with random values, like the ones uploaded by the \
+        concentrators.
+
+    S12 reports have a set of parameters by concentrator and day, without \
+        meters, and S52 reports have remote terminal units with line \
+        supervisors instead of concentrators with meters.
+
+    :param report_type: a string with the report type, see REPORT_TYPES
+    :param meters: the number of meters of every concentrator
+    :param days: the number of days with measures of every meter
+    :param measures: the number of measures of a meter by day, the default \
+        of the report type by default
+    :param concentrators: the number of concentrators
+    :param corrupt: the probability of corrupting a measure set with null \
+        chars, from 0 to 1
+    :param seed: the seed of the random values
+    :return: bytes with the XML of the report
+    """
+    if report_type not in REPORT_TYPES:
+        raise ValueError('Report type {} not supported'.format(report_type))
+    specification = REPORT_TYPES[report_type]
+    if measures is None:
+        measures = specification['measures']
+    generator = Generator(seed, corrupt)
+    measure_sets = getattr(generator, report_type)
+    if report_type == 'S52':
+        concentrator_tag, meter_tag = 'Rtu', 'LVSLine'
+        meter_attributes = ' Magn="1" Pos="02"'
+    else:
+        concentrator_tag, meter_tag = 'Cnc', 'Cnt'
+        meter_attributes = ' Magn="1"' if report_type == 'S02' else ''
+
+    lines = ['<Report IdRpt="{}" IdPet="0" Version="{}">'.format(
+        report_type, specification['version']
+    )]
+    for concentrator in range(concentrators):
+        lines.append('<{} Id="{}">'.format(
+            concentrator_tag, concentrator_name(concentrator)
+        ))
+        if report_type == 'S12':
+            for day in range(days):
+                lines.extend(measure_sets(day, measures))
+        else:
+            for meter in range(meters):
+                lines.append('<{} Id="{}"{}>'.format(
+                    meter_tag, meter_name(concentrator * meters + meter),
+                    meter_attributes
+                ))
+                for day in range(days):
+                    lines.extend(measure_sets(day, measures))
+                lines.append('</{}>'.format(meter_tag))
+        lines.append('</{}>'.format(concentrator_tag))
+    lines.append('</Report>')
+    content = '\n'.join(lines)
+    if isinstance(content, six.text_type):
+        content = content.encode('iso-8859-15')
+    return content
+
+
+def report_filename(report_type, compress=False):
+    """
+    Name of a generated report file, following the concentrators \
+        convention so the report type can be found from it.
+
+    :param report_type: a string with the report type
+    :param compress: if True the name ends with .gz
+    :return: a string with the name of the file
+    """
+    filename = '{}_0_{}_0_{}'.format(
+        concentrator_name(0), report_type, START.strftime('%Y%m%d%H%M%S')
+    )
+    if compress:
+        filename += '.gz'
+    return filename
+
+
+def write_report(filename, report_type, compress=False, **kwargs):
+    """
+    Generates a report and writes it to a file.
+
+    :param filename: a string with the name of the file
+    :param report_type: a string with the report type
+    :param compress: if True the file is gzipped
+    :param kwargs: the arguments of generate_report
+    :return: the number of bytes written
+    """
+    content = generate_report(report_type, **kwargs)
+    if compress:
+        with gzip.GzipFile(filename, 'wb') as report_file:
+            report_file.write(content)
+    else:
+        with open(filename, 'wb') as report_file:
+            report_file.write(content)
+    return os.path.getsize(filename)
@@ -0,0 +1,275 @@
+# coding=utf-8
+import os
+import shutil
+import sys
+import tempfile
+from multiprocessing import Pool
+from timeit import default_timer
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from primestg.benchmark.generators import (
+    REPORT_TYPES, report_filename, write_report
+)
+from primestg.report.instrumentation import Instrumentation
+from primestg.report.reports import Report
+
+
+def get_values(report):
+    """
+    Reads the values of a report at once.
+
+    :param report: a Report object
+    :return: the number of rows read
+    """
+    return len(report.values)
+
+
+def iter_values(report):
+    """
+    Iterates over the values of a report, without keeping them.
+
+    :param report: a Report object
+    :return: the number of rows read
+    """
+    rows = 0
+    for value in report.iter_values():
+        rows += 1
+    return rows
+
+
+def parse(report):
+    """
+    Reads the values, the warnings and the errors of a report.
+
+    :param report: a Report object
+    :return: the number of rows read
+    """
+    return len(report.parse().values)
+
+
+def get_columns(report):
+    """
+    Reads the values of a report by columns.
+
+    :param report: a Report object
+    :return: the number of rows read
+    """
+    return len(report.to_columns()['meter'])
+
+
+FIELDS = {
+    'S02': ['name', 'timestamp', 'ai', 'ae'],
+    'S04': ['name', 'date_begin', 'period', 'ai', 'ae'],
+    'S05': ['name', 'date_begin', 'period', 'ai', 'ae'],
+    'S09': ['name', 'timestamp', 'event_code'],
+    'S52': ['name', 'timestamp', 'ai', 'ae'],
+    'G02': ['name', 'timestamp', 'atime'],
+}
+"""
+Keys read by the fields mode, by report type.
+"""
+
+MODES = {
+    'values': ({}, get_values),
+    'etree': ({'parser': 'etree'}, get_values),
+    'records': ({'records': True}, get_values),
+    'fields': ({}, get_values),
+    'stream': ({'stream': True}, iter_values),
+    'parse': ({}, parse),
+    'columns': ({}, get_columns),
+    'instrumented': ({}, get_values),
+}
+"""
+Ways of reading a report by name: the arguments of the Report and the \
+    function that reads the values. The fields mode reads the FIELDS of \
+    the report type, the columns mode needs NumPy and the instrumented mode \
+    gives the measures of an Instrumentation too.
+"""
+
+MODE_REPORT_TYPES = {
+    'fields': tuple(FIELDS),
+    'columns': ('S02', 'G02'),
+}
+"""
+Report types supported by the modes that don't support all of them.
+"""
+
+
+def get_peak_rss():
+    """
+    Peak resident memory of this process.
+
+    :return: the kilobytes of the peak resident memory or None if it can't \
+        be known in this platform
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak //= 1024
+    return peak
+
+
+def get_cpu_time():
+    """
+    CPU time used by this process.
+
+    :return: the seconds of user and system time
+    """
+    times = os.times()
+    return times[0] + times[1]
+
+
+def run_case(case):
+    """
+    Reads a report file in a mode and measures it.
+
+    The time is taken by stage: 'parse' creates the Report, which parses \
+        the XML unless it's streamed, and 'values' reads the values. With \
+        more than one repetition the best time of every stage is kept.
+
+    :param case: a dict with the 'filename', the 'report_type', the \
+        'mode' and the number of times to 'repeat' it
+    :return: the dict of the case updated with the 'rows', the 'stages' \
+        and total 'seconds', the 'cpu_seconds', the 'rows_per_second', the \
+        'base_rss_kb' and 'peak_rss_kb' memory and the 'error' found, if \
+        any. The instrumented mode adds the 'instrumentation' stages of the \
+        last repetition, see Instrumentation.as_dict
+    """
+    result = dict(case)
+    options, read = MODES[case['mode']]
+    options = dict(options)
+    if case['mode'] == 'fields':
+        options['fields'] = FIELDS[case['report_type']]
+    result.update({
+        'rows': None,
+        'stages': {},
+        'seconds': None,
+        'cpu_seconds': None,
+        'rows_per_second': None,
+        'base_rss_kb': get_peak_rss(),
+        'peak_rss_kb': None,
+        'error': None,
+    })
+    stages = {}
+    cpu = None
+    try:
+        for repetition in range(case.get('repeat', 1)):
+            if case['mode'] == 'instrumented':
+                instrumentation = Instrumentation()
+                options['instrumentation'] = instrumentation
+            start_cpu = get_cpu_time()
+            start = default_timer()
+            with open(case['filename'], 'rb') as report_file:
+                report = Report(report_file, **options)
+                parsed = default_timer()
+                rows = read(report)
+            end = default_timer()
+            spent = get_cpu_time() - start_cpu
+            del report
+            for stage, seconds in (('parse', parsed - start),
+                                   ('values', end - parsed)):
+                stages[stage] = min(stages.get(stage, seconds), seconds)
+            cpu = spent if cpu is None else min(cpu, spent)
+    except Exception as e:
+        result['error'] = '{}: {}'.format(type(e).__name__, e)
+        return result
+    seconds = stages['parse'] + stages['values']
+    result.update({
+        'rows': rows,
+        'stages': stages,
+        'seconds': seconds,
+        'cpu_seconds': cpu,
+        'rows_per_second': rows / seconds if seconds else None,
+        'peak_rss_kb': get_peak_rss(),
+    })
+    if case['mode'] == 'instrumented':
+        result['instrumentation'] = instrumentation.as_dict().get(
+            case['report_type'], {}
+        )
+    return result
+
+
+def run_benchmark(report_types=None, modes=None, meters=100, days=1,
+                  measures=None, concentrators=1, compress=False,
+                  corrupt=0.0, repeat=1, isolate=True, directory=None):
+    """
+    Generates a report file of every report type and reads it in every \
+        mode, see generate_report and MODES.
+
+    :param report_types: a list with the report types, all the ones of \
+        REPORT_TYPES by default
+    :param modes: a list with the names of the modes, all of them by \
+        default. The report types not supported by a mode are skipped
+    :param meters: the number of meters of every concentrator
+    :param days: the number of days with measures of every meter
+    :param measures: the number of measures of a meter by day, the default \
+        of the report type by default
+    :param concentrators: the number of concentrators
+    :param compress: if True the report files are gzipped
+    :param corrupt: the probability of corrupting a measure set with null \
+        chars, from 0 to 1
+    :param repeat: the number of times every case is read
+    :param isolate: if True every case is read in a new process, so the \
+        peak memory is the one of the case
+    :param directory: a string with the directory of the report files, \
+        a temporary one removed afterwards by default
+    :return: an iterator over dicts with the results of every case, see \
+        run_case, with the 'size' of the file and the seconds to \
+        'generate' it too
+    """
+    if report_types is None:
+        report_types = sorted(REPORT_TYPES)
+    if modes is None:
+        modes = sorted(MODES)
+    temporary = directory is None
+    if temporary:
+        directory = tempfile.mkdtemp(prefix='primestg_benchmark_')
+    try:
+        for report_type in report_types:
+            filename = os.path.join(
+                directory, report_filename(report_type, compress)
+            )
+            start = default_timer()
+            size = write_report(
+                filename, report_type, compress=compress, meters=meters,
+                days=days, measures=measures, concentrators=concentrators,
+                corrupt=corrupt
+            )
+            generated = default_timer() - start
+            for mode in modes:
+                if report_type not in MODE_REPORT_TYPES.get(
+                        mode, (report_type,)):
+                    continue
+                case = {
+                    'report_type': report_type,
+                    'mode': mode,
+                    'filename': filename,
+                    'size': size,
+                    'generate': generated,
+                    'meters': meters,
+                    'days': days,
+                    'measures': measures or REPORT_TYPES[report_type][
+                        'measures'],
+                    'concentrators': concentrators,
+                    'compress': compress,
+                    'corrupt': corrupt,
+                    'repeat': repeat,
+                }
+                if isolate:
+                    pool = Pool(1)
+                    try:
+                        result = pool.apply(run_case, (case,))
+                    finally:
+                        pool.terminate()
+                        pool.join()
+                else:
+                    result = run_case(case)
+                yield result
+    finally:
+        if temporary:
+            shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,122 @@
+# coding=utf-8
+import subprocess
+import sys
+from timeit import default_timer
+
+CLI_MODULE = 'primestg.cli'
+"""
+Module of the command line interface, run by every command.
+"""
+
+
+def get_commands():
+    """
+    Gets the names of the commands of the command line interface, as \
+        registered in its click group.
+
+    :return: a list of strings with the names of the commands
+    """
+    from primestg.cli import primestg
+    return sorted(primestg.commands)
+
+
+def get_import_seconds(output):
+    """
+    Adds up the time of the imports of an interpreter run with \
+        -X importtime, the cumulative time of the modules imported at the \
+        top level, by the interpreter when it starts and by the script.
+
+    :param output: a string with the standard error of the interpreter
+    :return: the seconds importing modules and the number of modules \
+        imported, None and 0 if the interpreter doesn't report the imports
+    """
+    microseconds = None
+    modules = 0
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        modules += 1
+        # The modules imported by other modules are indented
+        if not fields[2].startswith('  '):
+            microseconds = (microseconds or 0) + int(fields[1])
+    if microseconds is None:
+        return None, modules
+    return microseconds / 1000000.0, modules
+
+
+def measure_command(arguments, repeat=3, python=None):
+    """
+    Measures the time to run the command line interface with some \
+        arguments in a new interpreter, with -X importtime to measure its \
+        imports too.
+
+    :param arguments: a list of strings with the arguments, like \
+        ['templates', '--help']
+    :param repeat: the number of times it's run, every time in a new \
+        interpreter, the best time is kept
+    :param python: a string with the Python interpreter, this one by default
+    :return: a dict with the 'seconds' importing modules (None if the \
+        interpreter can't report them), the number of 'modules' imported, \
+        the 'total_seconds' of the interpreter, starting it too, and the \
+        'error' found, if any
+    """
+    command = [python or sys.executable, '-X', 'importtime', '-m',
+               CLI_MODULE] + list(arguments)
+    result = {
+        'seconds': None, 'modules': 0, 'total_seconds': None, 'error': None
+    }
+    for repetition in range(repeat):
+        start = default_timer()
+        process = subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        output, errors = process.communicate()
+        total = default_timer() - start
+        errors = errors.decode('utf-8', 'replace')
+        if process.returncode:
+            lines = [
+                line for line in errors.strip().splitlines()
+                if not line.startswith('import time:')
+            ]
+            result['error'] = lines[-1] if lines else 'Exit code {}'.format(
+                process.returncode
+            )
+            return result
+        seconds, modules = get_import_seconds(errors)
+        result['modules'] = modules
+        for key, value in (('seconds', seconds), ('total_seconds', total)):
+            if value is None:
+                continue
+            if result[key] is None or value < result[key]:
+                result[key] = value
+    return result
+
+
+def measure_startup(commands=None, repeat=3, python=None):
+    """
+    Measures the time to start every command of the command line \
+        interface, running it with --help, which loads the interface and \
+        the options of the command without running it. '--help' alone \
+        measures the interface.
+
+    :param commands: a list with the names of the commands, '--help' and \
+        all of them by default, see get_commands
+    :param repeat: the number of times every command is started, the best \
+        time is kept
+    :param python: a string with the Python interpreter, this one by default
+    :return: an iterator over dicts with the 'command', its 'arguments' and \
+        the times of measure_command
+    """
+    if commands is None:
+        commands = ['--help'] + get_commands()
+    for command in commands:
+        if command == '--help':
+            arguments = ['--help']
+        else:
+            arguments = [command, '--help']
+        result = {'command': command, 'arguments': arguments}
+        result.update(measure_command(arguments, repeat, python))
+        yield result
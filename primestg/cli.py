@@ -1,19 +1,16 @@
 ## -*- encoding: utf-8 -*-
 from __future__ import absolute_import
-import sys                                                                      
+import sys
 import click
 from datetime import datetime, timedelta
 from pytz import timezone
-from primestg.ziv_service import ZivService
 import base64
-from primestg.cycle.cycles import CycleFile
+import json
 
-TZ = timezone('Europe/Madrid')
+# The modules of the commands are imported when they are invoked, so the
+# CLI starts fast, see primestg.benchmark.startup
 
-from primestg.service import Service, format_timestamp
-from primestg.contract_templates import CONTRACT_TEMPLATES
-from primestg.utils import DLMSTemplates
-import json
+TZ = timezone('Europe/Madrid')
 
 REPORTS = [
     'get_instant_data',
@@ -71,6 +68,7 @@ def primestg(**kwargs):
 @click.option("--meter", "-m", default="ZIV0040318130")
 def get_sync_report(**kwargs):
     """Gets sync report"""
+    from primestg.service import Service
     id_pet = get_id_pet()
     s = Service(id_pet, kwargs['cnc_url'], sync=True)
     func = getattr(s, kwargs['report_name'])
@@ -94,6 +92,7 @@ def get_sync_report(**kwargs):
 )
 def get_sync_sxx(**kwargs):
    """Get raw Sxx report"""
+   from primestg.service import Service
    sync = not kwargs['async']
    id_pet = get_id_pet()
    s = Service(id_pet, kwargs['cnc_url'], sync=sync, source='DCF')
@@ -119,6 +118,7 @@ def get_sync_sxx(**kwargs):
 @click.option("--ip", "-i", default="10.26.0.4", help='IP i.e CNC FTPIp')
 def sends_order(**kwargs):
    """Sends one of available Orders to Meter or CNC"""
+   from primestg.service import Service, format_timestamp
    id_pet = get_id_pet()
    s = Service(id_pet, kwargs['cnc_url'], sync=True)
    order_name = kwargs['order']
@@ -206,6 +206,7 @@ def sends_order(**kwargs):
 @click.option("--meter", "-m", default="@ZIV0004394488")
 def cnc_control(**kwargs):
    """Sends a TXX order to CNC"""
+   from primestg.service import Service, format_timestamp
    id_pet = get_id_pet()
    s = Service(id_pet, kwargs['cnc_url'], sync=True)
    meter_name, cnc_name = get_meter_cnc_name(kwargs['meter'])
@@ -229,6 +230,7 @@ def cnc_control(**kwargs):
 @primestg.command(name='templates')
 def get_contract_templates(**kwargs):
     """Available contract templates for B04 order"""
+    from primestg.contract_templates import CONTRACT_TEMPLATES
     print('# Available contract templates for B04 order:\n')
     for name in sorted(CONTRACT_TEMPLATES.keys()):
         data = CONTRACT_TEMPLATES[name]
@@ -238,6 +240,7 @@ def get_contract_templates(**kwargs):
 @primestg.command(name='dlms_cycles')
 def get_dlms_cycles(**kwargs):
     """Available DLMS cycles for B12 a.k.a dlms order"""
+    from primestg.utils import DLMSTemplates
     print('# Available DLMS cycles for B12 a.k.a dlms order:\n')
     dt = DLMSTemplates()
     templates = dt.get_available_templates()
@@ -253,6 +256,7 @@ def get_dlms_cycles(**kwargs):
 @click.argument('password',required=True)
 def send_ziv_cycle(**kwargs):
     """Sends a cycle to a ZIV CNC"""
+    from primestg.ziv_service import ZivService
     zs = ZivService(kwargs['cnc_url'], user=kwargs['user'], password=kwargs['password'], sync=True)
     content = base64.b64encode(open(kwargs['filename'],'rb').read())
     result = zs.send_cycle(filename=kwargs['filename'], cycle_filedata=content)
@@ -262,8 +266,133 @@ def send_ziv_cycle(**kwargs):
 @click.argument('filename', required=True)
 def parse_cycle(**kwargs):
     """Prints dict with cycle data from CNC csv"""
+    from primestg.cycle.cycles import CycleFile
     c = CycleFile(path=kwargs['filename'])
     print(json.dumps(c.data, indent=4, default=str))
 
-if __name__ == 'main':
+@primestg.command(name='parse_reports')
+@click.argument('paths', nargs=-1, required=True)
+@click.option("--report-type", "-r", multiple=True,
+              help='Only reads the reports of this type (i.e S02), '
+                   'can be repeated')
+@click.option("--workers", "-w", type=int, default=None,
+              help='Number of processes, the number of CPUs by default')
+@click.option("--chunk-size", "-c", type=int, default=1,
+              help='Number of files sent to a process at once')
+@click.option("--unordered", "-u", is_flag=True,
+              help='Prints the results as soon as they are read')
+@click.option("--parser", "-p", type=click.Choice(['objectify', 'etree']),
+              default='objectify')
+@click.option("--field", "-f", multiple=True,
+              help='Only prints this key of the values (i.e ai), '
+                   'can be repeated')
+def parse_reports(**kwargs):
+    """Prints a JSON line with the values of every report file found in the directories or glob patterns"""
+    from primestg.report.bulk import read_reports
+    results = read_reports(
+        kwargs['paths'],
+        report_types=kwargs['report_type'] or None,
+        workers=kwargs['workers'],
+        chunksize=kwargs['chunk_size'],
+        ordered=not kwargs['unordered'],
+        parser=kwargs['parser'],
+        fields=kwargs['field'] or None,
+    )
+    for result in results:
+        print(json.dumps(result, default=str))
+
+@primestg.command(name='ingest_reports')
+@click.argument('paths', nargs=-1, required=True)
+@click.option("--index", "-i", required=True,
+              help='SQLite file with the reports and timestamps ingested')
+@click.option("--report-type", "-r", multiple=True,
+              help='Only reads the reports of this type (i.e S02), '
+                   'can be repeated')
+@click.option("--parser", "-p", type=click.Choice(['objectify', 'etree']),
+              default='objectify')
+@click.option("--field", "-f", multiple=True,
+              help='Only prints this key of the values (i.e ai), '
+                   'can be repeated')
+def ingest(**kwargs):
+    """Prints a JSON line with the new values of every report file not ingested yet"""
+    from primestg.report.ingest import IngestionIndex, ingest_reports
+    index = IngestionIndex(kwargs['index'])
+    try:
+        results = ingest_reports(
+            kwargs['paths'],
+            index,
+            report_types=kwargs['report_type'] or None,
+            parser=kwargs['parser'],
+            fields=kwargs['field'] or None,
+        )
+        for result in results:
+            print(json.dumps(result, default=str))
+    finally:
+        index.close()
+
+@primestg.command(name='benchmark')
+@click.option("--report-type", "-r", multiple=True,
+              help='Only benchmarks this report type (i.e S02), '
+                   'can be repeated')
+@click.option("--mode", "-m", multiple=True,
+              help='Only reads the reports this way (i.e values), '
+                   'can be repeated')
+@click.option("--meters", type=int, default=100,
+              help='Number of meters of every concentrator')
+@click.option("--days", type=int, default=1,
+              help='Number of days with measures of every meter')
+@click.option("--measures", type=int, default=None,
+              help='Number of measures of a meter by day')
+@click.option("--concentrators", type=int, default=1,
+              help='Number of concentrators')
+@click.option("--gzip", "-z", is_flag=True, help='Gzips the report files')
+@click.option("--corrupt", type=float, default=0.0,
+              help='Probability of a measure set with null chars, from 0 to 1')
+@click.option("--repeat", type=int, default=1,
+              help='Reads every report this number of times, keeps the best')
+def benchmark(**kwargs):
+    """Prints a JSON line with the time and memory used reading generated reports"""
+    from primestg.benchmark import REPORT_TYPES, MODES, run_benchmark
+    for name, values, choices in (('report-type', kwargs['report_type'],
+                                   REPORT_TYPES),
+                                  ('mode', kwargs['mode'], MODES)):
+        for value in values:
+            if value not in choices:
+                raise click.BadParameter(
+                    '{} is not one of {}'.format(value, ', '.join(
+                        sorted(choices))),
+                    param_hint='--{}'.format(name)
+                )
+    results = run_benchmark(
+        report_types=kwargs['report_type'] or None,
+        modes=kwargs['mode'] or None,
+        meters=kwargs['meters'],
+        days=kwargs['days'],
+        measures=kwargs['measures'],
+        concentrators=kwargs['concentrators'],
+        compress=kwargs['gzip'],
+        corrupt=kwargs['corrupt'],
+        repeat=kwargs['repeat'],
+    )
+    for result in results:
+        del result['filename']
+        print(json.dumps(result, default=str))
+
+@primestg.command(name='benchmark_startup')
+@click.option("--command", "-c", multiple=True,
+              help='Only measures this command (i.e templates), '
+                   'can be repeated')
+@click.option("--repeat", type=int, default=3,
+              help='Starts every command this number of times, keeps the best')
+def benchmark_startup(**kwargs):
+    """Prints a JSON line with the time to start every command"""
+    from primestg.benchmark import measure_startup
+    results = measure_startup(
+        commands=kwargs['command'] or None,
+        repeat=kwargs['repeat'],
+    )
+    for result in results:
+        print(json.dumps(result))
+
+if __name__ == '__main__':
     primestg()
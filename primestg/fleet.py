@@ -0,0 +1,224 @@
+# -*- coding: UTF-8 -*-
+import threading
+from bisect import insort
+from itertools import count
+from timeit import default_timer
+
+from requests.exceptions import RequestException
+from six.moves import queue
+from six.moves.urllib.parse import urlparse
+from zeep.exceptions import TransportError
+
+from primestg.service import Service
+from primestg.utils import PRIORITY_HIGH
+
+RETRY_ERRORS = (RequestException, TransportError)
+"""
+Errors of the calls to a concentrator that are retried: the ones \
+    connecting to it or of its HTTP answer, not the SOAP faults.
+"""
+
+
+def get_host(cnc_url):
+    """
+    Gets the host of a concentrator, the calls to the same host are \
+        limited, see FleetScheduler.
+
+    :param cnc_url: a string with the URL of the concentrator
+    :return: a string with the host and port
+    """
+    return urlparse(cnc_url).netloc or cnc_url
+
+
+class FleetScheduler(object):
+    """
+    Asks for reports to many concentrators at once with a pool of threads.
+
+    The requests are made by priority (PRIORITY_VERYHIGH first) and in the \
+        order they were added, with a limit of calls at the same time to \
+        every host. The ones failing with RETRY_ERRORS are retried after \
+        an exponential backoff, and the results are given as soon as they \
+        are ready.
+    """
+
+    def __init__(self, workers=16, per_host=1, retries=2, backoff=1.0,
+                 retry_errors=RETRY_ERRORS, **service_kwargs):
+        """
+        Creates a FleetScheduler object.
+
+        :param workers: the number of threads, the calls made at the same \
+            time
+        :param per_host: the calls made at the same time to the same host
+        :param retries: the number of times a failed call is retried
+        :param backoff: the seconds to wait before the first retry, doubled \
+            on every retry
+        :param retry_errors: a tuple with the exceptions retried
+        :param service_kwargs: the keyword arguments of the Service of \
+            every concentrator, like the operation_timeout
+        :return: a FleetScheduler object
+        """
+        self.workers = workers
+        self.per_host = per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.retry_errors = retry_errors
+        self.service_kwargs = service_kwargs
+        self._tasks = []
+        self._sequence = count()
+
+    def add(self, cnc_url, report_id, meters='', date_from='', date_to='',
+            fact_id=0, priority=PRIORITY_HIGH):
+        """
+        Adds a request of a report to a concentrator, see Service.send.
+
+        :param cnc_url: a string with the URL of the concentrator
+        :param report_id: a string with the report code, like 'S05'
+        :param meters: a string with the meters, all of them by default
+        :param date_from: a string with the first date, see \
+            primestg.service.format_timestamp
+        :param date_to: a string with the last date
+        :param fact_id: the request id
+        :param priority: the priority of the request, PRIORITY_VERYHIGH, \
+            PRIORITY_HIGH or PRIORITY_NORMAL
+        """
+        task = {
+            'cnc_url': cnc_url,
+            'report_id': report_id,
+            'meters': meters,
+            'date_from': date_from,
+            'date_to': date_to,
+            'fact_id': fact_id,
+            'priority': priority,
+            'attempts': 0,
+            'ready': 0.0,
+        }
+        insort(self._tasks, (priority, next(self._sequence), task))
+
+    def add_all(self, cnc_urls, report_id, date_from='', date_to='',
+                fact_id=0, priority=PRIORITY_HIGH):
+        """
+        Adds a request of a report of all the meters of some concentrators.
+
+        :param cnc_urls: a list of strings with the URLs of the concentrators
+        :param report_id: a string with the report code, like 'S05'
+        :param date_from: a string with the first date
+        :param date_to: a string with the last date
+        :param fact_id: the request id
+        :param priority: the priority of the requests
+        """
+        for cnc_url in cnc_urls:
+            self.add(
+                cnc_url, report_id, '', date_from, date_to, fact_id, priority
+            )
+
+    def send(self, task):
+        """
+        Makes the request of a task.
+
+        :param task: a dict with the request, see add
+        :return: the result of Service.send
+        """
+        service = Service(
+            task['fact_id'], task['cnc_url'], priority=task['priority'],
+            **self.service_kwargs
+        )
+        return service.send(
+            task['report_id'], task['meters'], task['date_from'],
+            task['date_to']
+        )
+
+    def run(self):
+        """
+        Makes the requests added, removing them.
+
+        :return: an iterator over dicts with the 'cnc_url', the \
+            'report_id', the 'meters', the 'fact_id', the 'priority', the \
+            'result' of Service.send, the 'error' of the last attempt, if \
+            any, the number of 'attempts' and the 'seconds' of the last one, \
+            as soon as every request is done
+        """
+        tasks, self._tasks = self._tasks, []
+        pending = len(tasks)
+        if not pending:
+            return
+        condition = threading.Condition()
+        state = {'active': {}, 'left': pending}
+        results = queue.Queue()
+
+        def next_task():
+            # Called with the condition held, the best task ready whose host
+            # isn't busy or the seconds to wait for one
+            now = default_timer()
+            wait = None
+            for entry in tasks:
+                task = entry[2]
+                host = get_host(task['cnc_url'])
+                if state['active'].get(host, 0) >= self.per_host:
+                    continue
+                if task['ready'] > now:
+                    delay = task['ready'] - now
+                    wait = delay if wait is None else min(wait, delay)
+                    continue
+                tasks.remove(entry)
+                state['active'][host] = state['active'].get(host, 0) + 1
+                return entry, None
+            return None, wait
+
+        def work():
+            while True:
+                with condition:
+                    entry, wait = next_task()
+                    while entry is None:
+                        if not state['left']:
+                            return
+                        condition.wait(wait)
+                        entry, wait = next_task()
+                task = entry[2]
+                task['attempts'] += 1
+                start = default_timer()
+                result, error, retry = None, None, False
+                try:
+                    result = self.send(task)
+                except self.retry_errors as e:
+                    error = e
+                    retry = task['attempts'] <= self.retries
+                except Exception as e:
+                    error = e
+                seconds = default_timer() - start
+                with condition:
+                    host = get_host(task['cnc_url'])
+                    state['active'][host] -= 1
+                    if retry:
+                        task['ready'] = default_timer() + (
+                            self.backoff * 2 ** (task['attempts'] - 1)
+                        )
+                        insort(tasks, entry)
+                    else:
+                        state['left'] -= 1
+                    condition.notify_all()
+                if not retry:
+                    results.put({
+                        'cnc_url': task['cnc_url'],
+                        'report_id': task['report_id'],
+                        'meters': task['meters'],
+                        'fact_id': task['fact_id'],
+                        'priority': task['priority'],
+                        'result': result,
+                        'error': error and '{}: {}'.format(
+                            type(error).__name__, error
+                        ),
+                        'attempts': task['attempts'],
+                        'seconds': seconds,
+                    })
+
+        threads = [
+            threading.Thread(target=work)
+            for index in range(min(self.workers, pending))
+        ]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for index in range(pending):
+            yield results.get()
+        for thread in threads:
+            thread.join()
@@ -1,9 +1,12 @@
 import re
+import mmap
 
-from lxml.etree import XMLSyntaxError
-from lxml.objectify import fromstring
+from lxml.etree import XMLSyntaxError, XMLPullParser, XMLParser
+from lxml.etree import fromstring as etree_fromstring
+from lxml.objectify import fromstring, makeparser, ObjectifyElementClassLookup
 import binascii
 import zlib
+from timeit import default_timer
 import six
 
 
@@ -19,23 +22,270 @@ def is_gziped(content):
     return res
 
 
+ETREE_PARSER = XMLParser(remove_blank_text=True)
+
+
+PARSERS = {
+    'objectify': fromstring,
+    'etree': lambda text: etree_fromstring(text, ETREE_PARSER),
+}
+"""
+Functions to parse the XML by parser name. The objectify parser builds \
+    lxml.objectify elements, the etree parser builds plain lxml.etree \
+    elements, which are faster to build and to walk through.
+"""
+
+ENCODING = 'iso-8859-15'
+"""
+Encoding of the reports, it overrides the one declared in the XML.
+"""
+
+CHUNK_SIZE = 64 * 1024
+"""
+Size of the chunks read from the source when parsing incrementally.
+"""
+
+
+NULL_CHARS = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F].*?"')
+"""
+From a null (or control) char until the next double quote, which is \
+    deleted to fix the XML.
+"""
+
+NULL_CHARS_BYTES = re.compile(br'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F].*?"')
+"""
+Like NULL_CHARS, for the XML as bytes in the report encoding.
+"""
+
+
+def make_parser(parser, recover=False):
+    """
+    Builds a new parser to feed with the bytes of a XML, which gives the \
+        same elements as the functions of PARSERS.
+
+    :param parser: the name of the parser, 'objectify' or 'etree'
+    :param recover: if True the parser tries to go on after errors
+    :return: an lxml parser
+    """
+    if parser == 'objectify':
+        return makeparser(
+            remove_blank_text=True, encoding=ENCODING, recover=recover
+        )
+    return XMLParser(
+        remove_blank_text=True, encoding=ENCODING, recover=recover
+    )
+
+
+def delete_null_chars(content):
+    """
+    Deletes everything from every null char until the next double quote \
+        char, which usually is the end of the attribute value with the null \
+        chars.
+
+    :param content: bytes or a string with the XML
+    :return: a tuple with the fixed XML and a list of tuples with the \
+        offset and length of every deleted part
+    """
+    if isinstance(content, six.binary_type):
+        null_chars, quote = NULL_CHARS_BYTES, b'"'
+    else:
+        null_chars, quote = NULL_CHARS, u'"'
+    deleted = []
+
+    def replace(match):
+        deleted.append((match.start(), match.end() - match.start() - 1))
+        return quote
+
+    return null_chars.sub(replace, content), deleted
+
+
+def is_binary_file(value):
+    """
+    Checks if a file object gives bytes.
+
+    :param value: a file object
+    :return: True if the file object reads bytes
+    """
+    return isinstance(value.read(0), six.binary_type)
+
+
+def is_seekable(value):
+    """
+    Checks if a file object can go back to a position.
+
+    :param value: a file object
+    :return: True if the file object is seekable
+    """
+    if hasattr(value, 'seekable'):
+        return value.seekable()
+    return hasattr(value, 'seek')
+
+
+class RecordingReader(object):
+    """
+    A file object reading from another one that can't go back, like a \
+        network stream, keeping what is read so the content can be read \
+        again from the start, see replay.
+    """
+
+    def __init__(self, source):
+        """
+        Creates a RecordingReader object.
+
+        :param source: a file object
+        :return: a RecordingReader object
+        """
+        self.source = source
+        self._chunks = []
+
+    def read(self, size=-1):
+        """
+        Reads from the source, keeping what is read.
+
+        :param size: the maximum size to read, all the rest by default
+        :return: bytes or a string, empty at the end
+        """
+        chunk = self.source.read(size)
+        if chunk:
+            self._chunks.append(chunk)
+        return chunk
+
+    def replay(self):
+        """
+        Gets the whole content: what was already read and the rest of the \
+            source.
+
+        :return: bytes or a string with the content
+        """
+        empty = self.source.read(0)
+        return empty.join(self._chunks + [self.source.read()])
+
+
+def iter_chunks(value, chunk_size=CHUNK_SIZE):
+    """
+    Iterates over the content of a XML source in chunks, decompressing it \
+        on the fly if it's gzipped.
+
+    :param value: a file object or a string with the XML
+    :param chunk_size: the size of the chunks to read
+    :return: an iterator over the chunks of the XML
+    """
+    if hasattr(value, 'read'):
+        chunks = iter(lambda: value.read(chunk_size), value.read(0))
+    else:
+        chunks = (
+            value[index:index + chunk_size]
+            for index in range(0, len(value), chunk_size)
+        )
+    decompressor = None
+    for chunk in chunks:
+        if decompressor is None:
+            if not is_gziped(chunk):
+                yield chunk
+                for chunk in chunks:
+                    yield chunk
+                return
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS | 32)
+        # Limit the size of the decompressed chunks, as the compressed ones
+        # can grow a lot
+        data = decompressor.decompress(chunk, chunk_size)
+        while data:
+            yield data
+            data = decompressor.decompress(
+                decompressor.unconsumed_tail, chunk_size
+            )
+    if decompressor is not None:
+        yield decompressor.flush()
+
+
+def iterparse(value, events=('start', 'end'), chunk_size=CHUNK_SIZE,
+              parser='objectify'):
+    """
+    Parses a XML incrementally, yielding the elements as they are read.
+
+    The elements are built like the ones of BaseMessage, but the tree is \
+        only built up to the last element read, so the caller can release \
+        the elements already processed to keep the memory usage flat.
+
+    :param value: a file object or a string with the XML
+    :param events: the parser events to yield
+    :param chunk_size: the size of the chunks to read
+    :param parser: the name of the parser, 'objectify' or 'etree'
+    :return: an iterator over (event, element) tuples
+    """
+    if parser not in PARSERS:
+        raise ValueError('parser {} not supported'.format(parser))
+    pull_parser = XMLPullParser(
+        events=events, encoding=ENCODING, remove_blank_text=True
+    )
+    if parser == 'objectify':
+        pull_parser.set_element_class_lookup(ObjectifyElementClassLookup())
+    for chunk in iter_chunks(value, chunk_size):
+        pull_parser.feed(chunk)
+        for event in pull_parser.read_events():
+            yield event
+    pull_parser.close()
+    for event in pull_parser.read_events():
+        yield event
+
+
+def release_element(element):
+    """
+    Releases an element already processed of an incrementally parsed XML, \
+        and its preceding siblings, to free the memory used by them.
+
+    :param element: an lxml element
+    """
+    element.clear()
+    parent = element.getparent()
+    if parent is not None:
+        previous = element.getprevious()
+        while previous is not None:
+            parent.remove(previous)
+            previous = element.getprevious()
+
+
 class BaseMessage(object):
     """
     Base XML message.
     """
-    def __init__(self, xml):
+    def __init__(self, xml, parser='objectify', keep_text=False,
+                 use_mmap=False, recover=False, instrumentation=None):
         """
         Create an object of BaseMessage.
 
+        Bytes and binary files are fed to the parser in chunks, gzipped ones \
+            are decompressed on the fly, so the whole XML is never held in \
+            memory as text. Only XML with null chars, which need to be \
+            fixed, is read at once.
+
         :param xml: a file object or a string with the XML
+        :param parser: the name of the parser, 'objectify' (default) to get \
+            lxml.objectify elements or 'etree' to get lxml.etree elements
+        :param keep_text: if True the XML is read as text and kept in the \
+            text attribute
+        :param use_mmap: if True a file with a file descriptor is read \
+            through a memory map
+        :param recover: if True a broken XML is read with the recover \
+            option of lxml instead of deleting its null chars
+        :param instrumentation: an Instrumentation object that measures \
+            the decompress and parse stages, see \
+            primestg.report.instrumentation
         :return: an instance of BaseMessage
         """
+        if parser not in PARSERS:
+            raise ValueError('parser {} not supported'.format(parser))
+        self.parser = parser
+        self.keep_text = keep_text
+        self.use_mmap = use_mmap
+        self.recover = recover
+        self.instrumentation = instrumentation
         self.objectified = xml
 
     @property
     def objectified(self):
         """
-        The XML objectified
+        The XML objectified, or as lxml.etree elements with the etree parser
 
         :return: the XML objectified
         """
@@ -48,25 +298,198 @@ class BaseMessage(object):
 
         :param value: a file object or string with the XML
         """
+        self.text = None
+        self.warnings = []
+        if self.instrumentation is None:
+            self._objectified = self._parse(value)
+        else:
+            self._objectified = self._parse_instrumented(value)
+
+    def _parse(self, value):
+        """
+        Parses a XML in the best way for its source.
 
+        :param value: a file object or string with the XML
+        :return: the XML objectified
+        """
         if hasattr(value, 'read'):
-            value = value.read()
+            if self.keep_text or not is_binary_file(value):
+                value = value.read()
+            elif self.use_mmap and hasattr(value, 'fileno'):
+                return self._parse_mmap(value)
+            elif is_seekable(value):
+                return self._parse_file(value)
+            else:
+                value = value.read()
+        if isinstance(value, six.binary_type) and not self.keep_text:
+            try:
+                return self._parse_chunks(value)
+            except XMLSyntaxError as e:
+                return self._parse_text(value, e)
+        return self._parse_text(value)
+
+    def _parse_instrumented(self, value):
+        """
+        Parses a XML measuring the time reading and decompressing it apart \
+            from the time parsing it.
+
+        :param value: a file object or string with the XML
+        :return: the XML objectified
+        """
+        self._decompressed = [0.0, 0]
+        start = default_timer()
+        objectified = self._parse(value)
+        seconds = default_timer() - start
+        report_type = objectified.get('IdRpt')
+        decompress, size = self._decompressed
+        self.instrumentation.record(report_type, 'decompress', decompress, size)
+        self.instrumentation.record(
+            report_type, 'parse', seconds - decompress, len(objectified),
+            len(self.warnings)
+        )
+        return objectified
+
+    def _iter_timed_chunks(self, value):
+        """
+        Iterates over the chunks of a XML measuring the time reading and \
+            decompressing them, see iter_chunks.
+
+        :param value: a file object or a string with the XML
+        :return: an iterator over the chunks of the XML
+        """
+        chunks = iter_chunks(value)
+        decompressed = self._decompressed
+        while True:
+            start = default_timer()
+            chunk = next(chunks, None)
+            decompressed[0] += default_timer() - start
+            if chunk is None:
+                return
+            decompressed[1] += len(chunk)
+            yield chunk
+
+    def _parse_chunks(self, value):
+        """
+        Parses a XML feeding the parser with its chunks, or at once if it's \
+            uncompressed bytes.
+
+        :param value: a binary file object or bytes with the XML
+        :return: the XML objectified
+        """
+        parser = make_parser(self.parser)
+        if isinstance(value, six.binary_type) and not is_gziped(value):
+            # Already in memory, parsing it at once is faster
+            return etree_fromstring(value, parser)
+        if self.instrumentation is None:
+            chunks = iter_chunks(value)
+        else:
+            chunks = self._iter_timed_chunks(value)
+        for chunk in chunks:
+            parser.feed(chunk)
+        return parser.close()
+
+    def _parse_file(self, value):
+        """
+        Parses a seekable binary file, reading it again from the start if \
+            it has to be fixed.
+
+        :param value: a binary file object with the XML
+        :return: the XML objectified
+        """
+        position = value.tell()
+        try:
+            return self._parse_chunks(value)
+        except XMLSyntaxError as e:
+            value.seek(position)
+            return self._parse_text(value.read(), e)
+
+    def _parse_mmap(self, value):
+        """
+        Parses a binary file through a memory map of it.
+
+        :param value: a binary file object with a file descriptor
+        :return: the XML objectified
+        """
+        try:
+            content = mmap.mmap(value.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, EnvironmentError):
+            # Empty files and files that aren't regular files can't be mapped
+            return self._parse_file(value)
+        try:
+            try:
+                return self._parse_chunks(content)
+            except XMLSyntaxError as e:
+                return self._parse_text(content[:], e)
+        finally:
+            content.close()
+
+    def _parse_text(self, value, error=None):
+        """
+        Parses a whole XML, deleting null chars if needed. Bytes are parsed \
+            as they are, unless the text has to be kept.
+
+        :param value: bytes or a string with the XML
+        :param error: the XMLSyntaxError raised parsing this XML before, if \
+            it was parsed
+        :return: the XML objectified
+        """
         if is_gziped(value):
+            start = default_timer()
             value = zlib.decompress(value, zlib.MAX_WBITS | 32)
-        try:
-            self._xml = value.decode('iso-8859-15')
-        except:
-            self._xml = value
+            if self.instrumentation is not None:
+                self._decompressed[0] += default_timer() - start
+                self._decompressed[1] += len(value)
+        if self.keep_text or not isinstance(value, six.binary_type):
+            try:
+                value = value.decode(ENCODING)
+            except:
+                pass
+            if self.keep_text:
+                self.text = value
+            parse = PARSERS[self.parser]
+        else:
+            def parse(content):
+                return etree_fromstring(content, make_parser(self.parser))
+
+        if error is None:
+            try:
+                return parse(value)
+            except XMLSyntaxError as e:
+                error = e
+
+        if self.recover:
+            return self._parse_recovering(value)
 
         # If there is null chars on the XML string, delete it
-        try:
-            xml = fromstring(self._xml)
-        except XMLSyntaxError as e:
-            # Delete everything from the first null char until the next double quote char '"'
-            xml_string = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F].*?"', '"', self._xml)
-            xml = fromstring(xml_string)
+        fixed, deleted = delete_null_chars(value)
+        if not deleted:
+            raise error
+        for offset, length in deleted:
+            self.warnings.append(
+                'WARNING: Deleted {} chars from a null char at offset '
+                '{}'.format(length, offset)
+            )
+        return parse(fixed)
 
-        self._objectified = xml
+    def _parse_recovering(self, value):
+        """
+        Parses a broken XML with the recover option of lxml, which skips \
+            what can't be read.
+
+        :param value: bytes or a string with the XML
+        :return: the XML objectified
+        """
+        parser = make_parser(self.parser, recover=True)
+        if isinstance(value, six.text_type):
+            value = value.encode(ENCODING, 'replace')
+        xml = etree_fromstring(value, parser)
+        for error in parser.error_log:
+            self.warnings.append('WARNING: Recovered from {}'.format(
+                error.message.strip()
+            ))
+        if xml is None:
+            raise XMLSyntaxError('Unrecoverable XML', None, 0, 0)
+        return xml
 
 
 class MessageS(BaseMessage):
@@ -1,7 +1,13 @@
 from datetime import datetime
 import binascii
 import re
-from primestg.utils import octet2date
+from lxml.etree import tostring
+from lxml.objectify import ObjectifiedElement, fromstring
+from primestg.utils import octet2date, LRUCache
+from primestg.report.schema import (
+    Field, compile_schema, get_extractor, project_extractor,
+    active_reactive_fields, uses_name, stage, get_integer_or_zero
+)
 
 
 MAGNITUDE_W = 1
@@ -34,12 +40,520 @@ S23_BAD_TIMESTAMP = [
 
 BAD_TIMESTAMP = SAGE_BAD_TIMESTAMP + S23_BAD_TIMESTAMP
 
+RAW_TIMESTAMP_DTYPE = 'U24'
+"""
+NumPy type of the raw timestamps in the rows of the meters.
+"""
+
+TIMESTAMP_CACHE = LRUCache(maxsize=4096)
+"""
+Formatted timestamps by raw date string. The same timestamps are repeated \
+    in every meter of a concentrator.
+"""
+
 
 DAYSAVING_START_TS = 'FFFFFDFFFFFFFF0000800000'   # Winter to summer
 DAYSAVING_END_TS = 'FFFFFEFFFFFFFF0000800080'     # Summer to winter
 NOW_ACTIVATION_DATE = 'FFFFFFFFFFFFFFFFFF800009'  # Instantly activate latent contract
 
 
+def get_raw_timestamp(value):
+    """
+    Gets the date of a timestamp attribute as 'YYYYMMDDhhmmss', without \
+        formatting it, so it can be compared with other ones. The bad \
+        timestamps are the date given to them by the values (1901-01-01).
+
+    The decimal dates with four digits years, almost all of them, are \
+        taken as they are. The other ones (hexadecimal dates, two digits \
+        years, fields out of range) are decoded like the values do, see \
+        primestg.utils.octet2date.
+
+    :param value: a string with the timestamp attribute
+    :raises ValueError: if the date can't be decoded
+    :return: a string with the date
+    """
+    date_value = value[0:14] + value[-1] if len(value) > 15 else value
+    if date_value.upper() in BAD_TIMESTAMP or not date_value:
+        return '19010101000000'
+    date_value = date_value[:14]
+    if (date_value.isdigit() and len(date_value) == 14 and
+            date_value[0:4] >= '1000' and
+            '01' <= date_value[4:6] <= '12' and
+            '01' <= date_value[6:8] <= '31' and
+            date_value[8:10] <= '23' and date_value[10:12] <= '59' and
+            date_value[12:14] <= '59'):
+        return date_value
+    try:
+        return to_raw_timestamp(octet2date(date_value))
+    except (IndexError, TypeError) as e:
+        raise ValueError('Bad date: {} {}'.format(date_value, e))
+
+
+def to_raw_timestamp(value, last=False):
+    """
+    Converts a date to the format of get_raw_timestamp.
+
+    :param value: a datetime, a date or a string like the timestamps of \
+        the values ('%Y-%m-%d %H:%M:%S' or '%Y-%m-%d')
+    :param last: if True the fields missing from the value are the last \
+        ones, so a date is the end of its day, like the last date of a range
+    :return: a string with the date as 'YYYYMMDDhhmmss'
+    """
+    if hasattr(value, 'strftime'):
+        if not hasattr(value, 'hour'):
+            time = (23, 59, 59) if last else (0, 0, 0)
+        else:
+            time = (value.hour, value.minute, value.second)
+        return '{:04d}{:02d}{:02d}{:02d}{:02d}{:02d}'.format(
+            value.year, value.month, value.day, *time
+        )
+    digits = ''.join(char for char in value if char.isdigit())[:14]
+    if last:
+        # Only compared with other raw dates, so 9 is after any real field
+        return digits.ljust(14, '9')
+    return digits.ljust(14, '0')
+
+
+def get_time_range(date_from=None, date_to=None):
+    """
+    Gets a time range to filter the measure sets by their raw timestamps.
+
+    :param date_from: the first date of the range, see to_raw_timestamp, \
+        None for no limit
+    :param date_to: the last date of the range, see to_raw_timestamp, \
+        None for no limit. A date without time, like '2015-08-31', \
+        includes the whole day
+    :return: a tuple with the raw dates of the range or None without limits
+    """
+    if date_from is None and date_to is None:
+        return None
+    return (
+        None if date_from is None else to_raw_timestamp(date_from),
+        None if date_to is None else to_raw_timestamp(date_to, last=True),
+    )
+
+
+def in_time_range(value, time_range):
+    """
+    Checks if a timestamp attribute is in a time range, both ends included.
+
+    :param value: a string with the timestamp attribute or None, which is \
+        always in the range so the errors of the measure set are kept, \
+        like the dates that can't be decoded
+    :param time_range: a tuple like the ones of get_time_range
+    :return: True if the timestamp is in the range
+    """
+    if value is None:
+        return True
+    try:
+        date_value = get_raw_timestamp(value)
+    except ValueError:
+        return True
+    date_from, date_to = time_range
+    if date_from is not None and date_value < date_from:
+        return False
+    if date_to is not None and date_value > date_to:
+        return False
+    return True
+
+
+def has_child(element, tag):
+    """
+    Checks if an element has a child with a tag.
+
+    :param element: an lxml element, objectified or not
+    :param tag: a string with the tag of the child
+    :return: True if the element has a child with the tag
+    """
+    return element.find(tag) is not None
+
+
+def get_child(element, tag):
+    """
+    Gets the first child of an element with a tag, like the lxml.objectify \
+        attribute lookup does.
+
+    :param element: an lxml element, objectified or not
+    :param tag: a string with the tag of the child
+    :raises AttributeError: if the element has no child with the tag
+    :return: an lxml element
+    """
+    child = element.find(tag)
+    if child is None:
+        raise AttributeError('no such child: {}'.format(tag))
+    return child
+
+
+def get_children(element, tag):
+    """
+    Gets the children of an element with a tag, like iterating the \
+        lxml.objectify attribute lookup does.
+
+    :param element: an lxml element, objectified or not
+    :param tag: a string with the tag of the children
+    :raises AttributeError: if the element has no child with the tag
+    :return: a list of lxml elements
+    """
+    children = list(element.iterchildren(tag=tag))
+    if not children:
+        raise AttributeError('no such child: {}'.format(tag))
+    return children
+
+
+def objectify_element(element):
+    """
+    Gets an element as an lxml.objectify element, so its text is typed the \
+        same way whatever the parser used.
+
+    :param element: an lxml element, objectified or not
+    :return: an lxml.objectify element
+    """
+    if isinstance(element, ObjectifiedElement):
+        return element
+    # The root element is never typed by lxml.objectify, so it's wrapped
+    wrapper = fromstring(
+        b'<wrapper>' + tostring(element, with_tail=False) + b'</wrapper>'
+    )
+    return next(wrapper.iterchildren())
+
+
+def get_numpy():
+    """
+    Imports NumPy, which is only needed to get the values by columns.
+
+    :return: the numpy module
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            'NumPy is needed to get the values by columns, install it with '
+            '"pip install primestg[numpy]"'
+        )
+    return numpy
+
+
+def decode_timestamps(values):
+    """
+    Decodes many raw timestamps of the reports at once, like \
+        ValueWithTime._to_timestamp does for one.
+
+    The decimal timestamps, almost all of them, are decoded with NumPy \
+        operations on the codes of their chars. The other ones (hexadecimal \
+        dates, BAD_TIMESTAMP sentinels, dates out of range) are decoded one \
+        by one with ValueWithTime._to_timestamp, only once for every \
+        different one.
+
+    :param values: a list or a NumPy array of strings with the raw \
+        timestamps, like '20150901010000000S'
+    :return: a tuple with a datetime64[s] array with the timestamps, NaT \
+        for the ones that can't be decoded, and a U1 array with the season \
+        (the last char of every raw timestamp)
+    """
+    numpy = get_numpy()
+    raw = numpy.asarray(values)
+    if raw.dtype.kind not in ('S', 'U'):
+        raw = raw.astype('U')
+    raw = raw.ravel()
+    size = len(raw)
+    kind = raw.dtype.kind
+    char_size = 1 if kind == 'S' else 4
+    width = max(raw.dtype.itemsize // char_size, 15)
+    raw = raw.astype('{}{}'.format(kind, width))
+    codes = raw.view('uint8' if kind == 'S' else 'uint32').reshape(
+        size, width
+    )
+
+    # The strings are padded with null chars
+    used = codes != 0
+    lengths = width - used[:, ::-1].argmax(axis=1)
+    lengths[~used.any(axis=1)] = 0
+    last = codes[numpy.arange(size), numpy.maximum(lengths - 1, 0)]
+    seasons = numpy.where(lengths > 0, last, 0).astype('uint32').view('U1')
+
+    # Unsigned, the chars before '0' are big numbers too
+    digits = codes[:, :14].astype('uint32') - ord('0')
+    decimal = (lengths >= 14) & (digits <= 9).all(axis=1)
+    digits[~decimal] = 0
+
+    def number(start, end):
+        weights = 10 ** numpy.arange(end - start - 1, -1, -1, dtype='uint32')
+        return digits[:, start:end].dot(weights).astype('int64')
+
+    year = number(0, 4)
+    month = number(4, 6)
+    day = number(6, 8)
+    hour = number(8, 10)
+    minute = number(10, 12)
+    second = number(12, 14)
+    # Like octet2date, decimal years under 1000 are read as hexadecimal and
+    # the bad timestamps have no month, so they are decoded one by one
+    fast = (
+        decimal & (year >= 1000) & (month >= 1) & (month <= 12) &
+        (day >= 1) & (day <= 31) & (hour <= 23) & (minute <= 59) &
+        (second <= 59)
+    )
+    year = numpy.where(fast, year, 1970)
+    month = numpy.where(fast, month, 1)
+    day = numpy.where(fast, day, 1)
+    months = ((year - 1970) * 12 + month - 1).astype('datetime64[M]')
+    days = months.astype('datetime64[D]') + (day - 1).astype('timedelta64[D]')
+    fast &= days.astype('datetime64[M]') == months
+    timestamps = days.astype('datetime64[s]') + (
+        hour * 3600 + minute * 60 + second
+    ).astype('timedelta64[s]')
+    timestamps[~fast] = numpy.datetime64('NaT')
+
+    slow = numpy.flatnonzero(~fast)
+    if len(slow):
+        different, inverse = numpy.unique(raw[slow], return_inverse=True)
+        decoded = numpy.empty(len(different), dtype='datetime64[s]')
+        for index, value in enumerate(different):
+            if kind == 'S':
+                value = value.decode('ascii', 'replace')
+            try:
+                timestamp = ValueWithTime._to_timestamp(str(value), 'Fh')
+                decoded[index] = numpy.datetime64(
+                    timestamp.replace(' ', 'T'), 's'
+                )
+            except Exception:
+                decoded[index] = numpy.datetime64('NaT')
+        timestamps[slow] = decoded[inverse.ravel()]
+    return timestamps, seasons
+
+
+def to_columns(concentrators, meter_class):
+    """
+    Fills NumPy arrays with the measure sets of the meters of some \
+        concentrators, without building a dict for every measure set.
+
+    The arrays are preallocated for all the measure sets of the \
+        concentrators and filled while reading them. Besides the columns of \
+        the meter class there are the 'cnc' and 'meter' columns, with the \
+        index of the names of the concentrator and the meter in the \
+        'cnc_names' and 'meter_names' arrays. Timestamps are numpy \
+        datetime64 in seconds, use astype('int64') to get them as epoch. \
+        The rows give them raw and they are decoded at once with \
+        decode_timestamps, the measure sets with timestamps that can't be \
+        decoded are discarded with a warning in their meter.
+
+    :param concentrators: a list of concentrators with meters
+    :param meter_class: the class of the meters of the concentrators, it \
+        must have columns
+    :return: a dict with an array by column and the 'cnc_names' and \
+        'meter_names' arrays
+    """
+    numpy = get_numpy()
+    if getattr(meter_class, 'columns', None) is None:
+        raise NotImplementedError('Report type not implemented!')
+    concentrators = list(concentrators)
+    size = sum(
+        len(concentrator.objectified.findall('Cnt/*'))
+        for concentrator in concentrators
+    )
+    columns = [('cnc', 'int32'), ('meter', 'int32')] + meter_class.columns
+    timestamp_columns = [
+        name for name, dtype in columns if dtype.startswith('datetime64')
+    ]
+    table = numpy.empty(size, dtype=[
+        (name, RAW_TIMESTAMP_DTYPE if name in timestamp_columns else dtype)
+        for name, dtype in columns
+    ])
+    cnc_names = []
+    meters = []
+    index = 0
+    for concentrator in concentrators:
+        cnc_index = len(cnc_names)
+        cnc_names.append(concentrator.name)
+        for meter in concentrator.meters:
+            meter_index = len(meters)
+            meters.append(meter)
+            for row in meter.rows():
+                table[index] = (cnc_index, meter_index) + row
+                index += 1
+    table = table[:index]
+
+    result = dict((name, table[name]) for name, dtype in columns)
+    decoded = numpy.ones(index, dtype=bool)
+    for name in timestamp_columns:
+        result[name] = decode_timestamps(table[name])[0]
+        decoded &= ~numpy.isnat(result[name])
+    if not decoded.all():
+        for row_index in numpy.flatnonzero(~decoded):
+            meter = meters[table['meter'][row_index]]
+            for name in timestamp_columns:
+                try:
+                    meter.measure_class._to_timestamp(
+                        table[name][row_index],
+                        meter.measure_class.timestamp_attribute
+                    )
+                except Exception as e:
+                    meter._warnings.setdefault(meter.name, []).append(
+                        meter.measure_class.row_error.format(e)
+                    )
+                    break
+        result = dict(
+            (name, column[decoded]) for name, column in result.items()
+        )
+    meter_names = [meter.name for meter in meters]
+    result['cnc_names'] = numpy.array(cnc_names, dtype=str)
+    result['meter_names'] = numpy.array(meter_names, dtype=str)
+    return result
+
+
+class Record(object):
+    """
+    Base class for the compact records of values, a lighter alternative to \
+        dicts with the same keys. Record classes are built by \
+        get_record_class.
+    """
+
+    __slots__ = ()
+    _fields = ()
+    _slots = {}
+
+    def __init__(self, *values):
+        """
+        Creates a record.
+
+        :param values: the values of the record in the order of its fields
+        :return: a Record object
+        """
+        for slot, value in zip(self.__slots__, values):
+            setattr(self, slot, value)
+
+    def as_dict(self):
+        """
+        The record as a dict.
+
+        :return: a dict with the values of the record
+        """
+        return dict(zip(self._fields, self.values()))
+
+    def keys(self):
+        return list(self._fields)
+
+    def values(self):
+        return [getattr(self, slot) for slot in self.__slots__]
+
+    def items(self):
+        return list(zip(self._fields, self.values()))
+
+    def get(self, key, default=None):
+        if key in self._slots:
+            return getattr(self, self._slots[key])
+        return default
+
+    def __getitem__(self, key):
+        return getattr(self, self._slots[key])
+
+    def __setitem__(self, key, value):
+        setattr(self, self._slots[key], value)
+
+    def __contains__(self, key):
+        return key in self._slots
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            other = other.as_dict()
+        return self.as_dict() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, self.as_dict())
+
+
+RECORD_CLASSES = {}
+"""
+Record classes by fields.
+"""
+
+
+def get_record_class(fields):
+    """
+    Gets the record class for some fields, the classes are built once.
+
+    Fields that aren't valid python names are stored in an attribute with \
+        the invalid characters replaced by underscores.
+
+    :param fields: a tuple with the names of the fields
+    :return: a Record class
+    """
+    record_class = RECORD_CLASSES.get(fields)
+    if record_class is None:
+        slots = tuple(
+            re.sub(r'\W', '_', field) if isinstance(field, str) else field
+            for field in fields
+        )
+        record_class = type(str('Record'), (Record,), {
+            '__slots__': slots,
+            '_fields': fields,
+            '_slots': dict(zip(fields, slots)),
+        })
+        RECORD_CLASSES[fields] = record_class
+    return record_class
+
+
+def make_record(value, extra=None):
+    """
+    Builds a record with the items of a dict and some extra items, without \
+        copying the dict.
+
+    :param value: a dict with the values
+    :param extra: a dict with the items to add, they replace the ones of \
+        value with the same key
+    :return: a Record object
+    """
+    if extra and any(key in value for key in extra):
+        value = dict(value)
+        value.update(extra)
+        extra = None
+    fields = tuple(value)
+    values = list(value.values())
+    if extra:
+        fields += tuple(extra)
+        values.extend(extra.values())
+    return get_record_class(fields)(*values)
+
+
+def project_values(value, fields):
+    """
+    Keeps only some keys of a value.
+
+    :param value: a dict with a value of a report
+    :param fields: a frozenset with the keys to keep
+    :return: a dict with the keys of the value in fields, the same value \
+        if it has no other keys
+    """
+    if fields.issuperset(value):
+        return value
+    return dict(
+        (key, item) for key, item in value.items() if key in fields
+    )
+
+
+def as_record(value):
+    """
+    Converts a value to a record if it's a dict.
+
+    :param value: a value of a report
+    :return: a Record object or the value if it isn't a dict
+    """
+    if isinstance(value, dict):
+        return make_record(value)
+    return value
+
+
 class ValueWithTime(object):
     """
     Base class for values with time.
@@ -60,6 +574,8 @@ class ValueWithTime(object):
         return self._to_timestamp(e.get(name), name)
 
     @staticmethod
+    @stage('timestamps')
+    @uses_name
     def _to_timestamp(value, name):
         date_value = value[0:14] + value[-1] if len(value) > 15 else value
 
@@ -67,13 +583,19 @@ class ValueWithTime(object):
         if date_value.upper() in BAD_TIMESTAMP or not date_value:
             date_value = '19010101000000W'
 
+        timestamp = TIMESTAMP_CACHE.get(date_value)
+        if timestamp is not None:
+            return timestamp
+
         try:
             time = octet2date(date_value)
         except ValueError as e:
             raise ValueError("Date out of range: {} ({}) {}".format(
                 date_value, name, e))
 
-        return time.strftime('%Y-%m-%d %H:%M:%S')
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+        TIMESTAMP_CACHE.set(date_value, timestamp)
+        return timestamp
 
     def _get_special_days(self, name, element=None):
         """
@@ -112,6 +634,29 @@ class Measure(ValueWithTime):
     Base class for a set of measures.
     """
 
+    fields = None
+    """
+    If not None, the keys of the values to get. The attributes of other \
+        keys aren't converted when the measure set has a schema.
+    """
+
+    timestamp_attribute = 'Fh'
+    """
+    The attribute with the timestamp of the measure set, used to filter them.
+    """
+
+    row_error = 'ERROR: Thrown exception: {}'
+    """
+    The warning of a measure set that can't be read as a row, with the \
+        exception.
+    """
+
+    instrumentation = None
+    """
+    If not None, the Instrumentation that measures the converters of the \
+        report fields, like the timestamps.
+    """
+
     def __init__(self, objectified_measure):
         """
         Create a Measure object.
@@ -152,12 +697,52 @@ class Measure(ValueWithTime):
         """
         return self._warnings
 
+    def row(self):
+        """
+        The set of measures as a tuple in the order of the columns of the \
+            meter. To implement in child classes.
+        """
+        raise NotImplementedError('This method is not implemented!')
+
+    def project_extractor(self, extract):
+        """
+        Gets an extractor with only the keys of fields, measured by the \
+            instrumentation if there is one.
+
+        :param extract: an extractor, see schema.compile_schema
+        :return: an extractor
+        """
+        extract = project_extractor(extract, self.fields)
+        if self.instrumentation is not None:
+            extract = self.instrumentation.extractor(extract)
+        return extract
+
+    def get_extractor(self, name):
+        """
+        Gets the extractor of the report fields of a report, see \
+            project_extractor.
+
+        :param name: a string with the report code or the name of the element
+        :return: an extractor
+        """
+        return self.project_extractor(get_extractor(name))
+
 
 class MeasureActiveReactive(Measure):
     """
     Base class for a set of measures with active and reactive measures.
     """
 
+    _active_reactive = dict(
+        (measure_type, compile_schema(
+            active_reactive_fields(measure_type, get_integer_or_zero)
+        ))
+        for measure_type in ('a', 'i', '')
+    )
+    """
+    Extractors of the active and reactive measures by measure type.
+    """
+
     def active_reactive(self, measure, measure_type):
         """
         Get the active and reactive measures.
@@ -168,14 +753,12 @@ class MeasureActiveReactive(Measure):
             name of each measure ('a' or 'i')
         :return: a dict with the active and reactive measures
         """
-        return {
-            'ai': int(measure.get('AI{}'.format(measure_type), 0) or 0),
-            'ae': int(measure.get('AE{}'.format(measure_type), 0) or 0),
-            'r1': int(measure.get('R1{}'.format(measure_type), 0) or 0),
-            'r2': int(measure.get('R2{}'.format(measure_type), 0) or 0),
-            'r3': int(measure.get('R3{}'.format(measure_type), 0) or 0),
-            'r4': int(measure.get('R4{}'.format(measure_type), 0) or 0),
-        }
+        extract = self._active_reactive.get(measure_type)
+        if extract is None:
+            extract = compile_schema(
+                active_reactive_fields(measure_type, get_integer_or_zero)
+            )
+        return self.project_extractor(extract)(measure)
 
 
 class MeasureActiveReactiveFloat(Measure):
@@ -183,6 +766,26 @@ class MeasureActiveReactiveFloat(Measure):
     Base class for a set of measures with active and reactive measures.
     """
 
+    _active_reactive = dict(
+        (measure_type, compile_schema(
+            active_reactive_fields(measure_type, float)
+        ))
+        for measure_type in ('a', 'i', '')
+    )
+    """
+    Extractors of the active and reactive measures by measure type.
+    """
+
+    _active_reactive_with_phase = dict(
+        (phase_num, compile_schema(
+            active_reactive_fields(phase_num, float, phase_num)
+        ))
+        for phase_num in (1, 2, 3)
+    )
+    """
+    Extractors of the active and reactive measures by phase number.
+    """
+
     def active_reactive(self, measure, measure_type):
         """
         Get the active and reactive measures.
@@ -193,14 +796,12 @@ class MeasureActiveReactiveFloat(Measure):
             name of each measure ('a' or 'i')
         :return: a dict with the active and reactive measures
         """
-        return {
-            'ai': float(measure.get('AI{}'.format(measure_type))),
-            'ae': float(measure.get('AE{}'.format(measure_type))),
-            'r1': float(measure.get('R1{}'.format(measure_type))),
-            'r2': float(measure.get('R2{}'.format(measure_type))),
-            'r3': float(measure.get('R3{}'.format(measure_type))),
-            'r4': float(measure.get('R4{}'.format(measure_type))),
-        }
+        extract = self._active_reactive.get(measure_type)
+        if extract is None:
+            extract = compile_schema(
+                active_reactive_fields(measure_type, float)
+            )
+        return self.project_extractor(extract)(measure)
 
     def active_reactive_with_phase(self, measure, phase_num):
         """
@@ -212,14 +813,21 @@ class MeasureActiveReactiveFloat(Measure):
             name of each measure (1,2,3)
         :return: a dict with the active and reactive phase measures
         """
-        return {
-            'ai{}'.format(phase_num): float(measure.get('AI{}'.format(phase_num))),
-            'ae{}'.format(phase_num): float(measure.get('AE{}'.format(phase_num))),
-            'r1{}'.format(phase_num): float(measure.get('R1{}'.format(phase_num))),
-            'r2{}'.format(phase_num): float(measure.get('R2{}'.format(phase_num))),
-            'r3{}'.format(phase_num): float(measure.get('R3{}'.format(phase_num))),
-            'r4{}'.format(phase_num): float(measure.get('R4{}'.format(phase_num))),
-        }
+        extract = self._active_reactive_with_phase.get(phase_num)
+        if extract is None:
+            extract = compile_schema(
+                active_reactive_fields(phase_num, float, phase_num)
+            )
+        return self.project_extractor(extract)(measure)
+
+
+AVERAGE_VOLTAGE_AND_CURRENT_FIELDS = [
+    Field(source, source.lower(), float)
+    for source in ('V1', 'V2', 'V3', 'I1', 'I2', 'I3', 'In')
+]
+"""
+Fields of the average voltage and current measures.
+"""
 
 
 class MeasureAverageVoltageAndCurrent(Measure):
@@ -227,6 +835,10 @@ class MeasureAverageVoltageAndCurrent(Measure):
     Base class for a set of measures with average voltage and current.
     """
 
+    _average_voltage_and_current = staticmethod(compile_schema(
+        AVERAGE_VOLTAGE_AND_CURRENT_FIELDS
+    ))
+
     def average_voltage_and_current(self, measure):
         """
         Get the average voltage and current measures.
@@ -235,15 +847,9 @@ class MeasureAverageVoltageAndCurrent(Measure):
             measures
         :return: a dict with the active and reactive measures
         """
-        return {
-            'v1': float(measure.get('V1')),
-            'v2': float(measure.get('V2')),
-            'v3': float(measure.get('V3')),
-            'i1': float(measure.get('I1')),
-            'i2': float(measure.get('I2')),
-            'i3': float(measure.get('I3')),
-            'in': float(measure.get('In')),
-        }
+        return self.project_extractor(
+            self._average_voltage_and_current
+        )(measure)
 
 
 class Operation(Measure):
@@ -399,6 +1005,28 @@ class Meter(object):
     Base class for a meter.
     """
 
+    records = False
+    """
+    If True the values are Record objects instead of dicts.
+    """
+
+    fields = None
+    """
+    If not None, the keys of the values to get, see Measure.fields.
+    """
+
+    time_range = None
+    """
+    If not None, a tuple with the first and the last raw timestamps of the \
+        measure sets to read, see get_time_range.
+    """
+
+    instrumentation = None
+    """
+    If not None, the Instrumentation passed to the measure sets, see \
+        Measure.instrumentation.
+    """
+
     def __init__(self, objectified_meter):
         """
         Create a Meter object.
@@ -427,6 +1055,7 @@ class Meter(object):
         :param value: an lxml.objectify.StringElement representing a meter
         """
         self._objectified = value
+        self._measures = None
 
     @property
     def errors(self):
@@ -475,11 +1104,27 @@ class Meter(object):
 
         :return: a list of measure set objects
         """
-        measures = []
-        if hasattr(self.objectified, self.report_type):
-            objectified = getattr(self.objectified, self.report_type)
-            measures = map(self.measure_class, objectified)
-        return measures
+        if self._measures is None:
+            measures = []
+            if has_child(self.objectified, self.report_type):
+                objectified = self.objectified.iterchildren(
+                    tag=self.report_type
+                )
+                if self.time_range is not None:
+                    name = self.measure_class.timestamp_attribute
+                    objectified = [
+                        measure for measure in objectified
+                        if in_time_range(measure.get(name), self.time_range)
+                    ]
+                measures = list(map(self.measure_class, objectified))
+                if self.fields is not None:
+                    for measure in measures:
+                        measure.fields = self.fields
+                if self.instrumentation is not None:
+                    for measure in measures:
+                        measure.instrumentation = self.instrumentation
+            self._measures = measures
+        return self._measures
 
     @property
     def values(self):
@@ -511,6 +1156,12 @@ class MeterWithConcentratorName(Meter):
         in the values, like S04 and S05.
     """
 
+    columns = None
+    """
+    The names and NumPy types of the values of rows, None if the report \
+        can't be read by columns.
+    """
+
     def report_type(self):
         """
         The type of report. To implement in child classes.
@@ -557,20 +1208,70 @@ class MeterWithConcentratorName(Meter):
         :return: a list with the values of the measure sets
         """
         values = []
+        extra_values = None
+        self._clear_warnings()
         for measure in self.measures:
             for subvalue in measure.values:
-                v = subvalue.copy()
-                v['name'] = self.name
-                v['cnc_name'] = self.concentrator_name
+                if extra_values is None:
+                    extra_values = self.extra_values
+                    if self.fields is not None:
+                        extra_values = project_values(
+                            extra_values, self.fields
+                        )
+                if self.fields is not None:
+                    subvalue = project_values(subvalue, self.fields)
+                if self.records:
+                    v = make_record(subvalue, extra_values)
+                else:
+                    v = subvalue.copy()
+                    v.update(extra_values)
                 if v:
                     values.append(v)
-            if measure.warnings:
-                if self._warnings.get(self.name, False):
-                    self._warnings[self.name].extend(measure.warnings)
-                else:
-                    self._warnings.update({self.name: measure.warnings})
+            self._add_warnings(measure)
         return values
 
+    @property
+    def extra_values(self):
+        """
+        Values added to every measure set of this meter.
+
+        :return: a dict with the name of the meter and the concentrator
+        """
+        return {'name': self.name, 'cnc_name': self.concentrator_name}
+
+    def rows(self):
+        """
+        Measure sets of this meter as tuples in the order of columns.
+
+        :return: a list of tuples with the values of the measure sets
+        """
+        rows = []
+        self._clear_warnings()
+        for measure in self.measures:
+            row = measure.row()
+            if row:
+                rows.append(row)
+            self._add_warnings(measure)
+        return rows
+
+    def _add_warnings(self, measure):
+        """
+        Adds the warnings of a measure set to the warnings of this meter.
+
+        :param measure: a measure set object of this meter
+        """
+        if measure.warnings:
+            self._warnings.setdefault(self.name, []).extend(measure.warnings)
+
+    def _clear_warnings(self):
+        """
+        Clears the warnings of a previous read of the measure sets, which \
+            are kept, so reading them again doesn't repeat the warnings.
+        """
+        self._warnings.clear()
+        for measure in self.measures:
+            del measure.warnings[:]
+
 
 class MeterWithMagnitude(MeterWithConcentratorName):
 
@@ -589,6 +1290,35 @@ class Concentrator(object):
     Base class for a concentrator.
     """
 
+    records = False
+    """
+    If True the values of the meters are Record objects instead of dicts.
+    """
+
+    fields = None
+    """
+    If not None, the keys of the values of the meters to get, see \
+        Measure.fields.
+    """
+
+    meter_names = None
+    """
+    If not None, a set with the names of the meters to read, the other \
+        meters are skipped.
+    """
+
+    time_range = None
+    """
+    If not None, the time range of the measure sets of the meters to read, \
+        see get_time_range.
+    """
+
+    instrumentation = None
+    """
+    If not None, the Instrumentation passed to the meters, see \
+        Measure.instrumentation.
+    """
+
     def __init__(self, objectified_concentrator):
         """
         Create a Concentrator object.
@@ -618,6 +1348,7 @@ class Concentrator(object):
             concentrator
         """
         self._objectified = value
+        self._meters = None
 
     @property
     def name(self):
@@ -649,6 +1380,16 @@ class ConcentratorWithMeters(Concentrator):
         """
         return Meter
 
+    def get_meter(self, objectified_meter):
+        """
+        Instances a meter object of this concentrator.
+
+        :param objectified_meter: an lxml.objectify.StringElement \
+            representing a meter
+        :return: a meter object
+        """
+        return self.meter_class(objectified_meter)
+
     @property
     def meters(self):
         """
@@ -656,7 +1397,42 @@ class ConcentratorWithMeters(Concentrator):
 
         :return: a list of meter objects
         """
-        return map(self.meter_class, self.objectified.Cnt)
+        if self._meters is None:
+            self._meters = [
+                self.new_meter(meter)
+                for meter in get_children(self.objectified, 'Cnt')
+                if self.selects_meter(meter)
+            ]
+        return self._meters
+
+    def selects_meter(self, objectified_meter):
+        """
+        Checks if a meter has to be read, by its name in meter_names.
+
+        :param objectified_meter: an lxml.objectify.StringElement \
+            representing a meter
+        :return: True if the meter has to be read
+        """
+        return (
+            self.meter_names is None or
+            objectified_meter.get('Id') in self.meter_names
+        )
+
+    def new_meter(self, objectified_meter):
+        """
+        Instances a meter object of this concentrator with get_meter and \
+            passes the options of the concentrator to it.
+
+        :param objectified_meter: an lxml.objectify.StringElement \
+            representing a meter
+        :return: a meter object
+        """
+        meter = self.get_meter(objectified_meter)
+        meter.records = self.records
+        meter.fields = self.fields
+        meter.time_range = self.time_range
+        meter.instrumentation = self.instrumentation
+        return meter
 
     @property
     def values(self):
@@ -670,6 +1446,14 @@ class ConcentratorWithMeters(Concentrator):
             values.extend(meter.values)
         return [v for v in values if v]
 
+    def to_columns(self):
+        """
+        Values of the meters of this concentrator as NumPy arrays by column.
+
+        :return: a dict with an array by column, see to_columns
+        """
+        return to_columns([self], self.meter_class)
+
 
 class ConcentratorWithMetersWithConcentratorName(ConcentratorWithMeters):
     """
@@ -677,6 +1461,17 @@ class ConcentratorWithMetersWithConcentratorName(ConcentratorWithMeters):
         concentrator in the values, like S04 and S05.
     """
 
+    def get_meter(self, objectified_meter):
+        """
+        Instances a meter object of this concentrator. The name of \
+            concentrator is passed to the meter.
+
+        :param objectified_meter: an lxml.objectify.StringElement \
+            representing a meter
+        :return: a meter object
+        """
+        return self.meter_class(objectified_meter, self.name)
+
     @property
     def meters(self):
         """
@@ -685,13 +1480,15 @@ class ConcentratorWithMetersWithConcentratorName(ConcentratorWithMeters):
 
         :return: a list of meter objects
         """
-        meters = []
-        if getattr(self.objectified, 'Cnt', None) is not None:
-            for meter in self.objectified.Cnt:
-                meters.append(self.meter_class(meter, self.name))
+        if self._meters is None:
+            meters = []
+            for meter in self.objectified.iterchildren(tag='Cnt'):
+                if self.selects_meter(meter):
+                    meters.append(self.new_meter(meter))
             for meter in meters:
                 self._warnings.append(meter.warnings)
-        return meters
+            self._meters = meters
+        return self._meters
 
 
 class BaseElement(object):
@@ -699,6 +1496,34 @@ class BaseElement(object):
     Base class
     """
 
+    records = False
+    """
+    If True the values are Record objects instead of dicts.
+    """
+
+    fields = None
+    """
+    If not None, the keys of the values to get, see Measure.fields.
+    """
+
+    time_range = None
+    """
+    If not None, a tuple with the first and the last raw timestamps of the \
+        measure sets to read, see get_time_range.
+    """
+
+    instrumentation = None
+    """
+    If not None, the Instrumentation passed to the measure sets, see \
+        Measure.instrumentation.
+    """
+
+    meter_names = None
+    """
+    If not None, a set with the names of the line supervisors to read, \
+        the other ones are skipped.
+    """
+
     def __init__(self, objectified):
         """
         Create object.
@@ -726,6 +1551,8 @@ class BaseElement(object):
         :param value: an lxml.objectify.StringElement
         """
         self._objectified = value
+        self._measures = None
+        self._line_supervisors = None
 
     @property
     def name(self):
@@ -799,11 +1626,27 @@ class LineSupervisor(BaseElement):
 
         :return: a list of measure set objects
         """
-        measures = []
-        if hasattr(self.objectified, self.report_type):
-            objectified = getattr(self.objectified, self.report_type)
-            measures = map(self.measure_class, objectified)
-        return measures
+        if self._measures is None:
+            measures = []
+            if has_child(self.objectified, self.report_type):
+                objectified = self.objectified.iterchildren(
+                    tag=self.report_type
+                )
+                if self.time_range is not None:
+                    name = self.measure_class.timestamp_attribute
+                    objectified = [
+                        measure for measure in objectified
+                        if in_time_range(measure.get(name), self.time_range)
+                    ]
+                measures = list(map(self.measure_class, objectified))
+                if self.fields is not None:
+                    for measure in measures:
+                        measure.fields = self.fields
+                if self.instrumentation is not None:
+                    for measure in measures:
+                        measure.instrumentation = self.instrumentation
+            self._measures = measures
+        return self._measures
 
     @property
     def values(self):
@@ -874,20 +1717,57 @@ class LineSupervisorDetails(LineSupervisor):
         :return: a list with the values of the measure sets
         """
         values = []
+        extra_values = None
+        self._clear_warnings()
         for measure in self.measures:
             for subvalue in measure.values:
-                v = subvalue.copy()
-                v['name'] = self.name
-                v['rt_unit_name'] = self.rt_unit_name
+                if extra_values is None:
+                    extra_values = self.extra_values
+                    if self.fields is not None:
+                        extra_values = project_values(
+                            extra_values, self.fields
+                        )
+                if self.fields is not None:
+                    subvalue = project_values(subvalue, self.fields)
+                if self.records:
+                    v = make_record(subvalue, extra_values)
+                else:
+                    v = subvalue.copy()
+                    v.update(extra_values)
                 if v:
                     values.append(v)
-            if measure.warnings:
-                if self._warnings.get(self.name, False):
-                    self._warnings[self.name].extend(measure.warnings)
-                else:
-                    self._warnings.update({self.name: measure.warnings})
+            self._add_warnings(measure)
         return values
 
+    def _add_warnings(self, measure):
+        """
+        Adds the warnings of a measure set to the warnings of this line \
+            supervisor.
+
+        :param measure: a measure set object of this line supervisor
+        """
+        if measure.warnings:
+            self._warnings.setdefault(self.name, []).extend(measure.warnings)
+
+    def _clear_warnings(self):
+        """
+        Clears the warnings of a previous read of the measure sets, which \
+            are kept, so reading them again doesn't repeat the warnings.
+        """
+        self._warnings.clear()
+        for measure in self.measures:
+            del measure.warnings[:]
+
+    @property
+    def extra_values(self):
+        """
+        Values added to every measure set of this line supervisor.
+
+        :return: a dict with the name of the line supervisor and the remote \
+            terminal unit
+        """
+        return {'name': self.name, 'rt_unit_name': self.rt_unit_name}
+
     @property
     def magnitude(self):
         """
@@ -933,6 +1813,46 @@ class RemoteTerminalUnitDetails(BaseElement):
             values.extend(line_supervisor.values)
         return [v for v in values if v]
 
+    def get_line_supervisor(self, objectified_line_supervisor):
+        """
+        Instances a line supervisor object of this remote terminal unit. The name of remote terminal unit is passed to
+        the line supervisor.
+
+        :param objectified_line_supervisor: an lxml.objectify.StringElement representing a line supervisor
+        :return: a line supervisor object
+        """
+        return self.line_supervisor_class(objectified_line_supervisor, self.name)
+
+    def new_line_supervisor(self, objectified_line_supervisor):
+        """
+        Instances a line supervisor object of this remote terminal unit with \
+            get_line_supervisor and passes the options of the remote \
+            terminal unit to it.
+
+        :param objectified_line_supervisor: an lxml.objectify.StringElement representing a line supervisor
+        :return: a line supervisor object
+        """
+        line_supervisor = self.get_line_supervisor(objectified_line_supervisor)
+        line_supervisor.records = self.records
+        line_supervisor.fields = self.fields
+        line_supervisor.time_range = self.time_range
+        line_supervisor.instrumentation = self.instrumentation
+        return line_supervisor
+
+    def selects_line_supervisor(self, objectified_line_supervisor):
+        """
+        Checks if a line supervisor has to be read, by its name in \
+            meter_names.
+
+        :param objectified_line_supervisor: an lxml.objectify.StringElement \
+            representing a line supervisor
+        :return: True if the line supervisor has to be read
+        """
+        return (
+            self.meter_names is None or
+            objectified_line_supervisor.get('Id') in self.meter_names
+        )
+
     @property
     def line_supervisors(self):
         """
@@ -940,10 +1860,15 @@ class RemoteTerminalUnitDetails(BaseElement):
 
         :return: a list of line supervisor objects
         """
-        line_supervisors = []
-        if getattr(self.objectified, 'LVSLine', None) is not None:
-            for line_supervisor in self.objectified.LVSLine:
-                line_supervisors.append(self.line_supervisor_class(line_supervisor, self.name))
+        if self._line_supervisors is None:
+            line_supervisors = []
+            for line_supervisor in self.objectified.iterchildren(
+                    tag='LVSLine'):
+                if self.selects_line_supervisor(line_supervisor):
+                    line_supervisors.append(
+                        self.new_line_supervisor(line_supervisor)
+                    )
             for line_supervisor in line_supervisors:
                 self._warnings.append(line_supervisor.warnings)
-        return line_supervisors
+            self._line_supervisors = line_supervisors
+        return self._line_supervisors
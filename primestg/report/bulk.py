@@ -0,0 +1,147 @@
+# coding=utf-8
+import os
+import re
+from glob import glob
+from multiprocessing import Pool
+
+import six
+
+from primestg.message import iterparse
+from primestg.report.reports import Report
+
+REPORT_FILENAME = re.compile(
+    r'^[A-Z0-9]+_[0-9A-Fa-f]+_(?P<report_type>[SG]\d{2})(_\d+)?_\d{14}'
+)
+"""
+Name of the report files uploaded by the concentrators, like \
+    CIR4621247027_0_S02_0_20150901111051
+"""
+
+
+def find_report_files(paths):
+    """
+    Finds the report files of some directories or glob patterns.
+
+    :param paths: a string or a list of strings with files, directories or \
+        glob patterns
+    :return: a sorted list with the names of the files
+    """
+    if isinstance(paths, six.string_types):
+        paths = [paths]
+    filenames = []
+    for path in paths:
+        if os.path.isdir(path):
+            names = [os.path.join(path, name) for name in os.listdir(path)]
+        else:
+            names = glob(path)
+        filenames.extend(name for name in names if os.path.isfile(name))
+    return sorted(filenames)
+
+
+def get_report_type(filename):
+    """
+    Gets the report type of a file from its name or, when the name doesn't \
+        follow the concentrators convention, from the IdRpt attribute of \
+        the report.
+
+    :param filename: a string with the name of the file
+    :return: a string with the report type or None if it can't be found
+    """
+    match = REPORT_FILENAME.match(os.path.basename(filename))
+    if match:
+        return match.group('report_type')
+    try:
+        with open(filename, 'rb') as report_file:
+            for event, element in iterparse(report_file, events=('start',)):
+                return element.get('IdRpt')
+    except Exception:
+        return None
+
+
+def read_report_file(filename, parser='objectify', fields=None):
+    """
+    Reads the values and the warnings of a report file.
+
+    :param filename: a string with the name of the file
+    :param parser: the name of the parser used to read the file
+    :param fields: a list with the keys of the values to get, all of them \
+        by default
+    :return: a dict with the filename, the report type, the values, the \
+        warnings and error counts of Report.parse and the error found \
+        reading the file, if any
+    """
+    result = {
+        'filename': filename,
+        'report_type': None,
+        'values': [],
+        'warnings': [],
+        'errors': {},
+        'error': None,
+    }
+    try:
+        with open(filename, 'rb') as report_file:
+            report = Report(report_file, parser=parser, fields=fields)
+        result['report_type'] = report.report_type
+        parsed = report.parse()
+        result['values'] = parsed.values
+        result['warnings'] = parsed.warnings
+        result['errors'] = parsed.errors
+    except Exception as e:
+        result['error'] = '{}: {}'.format(type(e).__name__, e)
+    return result
+
+
+def _read_report_file(args):
+    """
+    Calls read_report_file with a tuple of arguments, as sent by the pool.
+
+    :param args: a tuple with the filename, the name of the parser and \
+        the fields
+    :return: a dict with the result of read_report_file
+    """
+    return read_report_file(*args)
+
+
+def read_reports(paths, report_types=None, workers=None, chunksize=1,
+                 ordered=True, parser='objectify', fields=None):
+    """
+    Reads many report files using a pool of processes.
+
+    :param paths: a string or a list of strings with files, directories or \
+        glob patterns
+    :param report_types: a list with the report types to read, the files \
+        of other types are skipped without parsing them. All by default
+    :param workers: the number of processes, the number of CPUs by \
+        default. With 1 the files are read in this process
+    :param chunksize: the number of files sent to a process at once
+    :param ordered: if True the results are given in the order of the \
+        files, otherwise as soon as they are read
+    :param parser: the name of the parser used to read the files
+    :param fields: a list with the keys of the values to get, all of them \
+        by default
+    :return: an iterator over the results of read_report_file
+    """
+    filenames = find_report_files(paths)
+    if report_types is not None:
+        filenames = [
+            filename for filename in filenames
+            if get_report_type(filename) in report_types
+        ]
+    tasks = [(filename, parser, fields) for filename in filenames]
+
+    if workers == 1:
+        for task in tasks:
+            yield _read_report_file(task)
+        return
+
+    pool = Pool(workers)
+    try:
+        if ordered:
+            results = pool.imap(_read_report_file, tasks, chunksize)
+        else:
+            results = pool.imap_unordered(_read_report_file, tasks, chunksize)
+        for result in results:
+            yield result
+    finally:
+        pool.terminate()
+        pool.join()
@@ -0,0 +1,284 @@
+# coding=utf-8
+import hashlib
+import sqlite3
+from datetime import datetime
+
+from lxml.etree import XMLSyntaxError
+
+from primestg.message import iterparse
+from primestg.report.bulk import find_report_files, get_report_type
+from primestg.report.reports import Report
+
+TIMESTAMP_KEYS = {
+    'S02': 'timestamp',
+    'S04': 'date_begin',
+    'S05': 'date_begin',
+    'S52': 'timestamp',
+    'G02': 'timestamp',
+}
+"""
+Key of the values with the timestamp of the measure set, by report type. \
+    The values of these report types already ingested for a meter and a \
+    timestamp are skipped, for the other ones only the files already \
+    ingested are.
+"""
+
+SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS files ('
+    '    fingerprint TEXT PRIMARY KEY,'
+    '    filename TEXT,'
+    '    report_type TEXT,'
+    '    request_id TEXT,'
+    '    concentrator TEXT,'
+    '    rows INTEGER,'
+    '    ingested TEXT'
+    ')',
+    'CREATE TABLE IF NOT EXISTS measures ('
+    '    report_type TEXT,'
+    '    name TEXT,'
+    '    timestamp TEXT,'
+    '    PRIMARY KEY (report_type, name, timestamp)'
+    ')',
+]
+"""
+Tables of the ingestion index: the files ingested and the timestamps \
+    ingested of every meter, by report type.
+"""
+
+
+def get_report_header(content):
+    """
+    Reads the report type, the request id and the first concentrator (or \
+        remote terminal unit) of a report without parsing all of it.
+
+    :param content: a string with the XML of the report, gzipped or not
+    :return: a dict with the 'report_type', the 'request_id' and the \
+        'concentrator', None if they can't be read
+    """
+    header = {'report_type': None, 'request_id': None, 'concentrator': None}
+    try:
+        for event, element in iterparse(content, events=('start',)):
+            if element.getparent() is None:
+                header['report_type'] = element.get('IdRpt')
+                header['request_id'] = element.get('IdPet')
+            else:
+                header['concentrator'] = element.get('Id')
+                break
+    except XMLSyntaxError:
+        pass
+    return header
+
+
+def fingerprint_report(content):
+    """
+    Identifies the content of a report file, so the same file uploaded \
+        again is recognized.
+
+    :param content: a string with the content of the report file, gzipped \
+        or not, as read from the file
+    :return: a dict with the 'fingerprint', a string with the header and \
+        the SHA-1 of the content, and the header, see get_report_header
+    """
+    header = get_report_header(content)
+    digest = hashlib.sha1(content).hexdigest()
+    header['fingerprint'] = ':'.join([
+        header['report_type'] or '',
+        header['request_id'] or '',
+        header['concentrator'] or '',
+        digest,
+    ])
+    return header
+
+
+class IngestionIndex(object):
+    """
+    Local SQLite index of the report files already ingested and of the \
+        timestamps ingested of every meter.
+    """
+
+    def __init__(self, path=':memory:'):
+        """
+        Creates an IngestionIndex object, creating the database if needed.
+
+        :param path: a string with the name of the SQLite database file, in \
+            memory by default
+        :return: an IngestionIndex object
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+        self._ingested = {}
+
+    def is_ingested(self, fingerprint):
+        """
+        Whether a report file was already ingested.
+
+        :param fingerprint: a string with the fingerprint of the file, see \
+            fingerprint_report
+        :return: True if the file was ingested
+        """
+        cursor = self.connection.execute(
+            'SELECT 1 FROM files WHERE fingerprint = ?', (fingerprint,)
+        )
+        return cursor.fetchone() is not None
+
+    def get_ingested(self, report_type):
+        """
+        Measure sets ingested of the meters of a report type. They are \
+            read from the database once.
+
+        :param report_type: a string with the report type
+        :return: a set with tuples of meter name and timestamp
+        """
+        ingested = self._ingested.get(report_type)
+        if ingested is None:
+            cursor = self.connection.execute(
+                'SELECT name, timestamp FROM measures WHERE report_type = ?',
+                (report_type,)
+            )
+            ingested = self._ingested[report_type] = set(cursor)
+        return ingested
+
+    def add(self, header, filename=None, rows=0, measures=None):
+        """
+        Records a report file as ingested with the measure sets of its \
+            meters, at once, so a file is ingested or not at all.
+
+        :param header: a dict with the 'fingerprint', the 'report_type', \
+            the 'request_id' and the 'concentrator' of the file, see \
+            fingerprint_report
+        :param filename: a string with the name of the file
+        :param rows: the number of values ingested from the file
+        :param measures: a set with tuples of meter name and timestamp of \
+            the new measure sets
+        """
+        report_type = header['report_type']
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (header['fingerprint'], filename, report_type,
+                 header['request_id'], header['concentrator'], rows,
+                 datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            )
+            if measures:
+                self.connection.executemany(
+                    'INSERT OR IGNORE INTO measures VALUES (?, ?, ?)',
+                    [(report_type, name, timestamp)
+                     for name, timestamp in measures]
+                )
+        if measures:
+            self.get_ingested(report_type).update(measures)
+
+    def close(self):
+        """
+        Closes the database.
+        """
+        self.connection.close()
+
+
+def get_new_values(values, timestamp_key, ingested):
+    """
+    Filters the values of a report whose meter and timestamp weren't \
+        ingested yet, so the measure sets older than the last ones \
+        ingested, like the ones of a day uploaded again later, are kept.
+
+    :param values: a list with the values of a report
+    :param timestamp_key: a string with the key of the timestamp of the \
+        values, see TIMESTAMP_KEYS
+    :param ingested: a set with tuples of meter name and timestamp of the \
+        measure sets ingested
+    :return: a tuple with a list of the new values and a set with the \
+        tuples of meter name and timestamp of the new ones
+    """
+    new_values = []
+    measures = set()
+    for value in values:
+        timestamp = value.get(timestamp_key)
+        if timestamp is not None:
+            measure = (value.get('name'), timestamp)
+            if measure in ingested or measure in measures:
+                continue
+            measures.add(measure)
+        new_values.append(value)
+    return new_values, measures
+
+
+def ingest_reports(paths, index, report_types=None, parser='objectify',
+                   fields=None):
+    """
+    Reads the report files not ingested yet, giving only the values of \
+        every meter with a timestamp not ingested yet.
+
+    The files already ingested are recognized by their fingerprint, see \
+        fingerprint_report, and skipped without parsing them. A file is \
+        recorded in the index before its result is given, so its values \
+        are given once even if the run stops while they are used. The \
+        files with an error aren't recorded, they are read again in the \
+        next run.
+
+    :param paths: a string or a list of strings with files, directories or \
+        glob patterns
+    :param index: an IngestionIndex object
+    :param report_types: a list with the report types to read, the files \
+        of other types are skipped without parsing them. All by default
+    :param parser: the name of the parser used to read the files
+    :param fields: a list with the keys of the values to get, all of them \
+        by default. The name and the timestamp are always given
+    :return: an iterator over dicts like the ones of \
+        primestg.report.bulk.read_report_file with the 'fingerprint' of \
+        the file, whether it was 'skipped' and the number of 'duplicates' \
+        values, already ingested
+    """
+    for filename in find_report_files(paths):
+        if (report_types is not None and
+                get_report_type(filename) not in report_types):
+            continue
+        result = {
+            'filename': filename,
+            'fingerprint': None,
+            'report_type': None,
+            'skipped': False,
+            'values': [],
+            'duplicates': 0,
+            'warnings': [],
+            'errors': {},
+            'error': None,
+        }
+        try:
+            with open(filename, 'rb') as report_file:
+                content = report_file.read()
+            header = fingerprint_report(content)
+            result['fingerprint'] = header['fingerprint']
+            result['report_type'] = header['report_type']
+            if index.is_ingested(header['fingerprint']):
+                result['skipped'] = True
+                yield result
+                continue
+            timestamp_key = TIMESTAMP_KEYS.get(header['report_type'])
+            report_fields = fields
+            if fields is not None and timestamp_key is not None:
+                report_fields = list(fields) + [
+                    key for key in ('name', timestamp_key)
+                    if key not in fields
+                ]
+            report = Report(content, parser=parser, fields=report_fields)
+            parsed = report.parse()
+            values = parsed.values
+            measures = None
+            if timestamp_key is not None:
+                values, measures = get_new_values(
+                    values, timestamp_key,
+                    index.get_ingested(header['report_type'])
+                )
+            result['values'] = values
+            result['duplicates'] = len(parsed.values) - len(values)
+            result['warnings'] = parsed.warnings
+            result['errors'] = parsed.errors
+        except Exception as e:
+            result['error'] = '{}: {}'.format(type(e).__name__, e)
+            yield result
+            continue
+        index.add(header, filename, len(values), measures)
+        yield result
@@ -0,0 +1,181 @@
+# coding=utf-8
+from contextlib import contextmanager
+from timeit import default_timer
+
+from primestg.report.schema import Field, compile_schema
+
+
+STAGES = ('decompress', 'parse', 'objects', 'values', 'timestamps')
+"""
+Stages of reading a report:
+
+- decompress: reading the chunks of the file and decompressing them, the \
+    elements are the bytes of the XML read in chunks or decompressed
+- parse: building the elements of the XML, fixing the null chars, the \
+    elements are the concentrators (or remote terminal units) and the \
+    warnings the ones of the message
+- objects: creating the concentrator, meter and measure set objects, the \
+    elements are the objects
+- values: building the values of the concentrators and meters, the elements \
+    are the values and the warnings the ones of the meters
+- timestamps: converting the timestamps of the report fields, a part of \
+    values, the elements are the timestamps
+"""
+
+
+def count_warnings(warnings):
+    """
+    Counts the warnings of an element of a report.
+
+    :param warnings: a dict with lists of messages by name, like the ones \
+        of the meters, or a list of messages
+    :return: the number of messages
+    """
+    if isinstance(warnings, dict):
+        return sum(len(messages) for messages in warnings.values())
+    return len([warning for warning in warnings if warning])
+
+
+class Instrumentation(object):
+    """
+    Collects the time, the elements and the warnings of every stage of \
+        reading reports, by report type, see STAGES.
+
+    A report reads with it when passed as the instrumentation of the \
+        Report. Without it nothing is measured.
+    """
+
+    def __init__(self, callback=None):
+        """
+        Creates an Instrumentation object.
+
+        :param callback: a function called every time a stage is measured \
+            with the report type, the stage, the seconds, the elements and \
+            the warnings, to send them to a metrics system
+        :return: an Instrumentation object
+        """
+        self.callback = callback
+        self.stages = {}
+        self._pending = {}
+        self._converters = {}
+        self._extractors = {}
+
+    def record(self, report_type, stage, seconds, elements=0, warnings=0):
+        """
+        Adds a measure of a stage.
+
+        :param report_type: a string with the report type, like 'S02'
+        :param stage: a string with the stage, see STAGES
+        :param seconds: the wall time of the stage
+        :param elements: the number of elements of the stage
+        :param warnings: the number of warnings of the stage
+        """
+        totals = self.stages.get((report_type, stage))
+        if totals is None:
+            totals = self.stages[(report_type, stage)] = {
+                'seconds': 0.0,
+                'calls': 0,
+                'elements': 0,
+                'warnings': 0,
+            }
+        totals['seconds'] += seconds
+        totals['calls'] += 1
+        totals['elements'] += elements
+        totals['warnings'] += warnings
+        if self.callback is not None:
+            self.callback(report_type, stage, seconds, elements, warnings)
+
+    @contextmanager
+    def stage(self, report_type, stage):
+        """
+        Measures the time of a stage. The elements and the warnings are \
+            counted in the dict given. The time of the converters of the \
+            stage, like the timestamps, is recorded afterwards.
+
+        :param report_type: a string with the report type
+        :param stage: a string with the stage, see STAGES
+        :return: a context manager that gives a dict with the 'elements' \
+            and 'warnings' counts
+        """
+        counts = {'elements': 0, 'warnings': 0}
+        start = default_timer()
+        try:
+            yield counts
+        finally:
+            self.record(
+                report_type, stage, default_timer() - start,
+                counts['elements'], counts['warnings']
+            )
+            self._record_pending(report_type)
+
+    def _record_pending(self, report_type):
+        """
+        Records the time of the timed converters since the last time.
+
+        :param report_type: a string with the report type
+        """
+        for stage, totals in self._pending.items():
+            if totals[1]:
+                self.record(report_type, stage, totals[0], totals[1])
+                totals[0], totals[1] = 0.0, 0
+
+    def timed(self, converter):
+        """
+        Wraps a converter of a field with a stage, see schema.stage, to \
+            measure it.
+
+        :param converter: a function to convert an attribute
+        :return: a function that converts and measures the attribute
+        """
+        timed_converter = self._converters.get(converter)
+        if timed_converter is not None:
+            return timed_converter
+        totals = self._pending.setdefault(converter.stage, [0.0, 0])
+
+        def timed_converter(*args):
+            start = default_timer()
+            try:
+                return converter(*args)
+            finally:
+                totals[0] += default_timer() - start
+                totals[1] += 1
+
+        timed_converter.uses_name = getattr(converter, 'uses_name', False)
+        self._converters[converter] = timed_converter
+        return timed_converter
+
+    def extractor(self, extract):
+        """
+        Gets an extractor that measures the converters with a stage of \
+            another one. They are compiled once.
+
+        :param extract: an extractor, see schema.compile_schema
+        :return: an extractor
+        """
+        timed_extract = self._extractors.get(extract)
+        if timed_extract is None:
+            timed_extract = compile_schema([
+                Field(field.source, field.key, self.timed(field.converter))
+                if getattr(field.converter, 'stage', None) else field
+                for field in extract.fields
+            ])
+            self._extractors[extract] = timed_extract
+        return timed_extract
+
+    def as_dict(self):
+        """
+        The measures of the stages.
+
+        :return: a dict by report type with a dict by stage with the \
+            'seconds', 'calls', 'elements' and 'warnings' totals
+        """
+        result = {}
+        for (report_type, stage), totals in self.stages.items():
+            result.setdefault(report_type, {})[stage] = dict(totals)
+        return result
+
+    def reset(self):
+        """
+        Forgets the measures of the stages.
+        """
+        self.stages = {}
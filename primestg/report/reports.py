@@ -2,10 +2,23 @@ from primestg.report.base import (
     MeasureActiveReactive, MeasureActiveReactiveFloat, Parameter,
     MeterWithMagnitude, ConcentratorWithMetersWithConcentratorName,
     Concentrator, Measure, MeterWithConcentratorName, LineSupervisorDetails, RemoteTerminalUnitDetails,
-    Operation, MeasureAverageVoltageAndCurrent
+    Operation, MeasureAverageVoltageAndCurrent, ConcentratorWithMeters,
+    has_child, get_child, get_children, objectify_element, to_columns,
+    as_record, project_values, get_time_range, ValueWithTime,
+    AVERAGE_VOLTAGE_AND_CURRENT_FIELDS
+)
+from primestg.report.instrumentation import count_warnings
+from primestg.report.schema import (
+    Field, register_schema, get_extractor, active_reactive_fields,
+    get_integer_value, get_float_value, get_integer_or_zero, get_season,
+    get_boolean_value
+)
+from primestg.message import (
+    MessageS, RecordingReader, iterparse, is_seekable, release_element
 )
-from primestg.message import MessageS
 from primestg.utils import octet2name, octet2number
+from lxml.etree import XMLSyntaxError
+import six
 
 SUPPORTED_REPORTS = ['S01', 'S02', 'S04', 'S05', 'S06', 'S09', 'S12', 'S13', 'S14', 'S15',
                      'S17', 'S18', 'S21', 'S23', 'S24', 'S26', 'S27', 'S42', 'S52',
@@ -16,24 +29,255 @@ def is_supported(report_code):
     return report_code in SUPPORTED_REPORTS
 
 
-def get_integer_value(param):
-    try:
-        result = int(param)
-    except ValueError as e:
-        result = 0
-    except TypeError as e:
-        result = 0
-    return result
+def get_integer_list(param):
+    """
+    Converts a list of integers separated by commas, like the phase \
+        presence.
+
+    :param param: a string with the list
+    :return: a list of integers, 0 for the empty or invalid ones
+    """
+    return [get_integer_value(i) for i in param.split(",")]
+
+
+def get_non_empty_integer_list(param):
+    """
+    Converts a list of integers separated by commas skipping the empty ones.
+
+    :param param: a string with the list
+    :return: a list of integers, 0 for the invalid ones
+    """
+    return [get_integer_value(i) for i in param.split(",") if i != '']
+
 
+def get_hourly_value(value):
+    """
+    Gets the hourly availability of G02 as an hexadecimal string.
+
+    :param value: a string with the availability by hour, in binary (24 \
+        digits) or hexadecimal
+    :return: a string with the hexadecimal availability
+    """
+    if not value:
+        return ""
+    elif len(value) == 24:
+        return hex(int(value, 2))[2:].upper()
+    else:  # already hex
+        return value
 
-def get_float_value(param):
-    try:
-        result = float(param)
-    except ValueError as e:
-        result = 0.0
-    except TypeError as e:
-        result = 0.0
-    return result
+
+def get_phase_presence(param):
+    """
+    Converts the phase presence of report S26, 0 if it's missing.
+
+    :param param: a string with the phases separated by commas or None
+    :return: a list of integers
+    """
+    return get_integer_list(param or '0')
+
+
+to_timestamp = ValueWithTime._to_timestamp
+
+POWER_FIELDS = [
+    Field('Pimp', 'active_power_import', get_integer_value),
+    Field('Pexp', 'active_power_export', get_integer_value),
+    Field('Qimp', 'reactive_power_import', get_integer_value),
+    Field('Qexp', 'reactive_power_export', get_integer_value),
+]
+
+SWITCH_STATE_FIELDS = [
+    Field('Fc', 'meter_phase', get_integer_value),
+    Field('Eacti', 'current_switch_state', get_integer_value),
+    Field('Eanti', 'previous_switch_state', get_integer_value),
+]
+
+
+def phase_fields(phase):
+    """
+    Fields of the instant measures of a phase, for report S21.
+
+    :param phase: the number of the phase
+    :return: a list of fields
+    """
+    return [
+        Field('L{}v'.format(phase), 'voltage{}'.format(phase),
+              get_integer_value),
+        Field('L{}i'.format(phase), 'current{}'.format(phase),
+              get_float_value),
+    ] + [
+        Field('{}{}'.format(field.source, phase),
+              '{}{}'.format(field.key, phase), field.converter)
+        for field in POWER_FIELDS
+    ] + [
+        Field('PF{}'.format(phase), 'power_factor{}'.format(phase),
+              get_float_value),
+        Field('Ca{}'.format(phase), 'active_quadrant_phase{}'.format(phase),
+              get_integer_value),
+    ]
+
+
+register_schema('S01', active_reactive_fields('a', get_integer_or_zero) + [
+    Field('Fh', 'timestamp', to_timestamp),
+    Field('Fh', 'season', get_season),
+    Field('L1v', 'voltage', get_integer_value),
+    Field('L1i', 'current', get_float_value),
+] + POWER_FIELDS + [
+    Field('PF', 'power_factor', get_float_value),
+    Field('Ca', 'active_quadrant', get_integer_value),
+    Field('PP', 'phase_presence', get_integer_list),
+] + SWITCH_STATE_FIELDS)
+
+register_schema('S21', active_reactive_fields('a', get_integer_or_zero) + [
+    Field('Fh', 'timestamp', to_timestamp),
+    Field('Fh', 'season', get_season),
+    Field('Ca', 'active_quadrant', get_integer_value),
+    Field('I3', 'current_sum_3_phases', get_float_value),
+] + phase_fields(1) + phase_fields(2) + phase_fields(3) + [
+    Field('PP', 'phase_presence', get_non_empty_integer_list),
+] + SWITCH_STATE_FIELDS)
+
+register_schema('S26', active_reactive_fields('a', get_integer_or_zero) + [
+    Field('Fh', 'timestamp', to_timestamp),
+    Field('Fh', 'season', get_season),
+    Field('Ca', 'active_quadrant', get_integer_value),
+    Field('I3', 'current_sum_3_phases', get_float_value),
+] + phase_fields(1)[:2] + [
+    Field(field.source, '{}1'.format(field.key), field.converter)
+    for field in POWER_FIELDS
+] + [
+    Field('PF', 'power_factor1', get_float_value),
+] + phase_fields(2)[:2] + phase_fields(3)[:2] + [
+    Field('PP', 'phase_presence', get_phase_presence),
+] + SWITCH_STATE_FIELDS)
+
+S26_MISSING_PHASES_VALUES = dict(
+    [('active_quadrant_phase1', 0)] + [
+        ('{}{}'.format(key, phase), value)
+        for phase in (2, 3)
+        for key, value in (
+            ('active_power_import', 0), ('active_power_export', 0),
+            ('reactive_power_import', 0), ('reactive_power_export', 0),
+            ('power_factor', 0.0), ('active_quadrant_phase', 0),
+        )
+    ]
+)
+"""
+Values of report S26 that the meters don't give, the measures of the \
+    phases besides the voltage and the current of the phases 2 and 3.
+"""
+
+register_schema('S02', active_reactive_fields('', float) + [
+    Field('Fh', 'timestamp', to_timestamp),
+    Field('Fh', 'season', get_season),
+    Field('Bc', 'bc', None),
+])
+
+register_schema('S04', [
+    Field('Fhi', 'date_begin', to_timestamp),
+    Field('Fhf', 'date_end', to_timestamp),
+    Field('Ctr', 'contract', int),
+    Field('Pt', 'period', int),
+    Field('Mx', 'max', int),
+    Field('Fx', 'date_max', to_timestamp),
+])
+
+register_schema('S05', [
+    Field('Fh', 'date_begin', to_timestamp),
+    Field('Fh', 'date_end', to_timestamp),
+    Field('Ctr', 'contract', int),
+    Field('Pt', 'period', int),
+])
+
+register_schema('S27', [
+    Field('Fh', 'date_begin', to_timestamp),
+    Field('Fh', 'date_end', to_timestamp),
+    Field('Ctr', 'contract', int),
+    Field('Pt', 'period', int),
+    Field('Mx', 'max', int),
+    Field('Fx', 'date_max', to_timestamp),
+])
+
+register_schema('S14', AVERAGE_VOLTAGE_AND_CURRENT_FIELDS + [
+    Field('Fh', 'timestamp', to_timestamp),
+    Field('Fh', 'season', get_season),
+    Field('Bc', 'bc', None),
+    Field('Simp', 'simp', int),
+    Field('Sexp', 'sexp', int),
+])
+
+register_schema('G02', [
+    Field('Fh', 'timestamp', to_timestamp),
+    Field('Fh', 'season', get_season),
+    Field('Atime', 'atime', get_integer_value),
+    Field('Nchanges', 'nchanges', get_integer_value),
+    Field('Aconc', 'aconc', get_integer_value),
+    Field('Atimeperc', 'atimeperc', get_float_value),
+    Field('Ahourly', 'ahourly', get_hourly_value),
+])
+
+register_schema('S42', [
+    Field('Fh', 'Fh', to_timestamp),
+] + [
+    Field(source, source, None)
+    for source in ('Operation', 'obis', 'class', 'element', 'data', 'result')
+])
+
+register_schema('S52', active_reactive_fields('', float) + [
+    Field('Fh', 'timestamp', to_timestamp),
+    Field('Bc', 'bc', None),
+])
+
+register_schema('S09', [
+    Field('Fh', 'timestamp', to_timestamp),
+    Field('Et', 'event_group', int),
+    Field('Fh', 'season', get_season),
+    Field('C', 'event_code', int),
+])
+
+register_schema('S06', [
+    Field('Fh', 'timestamp', to_timestamp),
+    Field('Fh', 'season', get_season),
+    Field('NS', 'serial_number', None),
+    Field('Fab', 'manufacturer', None),
+    Field('Mod', 'model_type', None),
+    Field('Af', 'manufacturing_year', get_integer_value),
+    Field('Te', 'equipment_type', None),
+    Field('Vf', 'firmware_version', None),
+    Field('VPrime', 'prime_firmware_version', None),
+    Field('Pro', 'protocol', None),
+    Field('Idm', 'id_multicast', None),
+    Field('Mac', 'mac', None),
+    Field('Tp', 'primary_voltage', get_integer_value),
+    Field('Ts', 'secondary_voltage', get_integer_value),
+    Field('Ip', 'primary_current', get_integer_value),
+    Field('Is', 'secondary_current', get_integer_value),
+    Field('Usag', 'time_threshold_voltage_sags', get_integer_value),
+    Field('Uswell', 'time_threshold_voltage_swells', get_integer_value),
+    Field('Per', 'load_profile_period', get_integer_value),
+    Field('Dctcp', 'demand_close_contracted_power', None),
+    Field('Vr', 'reference_voltage', get_integer_value),
+    Field('Ut', 'long_power_failure_threshold', get_integer_value),
+    Field('UsubT', 'voltage_sag_threshold', None),
+    Field('UsobT', 'voltage_swell_threshold', None),
+    Field('UcorteT', 'voltage_cut-off_threshold', None),
+    Field('AutMothBill', 'automatic_monthly_billing', get_boolean_value),
+    Field('ScrollDispMode', 'scroll_display_mode', None),
+    Field('ScrollDispTime', 'time_scroll_display', get_integer_value),
+])
+
+register_schema('S18', [
+    Field('Fh', 'order_datetime', to_timestamp),
+    Field('Orden', 'orden', get_integer_value),
+])
+
+register_schema('G01', [
+    Field('Fh', 'timestamp', to_timestamp),
+    Field('Fh', 'season', get_season),
+    Field('Amed', 'amed', get_integer_value),
+    Field('Amax', 'amax', get_integer_value),
+    Field('Tot', 'tot', get_integer_value),
+    Field('Aperc', 'aperc', get_float_value),
+])
 
 
 class MeasureS01(MeasureActiveReactive):
@@ -48,25 +292,8 @@ class MeasureS01(MeasureActiveReactive):
         """
         values = {}
         try:
-            get = self.objectified.get
-            values = self.active_reactive(self.objectified, 'a')
-            values.update(
-                {
-                    'timestamp': self._get_timestamp('Fh'),
-                    'season': self.objectified.get('Fh')[-1:],
-                    'voltage': get_integer_value(get('L1v')),
-                    'current': get_float_value(get('L1i')),
-                    'active_power_import': get_integer_value(get('Pimp')),
-                    'active_power_export': get_integer_value(get('Pexp')),
-                    'reactive_power_import': get_integer_value(get('Qimp')),
-                    'reactive_power_export': get_integer_value(get('Qexp')),
-                    'power_factor': get_float_value(get('PF')),
-                    'active_quadrant': get_integer_value(get('Ca')),
-                    'phase_presence': [get_integer_value(i) for i in (get('PP')).split(",")],
-                    'meter_phase': get_integer_value(get('Fc')),
-                    'current_switch_state': get_integer_value(get('Eacti')),
-                    'previous_switch_state': get_integer_value(get('Eanti')),
-                }
+            values = self.get_extractor('S01')(
+                self.objectified
             )
         except Exception as e:
             self._warnings.append('ERROR: Thrown exception: {}'.format(e))
@@ -86,47 +313,8 @@ class MeasureS21(MeasureActiveReactive):
         """
         values = {}
         try:
-            get = self.objectified.get
-            values = self.active_reactive(self.objectified, 'a')
-            values.update(
-                {
-                    'timestamp': self._get_timestamp('Fh'),
-                    'season': self.objectified.get('Fh')[-1:],
-                    'active_quadrant': get_integer_value(get('Ca')),
-                    'current_sum_3_phases': get_float_value(get('I3')),
-
-                    'voltage1': get_integer_value(get('L1v')),
-                    'current1': get_float_value(get('L1i')),
-                    'active_power_import1': get_integer_value(get('Pimp1')),
-                    'active_power_export1': get_integer_value(get('Pexp1')),
-                    'reactive_power_import1': get_integer_value(get('Qimp1')),
-                    'reactive_power_export1': get_integer_value(get('Qexp1')),
-                    'power_factor1': get_float_value(get('PF1')),
-                    'active_quadrant_phase1': get_integer_value(get('Ca1')),
-
-                    'voltage2': get_integer_value(get('L2v')),
-                    'current2': get_float_value(get('L2i')),
-                    'active_power_import2': get_integer_value(get('Pimp2')),
-                    'active_power_export2': get_integer_value(get('Pexp2')),
-                    'reactive_power_import2': get_integer_value(get('Qimp2')),
-                    'reactive_power_export2': get_integer_value(get('Qexp2')),
-                    'power_factor2': get_float_value(get('PF2')),
-                    'active_quadrant_phase2': get_integer_value(get('Ca2')),
-
-                    'voltage3': get_integer_value(get('L3v')),
-                    'current3': get_float_value(get('L3i')),
-                    'active_power_import3': get_integer_value(get('Pimp3')),
-                    'active_power_export3': get_integer_value(get('Pexp3')),
-                    'reactive_power_import3': get_integer_value(get('Qimp3')),
-                    'reactive_power_export3': get_integer_value(get('Qexp3')),
-                    'power_factor3': get_float_value(get('PF3')),
-                    'active_quadrant_phase3': get_integer_value(get('Ca3')),
-
-                    'phase_presence': [get_integer_value(i) for i in (get('PP')).split(",") if i != ''],
-                    'meter_phase': get_integer_value(get('Fc')),
-                    'current_switch_state': get_integer_value(get('Eacti')),
-                    'previous_switch_state': get_integer_value(get('Eanti')),
-                }
+            values = self.get_extractor('S21')(
+                self.objectified
             )
         except Exception as e:
             self._warnings.append('ERROR: Thrown exception: {}'.format(e))
@@ -137,6 +325,22 @@ class MeasureS26(MeasureActiveReactive):
     """
     Class for a set of measures of report S26.
     """
+
+    def get_data(self):
+        """
+        Gets the measures of the pairs of DataId and DataValue children \
+            with the attributes, as read by the S26 schema.
+
+        :return: a dict with the text of the values by their id and the \
+            attributes
+        """
+        data = dict(self.objectified.attrib)
+        keys = self.objectified.iterchildren(tag='DataId')
+        values = self.objectified.iterchildren(tag='DataValue')
+        for key, value in zip(keys, values):
+            data[key.text] = value.text or ''
+        return data
+
     @property
     def values(self):
         """
@@ -145,55 +349,8 @@ class MeasureS26(MeasureActiveReactive):
         """
         values = {}
         try:
-            xml_keys = getattr(self.objectified, 'DataId', '')
-            xml_values = getattr(self.objectified, 'DataValue', '')
-            temp_values = {}
-            for idx in range(0, len(xml_keys)):
-                temp_values.update({
-                    xml_keys[idx]: str(xml_values[idx])
-                })
-
-            values = self.active_reactive(temp_values, 'a')
-            values.update(
-                {
-                    'timestamp': self._get_timestamp('Fh'),
-                    'season': self.objectified.get('Fh')[-1:],
-                    'active_quadrant': get_integer_value(temp_values.get('Ca', 0)),
-                    'current_sum_3_phases': get_float_value(temp_values.get('I3', 0.0)),
-
-                    'voltage1': get_integer_value(temp_values.get('L1v', 0)),
-                    'current1': get_float_value(temp_values.get('L1i', 0.0)),
-                    'active_power_import1': get_integer_value(temp_values.get('Pimp', 0)),
-                    'active_power_export1': get_integer_value(temp_values.get('Pexp', 0)),
-                    'reactive_power_import1': get_integer_value(temp_values.get('Qimp', 0)),
-                    'reactive_power_export1': get_integer_value(temp_values.get('Qexp', 0)),
-                    'power_factor1': get_float_value(temp_values.get('PF', 0.0)),
-                    'active_quadrant_phase1': 0,
-
-                    'voltage2': get_integer_value(temp_values.get('L2v', 0)),
-                    'current2': get_float_value(temp_values.get('L2i', 0.0)),
-                    'active_power_import2': 0,
-                    'active_power_export2': 0,
-                    'reactive_power_import2': 0,
-                    'reactive_power_export2': 0,
-                    'power_factor2': 0.0,
-                    'active_quadrant_phase2': 0,
-
-                    'voltage3': get_integer_value(temp_values.get('L3v', 0)),
-                    'current3': get_float_value(temp_values.get('L3i', 0.0)),
-                    'active_power_import3': 0,
-                    'active_power_export3': 0,
-                    'reactive_power_import3': 0,
-                    'reactive_power_export3': 0,
-                    'power_factor3': 0.0,
-                    'active_quadrant_phase3': 0,
-
-                    'phase_presence': [get_integer_value(i) for i in (temp_values.get('PP', '0')).split(",")],
-                    'meter_phase': get_integer_value(temp_values.get('Fc', 0)),
-                    'current_switch_state': get_integer_value(temp_values.get('Eacti', 0)),
-                    'previous_switch_state': get_integer_value(temp_values.get('Eanti', 0)),
-                }
-            )
+            values = dict(S26_MISSING_PHASES_VALUES)
+            values.update(self.get_extractor('S26')(self.get_data()))
         except Exception as e:
             self._warnings.append('ERROR: Thrown exception: {}'.format(e))
             return []
@@ -214,13 +371,8 @@ class MeasureS02(MeasureActiveReactiveFloat):
         """
         values = {}
         try:
-            values = self.active_reactive(self.objectified, '')
-            values.update(
-                {
-                    'timestamp': self._get_timestamp('Fh'),
-                    'season': self.objectified.get('Fh')[-1:],
-                    'bc': self.objectified.get('Bc')
-                }
+            values = self.get_extractor('S02')(
+                self.objectified
             )
         except Exception as e:
             self._warnings.append('ERROR: Thrown exception: {}'.format(e))
@@ -228,12 +380,39 @@ class MeasureS02(MeasureActiveReactiveFloat):
 
         return [values]
 
+    def row(self):
+        """
+        Set of measures of report S02 as a tuple in the order of \
+            MeterS02.columns, without the magnitude. The timestamp is raw, \
+            see decode_timestamps.
+
+        :return: a tuple with a set of measures of report S02
+        """
+        try:
+            get = self.objectified.get
+            return (
+                get('Fh'),
+                get('Fh')[-1:],
+                int(get('Bc'), 16),
+                float(get('AI')),
+                float(get('AE')),
+                float(get('R1')),
+                float(get('R2')),
+                float(get('R3')),
+                float(get('R4')),
+            )
+        except Exception as e:
+            self._warnings.append(self.row_error.format(e))
+            return None
+
 
 class MeasureS04(MeasureActiveReactive):
     """
     Class for a set of measures of report S04.
     """
 
+    timestamp_attribute = 'Fhi'
+
     @property
     def values(self):
         """
@@ -243,16 +422,11 @@ class MeasureS04(MeasureActiveReactive):
         """
         values = []
         try:
-            common_values = {
-                'type': 'month',
-                'date_begin': self._get_timestamp('Fhi'),
-                'date_end': self._get_timestamp('Fhf'),
-                'contract': int(self.objectified.get('Ctr')),
-                'period': int(self.objectified.get('Pt')),
-                'max': int(self.objectified.get('Mx')),
-                'date_max': self._get_timestamp('Fx')
-            }
-            for s04_values in self.objectified.Value:
+            common_values = {'type': 'month'}
+            common_values.update(self.get_extractor('S04')(
+                self.objectified
+            ))
+            for s04_values in get_children(self.objectified, 'Value'):
                 v = common_values.copy()
                 if s04_values.get('AIa'):
                     measure_type = 'a'
@@ -280,17 +454,12 @@ class MeasureS05(MeasureActiveReactive):
         """
         values = []
         try:
-            timestamp = self._get_timestamp('Fh')
-            v = {
-                'type': 'day',
-                'value': 'a',
-                'date_begin': timestamp,
-                'date_end': timestamp,
-                'contract': int(self.objectified.get('Ctr')),
-                'period': int(self.objectified.get('Pt')),
-            }
+            v = {'type': 'day', 'value': 'a'}
+            v.update(self.get_extractor('S05')(
+                self.objectified
+            ))
 
-            for s05_values in self.objectified.Value:
+            for s05_values in get_children(self.objectified, 'Value'):
                 v.update(self.active_reactive(s05_values, 'a'))
                 values.append(v)
         except Exception as e:
@@ -313,15 +482,8 @@ class MeasureS14(MeasureAverageVoltageAndCurrent):
         """
         values = []
         try:
-            v = self.average_voltage_and_current(self.objectified)
-            v.update(
-                {
-                    'timestamp': self._get_timestamp('Fh'),
-                    'season': self.objectified.get('Fh')[-1:],
-                    'bc': self.objectified.get('Bc'),
-                    'simp': int(self.objectified.get('Simp')),
-                    'sexp': int(self.objectified.get('Sexp'))
-                }
+            v = self.get_extractor('S14')(
+                self.objectified
             )
             values.append(v)
 
@@ -345,20 +507,12 @@ class MeasureS27(MeasureActiveReactive):
         """
         values = []
         try:
-            timestamp = self._get_timestamp('Fh')
-            timestamp_max = self._get_timestamp('Fx')
-            v = {
-                'type': 'manual',
-                'value': 'a',
-                'date_begin': timestamp,
-                'date_end': timestamp,
-                'contract': int(self.objectified.get('Ctr')),
-                'period': int(self.objectified.get('Pt')),
-                'max': int(self.objectified.get('Mx')),
-                'date_max': timestamp_max
-            }
+            v = {'type': 'manual', 'value': 'a'}
+            v.update(self.get_extractor('S27')(
+                self.objectified
+            ))
 
-            for s27_values in self.objectified.Value:
+            for s27_values in get_children(self.objectified, 'Value'):
                 v.update(self.active_reactive(s27_values, 'a'))
                 values.append(v)
         except Exception as e:
@@ -369,33 +523,46 @@ class MeasureS27(MeasureActiveReactive):
 
 class MeasureG02(Measure):
 
+    row_error = 'ERROR: Reading G02 report. Thrown exception: {}'
+
     def get_hourly_value(self, value):
-        if not value:
-            return ""
-        elif len(value) == 24:
-            return hex(int(value, 2))[2:].upper()
-        else:  # already hex
-            return value
+        return get_hourly_value(value)
 
     @property
     def values(self):
         try:
-            get = self.objectified.get
-            values = {
-                'timestamp': self._get_timestamp('Fh'),
-                'season': self.objectified.get('Fh')[-1:],
-                'atime': get_integer_value(get('Atime')),
-                'nchanges': get_integer_value(get('Nchanges')),
-                'aconc': get_integer_value(get('Aconc')),
-                'atimeperc': get_float_value(get('Atimeperc')),
-                'ahourly': self.get_hourly_value(get('Ahourly')),
-            }
+            values = self.get_extractor('G02')(
+                self.objectified
+            )
         except Exception as e:
             self._warnings.append('ERROR: Reading G02 report. Thrown '
                                   'exception: {}'.format(e))
             return []
         return [values]
 
+    def row(self):
+        """
+        Set of measures of report G02 as a tuple in the order of \
+            MeterG02.columns. The hourly availability is an integer and the \
+            timestamp is raw, see decode_timestamps.
+
+        :return: a tuple with a set of measures of report G02
+        """
+        try:
+            get = self.objectified.get
+            return (
+                get('Fh'),
+                get('Fh')[-1:],
+                get_integer_value(get('Atime')),
+                get_integer_value(get('Nchanges')),
+                get_integer_value(get('Aconc')),
+                get_float_value(get('Atimeperc')),
+                int(self.get_hourly_value(get('Ahourly')) or '0', 16),
+            )
+        except Exception as e:
+            self._warnings.append(self.row_error.format(e))
+            return None
+
 class OperationS42(Operation):
     """
     Class for a set of measures of report S42.
@@ -409,15 +576,9 @@ class OperationS42(Operation):
         """
         values = []
         try:
-            common_values = {
-                "Fh": self._get_timestamp('Fh'),
-                "Operation": self.objectified.get('Operation'),
-                "obis": self.objectified.get('obis'),
-                "class": self.objectified.get('class'),
-                "element": self.objectified.get('element'),
-                "data": self.objectified.get('data'),
-                "result": self.objectified.get('result'),
-            }
+            common_values = self.get_extractor('S42')(
+                self.objectified
+            )
             values.append(common_values)
         except Exception as e:
             values.append(['ERROR: Thrown exception: {}'.format(e)])
@@ -438,12 +599,8 @@ class MeasureS52(MeasureActiveReactiveFloat):
         :return: a dict with a set of measures of report S52
         """
         try:
-            values = self.active_reactive(self.objectified, '')
-            values.update(
-                {
-                    'timestamp': self._get_timestamp('Fh'),
-                    'bc': self.objectified.get('Bc')
-                }
+            values = self.get_extractor('S52')(
+                self.objectified
             )
         except Exception as e:
             self._warnings.append('ERROR: Thrown exception: {}'.format(e))
@@ -466,18 +623,14 @@ class MeasureEvents(Measure):
         """
         values = []
         try:
-            timestamp = self._get_timestamp('Fh')
-            v = {
-                'timestamp': timestamp,
-                'event_group': int(self.objectified.get('Et')),
-                'season': self.objectified.get('Fh')[-1:],
-                'event_code': int(self.objectified.get('C')),
-            }
+            v = self.get_extractor('S09')(
+                self.objectified
+            )
             data = ''
-            d1s = ['D1: {}'.format(d)
-                   for d in getattr(self.objectified, 'D1', [])]
-            d2s = ['D2: {}'.format(d)
-                   for d in getattr(self.objectified, 'D2', [])]
+            d1s = ['D1: {}'.format(objectify_element(d))
+                   for d in self.objectified.iterchildren(tag='D1')]
+            d2s = ['D2: {}'.format(objectify_element(d))
+                   for d in self.objectified.iterchildren(tag='D2')]
             data = '\n'.join(d1s + d2s)
             if data:
                 v.update({'data': data})
@@ -581,42 +734,16 @@ class ParameterS06(Parameter):
         """
         values = {}
         try:
-            get = self.objectified.get
-
+            parameters = get_extractor('S06', self.report_version)(
+                self.objectified
+            )
             values = {
                 'request_id': self.request_id,
                 'version': self.report_version,
                 'concentrator': self.concentrator_name,
                 'meter': self.meter_name,
-                'timestamp': self._get_timestamp('Fh'),
-                'season': get('Fh')[-1:],
-                'serial_number': get('NS'),
-                'manufacturer': get('Fab'),
-                'model_type': get('Mod'),
-                'manufacturing_year': get_integer_value(get('Af')),
-                'equipment_type': get('Te'),
-                'firmware_version': get('Vf'),
-                'prime_firmware_version': get('VPrime'),
-                'protocol': get('Pro'),
-                'id_multicast': get('Idm'),
-                'mac': get('Mac'),
-                'primary_voltage': get_integer_value(get('Tp')),
-                'secondary_voltage': get_integer_value(get('Ts')),
-                'primary_current': get_integer_value(get('Ip')),
-                'secondary_current': get_integer_value(get('Is')),
-                'time_threshold_voltage_sags': get_integer_value(get('Usag')),
-                'time_threshold_voltage_swells': get_integer_value(get('Uswell')),
-                'load_profile_period': get_integer_value(get('Per')),
-                'demand_close_contracted_power': get('Dctcp'),
-                'reference_voltage': get_integer_value(get('Vr')),
-                'long_power_failure_threshold': get_integer_value(get('Ut')),
-                'voltage_sag_threshold': get('UsubT'),
-                'voltage_swell_threshold': get('UsobT'),
-                'voltage_cut-off_threshold': get('UcorteT'),
-                'automatic_monthly_billing': self.get_boolean('AutMothBill'),
-                'scroll_display_mode': get('ScrollDispMode'),
-                'time_scroll_display': get_integer_value(get('ScrollDispTime'))
             }
+            values.update(parameters)
         except Exception as e:
             self._warnings.append('ERROR: Cnc({}), Meter({}). Thrown '
                                   'exception: {}'.format(self.concentrator_name,
@@ -648,23 +775,22 @@ class ParameterS12(Parameter):
         return values
 
     def _get_v4_S12_values(self):
-        get = self.objectified.get
-        values = {}
-        if hasattr(self.objectified, 'INFO'):
-            get_info = self.objectified.INFO.get
         s12 = self.objectified
-        get_s12 = s12.get
-
-        get_info = s12.INFO.get if hasattr(s12, 'INFO') else lambda x: None
-        get_general = s12.GENERAL.get if hasattr(s12, 'GENERAL') else lambda x: None
-        get_network = s12.NETWORK.get if hasattr(s12, 'NETWORK') else lambda x: None
-        get_access = s12.ACCESS.get if hasattr(s12, 'ACCESS') else lambda x: None
-        get_time = s12.TIME.get if hasattr(s12, 'TIME') else lambda x: None
-        get_dlms = s12.DLMS.get if hasattr(s12, 'DLMS') else lambda x: None
-        get_task = s12.TASK.get if hasattr(s12, 'TASK') else lambda x: None
-        get_events = s12.EVENTS.get if hasattr(s12, 'EVENTS') else lambda x: None
-        get_snmp = s12.SNMP.get if hasattr(s12, 'SNMP') else lambda x: None
-        get_ftpcycles = s12.FTPcycles.get if hasattr(s12, 'FTPcycles') else lambda x: None
+
+        def child_get(tag):
+            child = s12.find(tag)
+            return child.get if child is not None else lambda x: None
+
+        get_info = child_get('INFO')
+        get_general = child_get('GENERAL')
+        get_network = child_get('NETWORK')
+        get_access = child_get('ACCESS')
+        get_time = child_get('TIME')
+        get_dlms = child_get('DLMS')
+        get_task = child_get('TASK')
+        get_events = child_get('EVENTS')
+        get_snmp = child_get('SNMP')
+        get_ftpcycles = child_get('FTPcycles')
 
         values = {
             'date': self._get_timestamp('Fh'),
@@ -678,7 +804,7 @@ class ParameterS12(Parameter):
             'battery_mon': self.to_integer(get_info('Bat')),
             'communication': get_info('Com'),
             'rev_conf': get_info('revConf'),
-            'date_conf': self._get_timestamp('dateConf', element=s12.INFO),
+            'date_conf': self._get_timestamp('dateConf', element=get_child(s12, 'INFO')),
             'nom_instal': get_info('NomInstal'),
             'cod_instal': get_info('CodInstal'),
 
@@ -813,8 +939,8 @@ class ParameterS12(Parameter):
         }
 
         # --- MULTI_STG ---
-        if hasattr(s12, 'MULTI_STG') and hasattr(s12.MULTI_STG, 'STG'):
-            for stg_node in s12.MULTI_STG.STG:
+        if has_child(s12, 'MULTI_STG'):
+            for stg_node in get_child(s12, 'MULTI_STG').iterchildren(tag='STG'):
                 values.update({
                     'stg_id': stg_node.get('STGid'),
                     'port_stg': self.to_integer(stg_node.get('PortSTG')),
@@ -840,8 +966,8 @@ class ParameterS12(Parameter):
                 })
 
         # --- DLMSovTCP ---
-        if hasattr(s12, 'DLMSovTCP') and hasattr(s12.DLMSovTCP, 'DlmsC'):
-            for dlmsc_node in s12.DLMSovTCP.DlmsC:
+        if has_child(s12, 'DLMSovTCP'):
+            for dlmsc_node in get_child(s12, 'DLMSovTCP').iterchildren(tag='DlmsC'):
                 values.update({
                     'dlms_c_id': self.to_integer(dlmsc_node.get('DlmsC_id')),
                     'dlms_c_ip_addr': dlmsc_node.get('DlmsC_ip_Addr'),
@@ -851,8 +977,8 @@ class ParameterS12(Parameter):
                 })
 
         # --- Other ---
-        if hasattr(s12, 'Other') and hasattr(s12.Other, 'Parameter'):
-            for param_node in s12.Other.Parameter:
+        if has_child(s12, 'Other'):
+            for param_node in get_child(s12, 'Other').iterchildren(tag='Parameter'):
                 values['other'].update({
                     param_node.get('Key'): param_node.get('Value')
                 })
@@ -943,9 +1069,9 @@ class ParameterS12(Parameter):
             'session_timeout': session_timeout,
             'max_sessions': max_sessions
         }
-        if hasattr(self.objectified, 'TP'):
+        if has_child(self.objectified, 'TP'):
             tasks = []
-            for task in self.objectified.TP:
+            for task in self.objectified.iterchildren(tag='TP'):
                 task_values = {
                     'name': task.get('TpTar'),
                     'priority': int(task.get('TpPrio')),
@@ -955,17 +1081,16 @@ class ParameterS12(Parameter):
                     'meters': task.get('TpMet'),
                 }
                 task_data_values = []
-                if getattr(task, 'TpPro', None) is not None:
-                    for task_data in task.TpPro:
-                        task_data_value = {
-                            'request': task_data.get('TpReq'),
-                            'stg_send':
-                                self.get_boolean('TpSend', element=task_data),
-                            'store':
-                                self.get_boolean('TpStore', element=task_data),
-                            'attributes': task_data.get('TpAttr'),
-                        }
-                        task_data_values.append(task_data_value)
+                for task_data in task.iterchildren(tag='TpPro'):
+                    task_data_value = {
+                        'request': task_data.get('TpReq'),
+                        'stg_send':
+                            self.get_boolean('TpSend', element=task_data),
+                        'store':
+                            self.get_boolean('TpStore', element=task_data),
+                        'attributes': task_data.get('TpAttr'),
+                    }
+                    task_data_values.append(task_data_value)
                 task_values['task_data'] = task_data_values
                 tasks.append(task_values)
             values['tasks'] = tasks
@@ -996,8 +1121,8 @@ class ParameterS23(Parameter):
             'Contract3': 'contrato3',
         }
         for tag, key in CONTRACT_KEY_DICTS.items():
-            if getattr(obj, tag, None) is not None:
-                for obj_data in getattr(obj, tag):
+            if has_child(obj, tag):
+                for obj_data in obj.iterchildren(tag=tag):
                     obj_contrato_value = {
                         'tr1': int(obj_data.get('TR1')),
                         'tr2': int(obj_data.get('TR2')),
@@ -1016,8 +1141,8 @@ class ParameterS23(Parameter):
                     )
                 obj_values.update({key: obj_contrato_value})
 
-        if getattr(obj, 'PResidual', None) is not None:
-            for obj_data in obj.PResidual:
+        if has_child(obj, 'PResidual'):
+            for obj_data in obj.iterchildren(tag='PResidual'):
                 obj_presidual_value = {
                     'tr1': int(obj_data.get('TR1')),
                     'tr2': int(obj_data.get('TR2')),
@@ -1037,9 +1162,9 @@ class ParameterS23(Parameter):
     @staticmethod
     def get_calendars(obj, is_active_calendar=False):
         obj_values = {}
-        if getattr(obj, 'Contract', None) is not None:
+        if has_child(obj, 'Contract'):
             contracts = []
-            for i, contract_obj in enumerate(obj.Contract):
+            for i, contract_obj in enumerate(obj.iterchildren(tag='Contract')):
                 contract = {
                     'c': contract_obj.get('c'),
                     'calendar_type': contract_obj.get('CalendarType'),
@@ -1047,9 +1172,9 @@ class ParameterS23(Parameter):
                     'act_date': Measure(contract_obj)._get_timestamp('ActDate'),
                     'is_active_calendar': is_active_calendar
                 }
-                if getattr(contract_obj, 'Season', None) is not None:
+                if has_child(contract_obj, 'Season'):
                     seasons = []
-                    for x, season_obj in enumerate(contract_obj.Season):
+                    for x, season_obj in enumerate(contract_obj.iterchildren(tag='Season')):
                         season = {
                             'name': season_obj.get('Name'),
                             'start': season_obj.get('Start'),
@@ -1057,9 +1182,9 @@ class ParameterS23(Parameter):
                         }
                         seasons.append(season)
                     contract.update({'seasons': seasons})
-                if getattr(contract_obj, 'Week', None) is not None:
+                if has_child(contract_obj, 'Week'):
                     weeks = []
-                    for x, week_obj in enumerate(contract_obj.Week):
+                    for x, week_obj in enumerate(contract_obj.iterchildren(tag='Week')):
                         week_days = week_obj.get('Week')
                         week = {
                             'name': week_obj.get('Name'),
@@ -1071,9 +1196,9 @@ class ParameterS23(Parameter):
                             week.update({day: week_days[index:index+2]})
                         weeks.append(week)
                     contract.update({'weeks': weeks})
-                if getattr(contract_obj, 'SpecialDays', None) is not None:
+                if has_child(contract_obj, 'SpecialDays'):
                     special_days = []
-                    for x, special_day_obj in enumerate(contract_obj.SpecialDays):
+                    for x, special_day_obj in enumerate(contract_obj.iterchildren(tag='SpecialDays')):
                         special_day = {
                             'dt': Measure(special_day_obj)._get_special_days('DT'),
                             'dt_card': False if special_day_obj.get('DTCard', 'N') == 'N' else True,
@@ -1081,14 +1206,14 @@ class ParameterS23(Parameter):
                         }
                         special_days.append(special_day)
                     contract.update({'special_days': special_days})
-                if getattr(contract_obj, 'Day', None) is not None:
+                if has_child(contract_obj, 'Day'):
                     days = []
-                    for x, day_obj in enumerate(contract_obj.Day):
+                    for x, day_obj in enumerate(contract_obj.iterchildren(tag='Day')):
                         day = {'day_id': day_obj.get('id', None)}
                         changes = []
-                        if contract_obj.Day[x].getchildren():
-                            for y, change_obj in enumerate(contract_obj.Day[x].Change):
-                                if getattr(day_obj, 'Change', None) is not None:
+                        if day_obj.getchildren():
+                            for y, change_obj in enumerate(get_children(day_obj, 'Change')):
+                                if has_child(day_obj, 'Change'):
                                     change = {
                                         'hour': octet2number(change_obj.get('Hour', '00')[0:2]),
                                         'tariffrate': change_obj.get('TariffRate'),
@@ -1111,26 +1236,26 @@ class ParameterS23(Parameter):
         values = {}
         try:
             values.update({'date': self._get_timestamp('Fh')})
-            if hasattr(self.objectified, 'PCact'):
-                pc_act = self.objectified.PCact
+            if has_child(self.objectified, 'PCact'):
+                pc_act = get_child(self.objectified, 'PCact')
                 obj_values = self.get_pc(pc_act)
                 values['pc_act'] = obj_values
             else:
                 values['pc_act'] = 'supervisor'
-            if hasattr(self.objectified, 'PCLatent'):
-                pc_lat = self.objectified.PCLatent
+            if has_child(self.objectified, 'PCLatent'):
+                pc_lat = get_child(self.objectified, 'PCLatent')
                 obj_values = self.get_pc(pc_lat)
                 values['pc_latent'] = obj_values
             else:
                 values['pc_act'] = 'supervisor'
-            if hasattr(self.objectified, 'ActiveCalendars'):
-                active_calendars = self.objectified.ActiveCalendars
+            if has_child(self.objectified, 'ActiveCalendars'):
+                active_calendars = get_child(self.objectified, 'ActiveCalendars')
                 obj_values = self.get_calendars(active_calendars, True)
                 values['active_calendars'] = obj_values
             else:
                 values['active_calendars'] = []
-            if hasattr(self.objectified, 'LatentCalendars'):
-                latent_calendars = self.objectified.LatentCalendars
+            if has_child(self.objectified, 'LatentCalendars'):
+                latent_calendars = get_child(self.objectified, 'LatentCalendars')
                 obj_values = self.get_calendars(latent_calendars, False)
                 values['latent_calendars'] = obj_values
             else:
@@ -1220,7 +1345,7 @@ class ParameterS24(Parameter):
                 'cnc_name': self.concentrator_name,
                 'meters': []
             }
-            for s24_meters in self.objectified.Meter:
+            for s24_meters in get_children(self.objectified, 'Meter'):
                 values['meters'].append(self.meter_availability(s24_meters))
         except Exception as e:
             self._warnings.append('ERROR: Thrown exception: {}'.format(e))
@@ -1236,16 +1361,10 @@ class ParameterG01(Parameter):
         :return: a dict with a set of parameters of report G01
         """
         values = {}
-        get = self.objectified.get
         try:
-            values = {
-                'timestamp': self._get_timestamp('Fh'),
-                'season': self.objectified.get('Fh')[-1:],
-                'amed': get_integer_value(get('Amed')),
-                'amax': get_integer_value(get('Amax')),
-                'tot': get_integer_value(get('Tot')),
-                'aperc': get_float_value(get('Aperc')),
-            }
+            values = get_extractor('G01', self.report_version)(
+                self.objectified
+            )
         except Exception as e:
             self._warnings.append('ERROR: Reading G01 report. Thrown '
                                   'exception: {}'.format(e))
@@ -1333,10 +1452,10 @@ class ParameterConcentratorEvents(Parameter):
             }
 
             data = ''
-            d1s = ['D1: {}'.format(d)
-                   for d in getattr(self.objectified, 'D1', [])]
-            d2s = ['D2: {}'.format(d)
-                   for d in getattr(self.objectified, 'D2', [])]
+            d1s = ['D1: {}'.format(objectify_element(d))
+                   for d in self.objectified.iterchildren(tag='D1')]
+            d2s = ['D2: {}'.format(objectify_element(d))
+                   for d in self.objectified.iterchildren(tag='D2')]
             data = '\n'.join(d1s + d2s)
             if data:
                 values.update({'data': data})
@@ -1372,17 +1491,16 @@ class LineSupervisorS52(LineSupervisorDetails):
         return MeasureS52
 
     @property
-    def values(self):
+    def extra_values(self):
         """
-        Values of measure sets of this line supervisor of report that need the name of the remote terminal unit
-        and the line supervisor
+        Values added to every measure set of this line supervisor, with the \
+            magnitude.
 
-        :return: a list with the values of the measure sets
+        :return: a dict with the names and the magnitude
         """
-        values = super(LineSupervisorS52, self).values
-        for value in values:
-            value['magn'] = self.magnitude
-        return [v for v in values if v]
+        extra_values = super(LineSupervisorS52, self).extra_values
+        extra_values['magn'] = self.magnitude
+        return extra_values
 
 
 class MeterS01(MeterWithMagnitude):
@@ -1474,6 +1592,19 @@ class MeterS02(MeterWithMagnitude):
     Class for a meter of report S02.
     """
 
+    columns = [
+        ('timestamp', 'datetime64[s]'),
+        ('season', 'U1'),
+        ('bc', 'uint8'),
+        ('ai', 'float64'),
+        ('ae', 'float64'),
+        ('r1', 'float64'),
+        ('r2', 'float64'),
+        ('r3', 'float64'),
+        ('r4', 'float64'),
+        ('magn', 'int32'),
+    ]
+
     @property
     def report_type(self):
         """
@@ -1493,17 +1624,28 @@ class MeterS02(MeterWithMagnitude):
         return MeasureS02
 
     @property
-    def values(self):
+    def extra_values(self):
         """
-        Values of measure sets of this meter of report that need the name of \
-            the concentrator and the meter,
+        Values added to every measure set of this meter, with the magnitude.
 
-        :return: a list with the values of the measure sets
+        :return: a dict with the names and the magnitude
         """
-        values = super(MeterS02, self).values
-        for value in values:
-            value['magn'] = self.magnitude
-        return [v for v in values if v]
+        extra_values = super(MeterS02, self).extra_values
+        extra_values['magn'] = self.magnitude
+        return extra_values
+
+    def rows(self):
+        """
+        Measure sets of this meter as tuples in the order of columns, with \
+            the magnitude of the meter.
+
+        :return: a list of tuples with the values of the measure sets
+        """
+        rows = super(MeterS02, self).rows()
+        if not rows:
+            return rows
+        magnitude = self.magnitude
+        return [row + (magnitude,) for row in rows]
 
 
 class MeterS04(MeterWithMagnitude):
@@ -1679,7 +1821,7 @@ class MeterS06(MeterWithMagnitude):
         :return: a list of parameter set objects
         """
         parameters = []
-        for parameter in self.objectified.S06:
+        for parameter in get_children(self.objectified, 'S06'):
             parameters.append(ParameterS06(
                 parameter,
                 self.report_version,
@@ -1697,6 +1839,7 @@ class MeterS06(MeterWithMagnitude):
         :return: a list with the values of the meter
         """
         values = []
+        self._warnings.clear()
         for parameter in self.parameters:
             vals = parameter.values
             if vals:
@@ -2002,7 +2145,7 @@ class MeterS23(MeterWithConcentratorName):
         """
         if not self.errors:
             parameters = []
-            for parameter in self.objectified.S23:
+            for parameter in get_children(self.objectified, 'S23'):
                 parameters.append(ParameterS23(
                     parameter,
                     self.concentrator_name,
@@ -2019,6 +2162,7 @@ class MeterS23(MeterWithConcentratorName):
         :return: a list with the values of the meter
         """
         values = []
+        self._warnings.clear()
         for parameter in self.parameters:
             vals = parameter.values
             if vals:
@@ -2046,18 +2190,22 @@ class MeterS23(MeterWithConcentratorName):
 
         :return: a list of meter objects
         """
-        meters = []
-        if getattr(self.objectified, 'Cnt', None) is not None:
-            for meter in self.objectified.Cnt:
-                meters.append(MeterS23(
-                    meter,
-                    self.name,
-                    self.report_version,
-                    self.request_id
-                ))
-            for meter in meters:
-                self._warnings.append(meter.warnings)
-        return meters
+        if self._meters is None:
+            meters = []
+            if has_child(self.objectified, 'Cnt'):
+                for meter in self.objectified.iterchildren(tag='Cnt'):
+                    if not self.selects_meter(meter):
+                        continue
+                    meters.append(MeterS23(
+                        meter,
+                        self.name,
+                        self.report_version,
+                        self.request_id
+                    ))
+                for meter in meters:
+                    self._warnings.append(meter.warnings)
+            self._meters = meters
+        return self._meters
 
 
 class MeterS42(MeterWithConcentratorName):
@@ -2088,6 +2236,16 @@ class MeterG02(MeterWithConcentratorName):
     Class for a meter of report G02
     """
 
+    columns = [
+        ('timestamp', 'datetime64[s]'),
+        ('season', 'U1'),
+        ('atime', 'int64'),
+        ('nchanges', 'int64'),
+        ('aconc', 'int64'),
+        ('atimeperc', 'float64'),
+        ('ahourly', 'uint32'),
+    ]
+
     @property
     def report_type(self):
         return 'G02'
@@ -2152,25 +2310,20 @@ class ConcentratorS01(ConcentratorWithMetersWithConcentratorName):
         """
         self._request_id = value
 
-    @property
-    def meters(self):
+    def get_meter(self, objectified_meter):
         """
-        Meter objects of this concentrator.
+        Instances a meter object of this concentrator.
 
-        :return: a list of meter objects
+        :param objectified_meter: an lxml.objectify.StringElement \
+            representing a meter
+        :return: a meter object
         """
-        meters = []
-        if getattr(self.objectified, 'Cnt', None) is not None:
-            for meter in self.objectified.Cnt:
-                meters.append(MeterS01(
-                    meter,
-                    self.name,
-                    self.report_version,
-                    self.request_id
-                ))
-            for meter in meters:
-                self._warnings.append(meter.warnings)
-        return meters
+        return MeterS01(
+            objectified_meter,
+            self.name,
+            self.report_version,
+            self.request_id
+        )
 
 
 class ConcentratorS02(ConcentratorWithMetersWithConcentratorName):
@@ -2289,25 +2442,20 @@ class ConcentratorS06(ConcentratorWithMetersWithConcentratorName):
         """
         self._request_id = value
 
-    @property
-    def meters(self):
+    def get_meter(self, objectified_meter):
         """
-        Meter objects of this concentrator.
+        Instances a meter object of this concentrator.
 
-        :return: a list of meter objects
+        :param objectified_meter: an lxml.objectify.StringElement \
+            representing a meter
+        :return: a meter object
         """
-        meters = []
-        if getattr(self.objectified, 'Cnt', None) is not None:
-            for meter in self.objectified.Cnt:
-                meters.append(MeterS06(
-                    meter,
-                    self.name,
-                    self.report_version,
-                    self.request_id
-                ))
-            for meter in meters:
-                self._warnings.append(meter.warnings)
-        return meters
+        return MeterS06(
+            objectified_meter,
+            self.name,
+            self.report_version,
+            self.request_id
+        )
 
 
 class ConcentratorS09(ConcentratorWithMetersWithConcentratorName):
@@ -2367,9 +2515,8 @@ class ConcentratorS12(Concentrator):
         :return: a list of parameter set objects
         """
         parameters = []
-        if getattr(self.objectified, 'S12', None) is not None:
-            for parameter in self.objectified.S12:
-                parameters.append(ParameterS12(parameter, self.report_version))
+        for parameter in self.objectified.iterchildren(tag='S12'):
+            parameters.append(ParameterS12(parameter, self.report_version))
         return parameters
 
     @property
@@ -2380,6 +2527,7 @@ class ConcentratorS12(Concentrator):
         :return: a list with the values of the meters
         """
         values = []
+        del self._warnings[:]
         for parameter in self.parameters:
             vals = parameter.values
             if vals:
@@ -2482,6 +2630,7 @@ class ConcentratorEvents(Concentrator):
         :return: a list with the values of the meters
         """
         values = []
+        del self._warnings[:]
         for parameter in self.parameters:
             vals = parameter.values
             if vals:
@@ -2512,13 +2661,12 @@ class ConcentratorS15(ConcentratorEvents):
         :return: a list of parameter set objects
         """
         parameters = []
-        if getattr(self.objectified, 'S15', None) is not None:
-            for parameter in self.objectified.S15:
-                parameters.append(ParameterConcentratorEvents(
-                    parameter,
-                    self.report_version,
-                    self.name,
-                    self.request_id))
+        for parameter in self.objectified.iterchildren(tag='S15'):
+            parameters.append(ParameterConcentratorEvents(
+                parameter,
+                self.report_version,
+                self.name,
+                self.request_id))
         return parameters
 
 
@@ -2543,13 +2691,12 @@ class ConcentratorS17(ConcentratorEvents):
         :return: a list of parameter set objects
         """
         parameters = []
-        if getattr(self.objectified, 'S17', None) is not None:
-            for parameter in self.objectified.S17:
-                parameters.append(ParameterConcentratorEvents(
-                    parameter,
-                    self.report_version,
-                    self.name,
-                    self.request_id))
+        for parameter in self.objectified.iterchildren(tag='S17'):
+            parameters.append(ParameterConcentratorEvents(
+                parameter,
+                self.report_version,
+                self.name,
+                self.request_id))
         return parameters
 
 
@@ -2565,11 +2712,9 @@ class MeasureS18(MeasureActiveReactive):
         """
         values = {}
         try:
-            get = self.objectified.get
-            values.update({
-                'order_datetime': self._get_timestamp('Fh'),
-                'orden': get_integer_value(get('Orden')),
-            })
+            values.update(self.get_extractor('S18')(
+                self.objectified
+            ))
 
         except Exception as e:
             self._warnings.append('ERROR: Thrown exception: {}'.format(e))
@@ -2672,25 +2817,20 @@ class ConcentratorS21(ConcentratorWithMetersWithConcentratorName):
         """
         self._request_id = value
 
-    @property
-    def meters(self):
+    def get_meter(self, objectified_meter):
         """
-        Meter objects of this concentrator.
+        Instances a meter object of this concentrator.
 
-        :return: a list of meter objects
+        :param objectified_meter: an lxml.objectify.StringElement \
+            representing a meter
+        :return: a meter object
         """
-        meters = []
-        if getattr(self.objectified, 'Cnt', None) is not None:
-            for meter in self.objectified.Cnt:
-                meters.append(MeterS21(
-                    meter,
-                    self.name,
-                    self.report_version,
-                    self.request_id
-                ))
-            for meter in meters:
-                self._warnings.append(meter.warnings)
-        return meters
+        return MeterS21(
+            objectified_meter,
+            self.name,
+            self.report_version,
+            self.request_id
+        )
 
 
 class ConcentratorS26(ConcentratorWithMetersWithConcentratorName):
@@ -2748,25 +2888,20 @@ class ConcentratorS26(ConcentratorWithMetersWithConcentratorName):
         """
         self._request_id = value
 
-    @property
-    def meters(self):
+    def get_meter(self, objectified_meter):
         """
-        Meter objects of this concentrator.
+        Instances a meter object of this concentrator.
 
-        :return: a list of meter objects
+        :param objectified_meter: an lxml.objectify.StringElement \
+            representing a meter
+        :return: a meter object
         """
-        meters = []
-        if getattr(self.objectified, 'Cnt', None) is not None:
-            for meter in self.objectified.Cnt:
-                meters.append(MeterS26(
-                    meter,
-                    self.name,
-                    self.report_version,
-                    self.request_id
-                ))
-            for meter in meters:
-                self._warnings.append(meter.warnings)
-        return meters
+        return MeterS26(
+            objectified_meter,
+            self.name,
+            self.report_version,
+            self.request_id
+        )
 
 
 class ConcentratorS23(ConcentratorWithMetersWithConcentratorName):
@@ -2804,20 +2939,6 @@ class ConcentratorS23(ConcentratorWithMetersWithConcentratorName):
         """
         return MeterS23
 
-    @property
-    def values(self):
-        """
-        Values of the set of parameters of this concentrator.
-
-        :return: a list with the values of the meters
-        """
-        values = []
-        for parameter in self.parameters:
-            vals = parameter.values
-            if vals:
-                values.append(vals)
-            self._warnings.extend(parameter.warnings)
-        return values
 
 class ConcentratorS24(Concentrator):
     """
@@ -2842,13 +2963,12 @@ class ConcentratorS24(Concentrator):
         :return: a list of parameter set objects
         """
         parameters = []
-        if getattr(self.objectified, 'S24', None) is not None:
-            for parameter in self.objectified.S24:
-                parameters.append(ParameterS24(
-                    parameter,
-                    self.report_version,
-                    self.name,
-                    self.request_id))
+        for parameter in self.objectified.iterchildren(tag='S24'):
+            parameters.append(ParameterS24(
+                parameter,
+                self.report_version,
+                self.name,
+                self.request_id))
         return parameters
 
     @property
@@ -2859,6 +2979,7 @@ class ConcentratorS24(Concentrator):
         :return: a list with the values of the meters
         """
         values = []
+        del self._warnings[:]
         for parameter in self.parameters:
             vals = parameter.values
             if vals:
@@ -2924,9 +3045,8 @@ class ConcentratorG01(Concentrator):
         :return: a list of parameter set objects
         """
         parameters = []
-        if getattr(self.objectified, 'G01', None) is not None:
-            for parameter in self.objectified.G01:
-                parameters.append(ParameterG01(parameter, self.report_version))
+        for parameter in self.objectified.iterchildren(tag='G01'):
+            parameters.append(ParameterG01(parameter, self.report_version))
         return parameters
 
     @property
@@ -2937,6 +3057,7 @@ class ConcentratorG01(Concentrator):
         :return: a list with the values of the meters
         """
         values = []
+        del self._warnings[:]
         for parameter in self.parameters:
             vals = parameter.values
             if vals:
@@ -2996,21 +3117,219 @@ class RemoteTerminalUnitS52(RemoteTerminalUnitDetails):
         return 'S52'
 
 
+CONCENTRATOR_CLASSES = {
+    'S01': {
+        'class': ConcentratorS01,
+        'args': ['report_version', 'request_id'],
+    },
+    'S02': {
+        'class': ConcentratorS02,
+        'args': [],
+    },
+    'S04': {
+        'class': ConcentratorS04,
+        'args': [],
+    },
+    'S05': {
+        'class': ConcentratorS05,
+        'args': [],
+    },
+    'S06': {
+        'class': ConcentratorS06,
+        'args': ['report_version', 'request_id'],
+    },
+    'S09': {
+        'class': ConcentratorS09,
+        'args': [],
+    },
+    'S12': {
+        'class': ConcentratorS12,
+        'args': ['report_version'],
+    },
+    'S13': {
+        'class': ConcentratorS13,
+        'args': [],
+    },
+    'S14': {
+        'class': ConcentratorS14,
+        'args': [],
+    },
+    'S15': {
+        'class': ConcentratorS15,
+        'args': ['report_version', 'request_id', 'report_type'],
+    },
+    'S17': {
+        'class': ConcentratorS17,
+        'args': ['report_version', 'request_id', 'report_type'],
+    },
+    'S18': {
+        'class': ConcentratorS18,
+        'args': [],
+    },
+    'S21': {
+        'class': ConcentratorS21,
+        'args': ['report_version', 'request_id'],
+    },
+    'S23': {
+        'class': ConcentratorS23,
+        'args': ['report_version'],
+    },
+    'S24': {
+        'class': ConcentratorS24,
+        'args': ['report_version', 'request_id', 'report_type'],
+    },
+    'S26': {
+        'class': ConcentratorS26,
+        'args': ['report_version', 'request_id'],
+    },
+    'S27': {
+        'class': ConcentratorS27,
+        'args': [],
+    },
+    'S42': {
+        'class': ConcentratorS42,
+        'args': [],
+    },
+    'G01': {
+        'class': ConcentratorG01,
+        'args': ['report_version'],
+    },
+    'G02': {
+        'class': ConcentratorG02,
+        'args': [],
+    },
+}
+"""
+Concentrator classes by report type, with the names of the attributes of \
+    the report passed to them after the concentrator element.
+"""
+
+RT_UNIT_CLASSES = {
+    'S52': {
+        'class': RemoteTerminalUnitS52,
+        'args': ['report_version', 'request_id'],
+    },
+}
+"""
+Remote terminal unit classes by report type, like CONCENTRATOR_CLASSES.
+"""
+
+
+class ReportResult(object):
+    """
+    Values, warnings and error counts of a report, as given by Report.parse.
+    """
+
+    def __init__(self, report_type):
+        """
+        Creates an empty result.
+
+        :param report_type: a string with the report type
+        :return: a ReportResult object
+        """
+        self.report_type = report_type
+        self.values = []
+        self.warnings = []
+        self.errors = {
+            'message': 0, 'concentrator': 0, 'meter': 0, 'measure': 0
+        }
+
+    def add_warnings(self, warnings, level):
+        """
+        Adds the warnings of an element and counts them.
+
+        :param warnings: the warnings of the element, a dict with lists of \
+            messages by name for meters or a list of messages for \
+            concentrators and messages
+        :param level: the level of the element, 'message', 'concentrator' \
+            or 'meter'
+        """
+        if not warnings:
+            return
+        self.errors[level] += 1
+        if isinstance(warnings, dict):
+            self.warnings.append(warnings)
+            for messages in warnings.values():
+                self.errors['measure'] += len(messages)
+        else:
+            self.warnings.extend(warnings)
+            self.errors['measure'] += len(warnings)
+
+
 class Report(object):
     """
     Report class to process MessageS
     """
 
-    def __init__(self, report):
+    def __init__(self, report, stream=False, parser='objectify',
+                 records=False, recover=False, fields=None, meters=None,
+                 date_from=None, date_to=None, instrumentation=None):
         """
         Creates a Report object.
 
         :param report: a file object or a string with the XML or a MessageS \
             object
+        :param stream: if True the XML isn't parsed until it's needed, so \
+            iter_values can parse it incrementally
+        :param parser: the name of the parser used to build the MessageS, \
+            'objectify' (default) or 'etree', which is faster and gives the \
+            same values
+        :param records: if True the values are compact Record objects, \
+            with the same keys and an as_dict method, instead of dicts
+        :param recover: if True the XML errors that can't be fixed \
+            deleting null chars are recovered by lxml, see MessageS
+        :param fields: a list with the keys of the values to get, like \
+            ['name', 'timestamp', 'ai'], all of them by default. The \
+            attributes of other keys aren't converted
+        :param meters: a list with the names of the meters (or line \
+            supervisors) to read, all of them by default. The other meters \
+            are skipped before reading them
+        :param date_from: the first date of the measure sets to read, as a \
+            datetime or a string like '2015-08-31 02:00:00'. The measure \
+            sets of the meters are filtered by their raw timestamps before \
+            reading them
+        :param date_to: the last date of the measure sets to read, like \
+            date_from. A date without time includes the whole day
+        :param instrumentation: an Instrumentation object to measure the \
+            time, the elements and the warnings of every stage of reading \
+            the report, see primestg.report.instrumentation. Nothing is \
+            measured by default
         :return: an Report object
         """
+        self.stream = stream
+        self.parser = parser
+        self.records = records
+        self.recover = recover
+        self._fields = None
+        self.fields = fields
+        self.meter_names = None if meters is None else frozenset(meters)
+        self.time_range = get_time_range(date_from, date_to)
+        self.instrumentation = instrumentation
         self.message = report
 
+    @property
+    def fields(self):
+        """
+        The keys of the values to get, None for all of them.
+
+        :return: a frozenset with the keys or None
+        """
+        return self._fields
+
+    @fields.setter
+    def fields(self, value):
+        """
+        Stores the keys of the values to get. The concentrators already \
+            read are forgotten, so they get the new keys.
+
+        :param value: a list with the keys or None for all of them
+        """
+        if value is not None:
+            value = frozenset(value)
+        self._fields = value
+        self._concentrators = None
+        self._rt_units = None
+
     @property
     def message(self):
         """
@@ -3018,6 +3337,12 @@ class Report(object):
 
         :return: a MessageS object
         """
+        if self._message is None:
+            self._message = MessageS(
+                self._source, parser=self.parser, recover=self.recover,
+                instrumentation=self.instrumentation
+            )
+            self._source = None
         return self._message
 
     @message.setter
@@ -3028,8 +3353,18 @@ class Report(object):
         :param value: a file object or a string with the XML or a MessageS \
             object
         """
-        if hasattr(value, 'read') or isinstance(value, str):
-            message = MessageS(value)
+        self._source = None
+        self._invalidate()
+        string_types = (six.binary_type, six.text_type)
+        if hasattr(value, 'read') or isinstance(value, string_types):
+            if self.stream:
+                self._source = value
+                message = None
+            else:
+                message = MessageS(
+                    value, parser=self.parser, recover=self.recover,
+                    instrumentation=self.instrumentation
+                )
         elif isinstance(value, MessageS):
             message = value
         else:
@@ -3038,6 +3373,28 @@ class Report(object):
 
         self._message = message
 
+    def _invalidate(self):
+        """
+        Forgets the values computed from the message, when it's replaced.
+        """
+        self._header = None
+        self._concentrator_class = None
+        self._rt_unit_class = None
+        self._concentrators = None
+        self._rt_units = None
+
+    def _get_header(self, name):
+        """
+        Gets an attribute of the root element of the report. The attributes \
+            are read once.
+
+        :param name: a string with the name of the attribute
+        :return: a string with the value of the attribute
+        """
+        if self._header is None:
+            self._header = dict(self.message.objectified.attrib)
+        return self._header.get(name)
+
     @property
     def report_type(self):
         """
@@ -3045,7 +3402,7 @@ class Report(object):
 
         :return: a string with the report type
         """
-        return self.message.objectified.get('IdRpt')
+        return self._get_header('IdRpt')
 
     @property
     def report_version(self):
@@ -3054,7 +3411,7 @@ class Report(object):
 
         :return: a string with the report version
         """
-        return self.message.objectified.get('Version')
+        return self._get_header('Version')
 
     @property
     def request_id(self):
@@ -3063,7 +3420,7 @@ class Report(object):
 
         :return: a string with the report version
         """
-        return self.message.objectified.get('IdPet')
+        return self._get_header('IdPet')
 
     def get_concentrator(self, objectified_concentrator):
         """
@@ -3071,130 +3428,19 @@ class Report(object):
 
         :return: a concentrator object
         """
-        report_type_class = {
-            'S01': {
-                'class': ConcentratorS01,
-                'args': [
-                    objectified_concentrator,
-                    self.report_version,
-                    self.request_id,
-                ]
-            },
-            'S02': {
-                'class': ConcentratorS02,
-                'args': [objectified_concentrator]
-            },
-            'S04': {
-                'class': ConcentratorS04,
-                'args': [objectified_concentrator]
-            },
-            'S05': {
-                'class': ConcentratorS05,
-                'args': [objectified_concentrator]
-            },
-            'S06': {
-                'class': ConcentratorS06,
-                'args': [
-                    objectified_concentrator,
-                    self.report_version,
-                    self.request_id
-                ]
-            },
-            'S09': {
-                'class': ConcentratorS09,
-                'args': [objectified_concentrator]
-            },
-            'S12': {
-                'class': ConcentratorS12,
-                'args': [objectified_concentrator, self.report_version]
-            },
-            'S13': {
-                'class': ConcentratorS13,
-                'args': [objectified_concentrator]
-            },
-            'S14': {
-                'class': ConcentratorS14,
-                'args': [objectified_concentrator]
-            },
-            'S15': {
-                'class': ConcentratorS15,
-                'args': [
-                    objectified_concentrator,
-                    self.report_version,
-                    self.request_id,
-                    self.report_type
-                ]
-            },
-            'S17': {
-                'class': ConcentratorS17,
-                'args': [
-                    objectified_concentrator,
-                    self.report_version,
-                    self.request_id,
-                    self.report_type
-                ]
-            },
-            'S18': {
-                'class': ConcentratorS18,
-                'args': [objectified_concentrator]
-            },
-            'S21': {
-                'class': ConcentratorS21,
-                'args': [
-                    objectified_concentrator,
-                    self.report_version,
-                    self.request_id,
-                ]
-            },
-            'S23': {
-                'class': ConcentratorS23,
-                'args': [objectified_concentrator, self.report_version]
-            },
-            'S24': {
-                'class': ConcentratorS24,
-                'args': [
-                    objectified_concentrator,
-                    self.report_version,
-                    self.request_id,
-                    self.report_type
-                ]
-            },
-            'S26': {
-                'class': ConcentratorS26,
-                'args': [
-                    objectified_concentrator,
-                    self.report_version,
-                    self.request_id,
-                ]
-            },
-            'S27': {
-                'class': ConcentratorS27,
-                'args': [objectified_concentrator]
-            },
-            'S42': {
-                'class': ConcentratorS42,
-                'args': [objectified_concentrator]
-            },
-            'G01': {
-                'class': ConcentratorG01,
-                'args': [
-                    objectified_concentrator,
-                    self.report_version,
-                ],
-            },
-            'G02': {
-                'class': ConcentratorG02,
-                'args': [objectified_concentrator]
-            }
-        }
-
-        if self.report_type not in report_type_class:
-            raise NotImplementedError('Report type not implemented!')
-
-        get = report_type_class.get(self.report_type).get
-        concentrator_class = get('class')
-        concentrator_args = get('args')
-        concentrator = concentrator_class(*concentrator_args)
+        if self._concentrator_class is None:
+            self._concentrator_class = self._get_element_class(
+                CONCENTRATOR_CLASSES
+            )
+        concentrator_class, concentrator_args = self._concentrator_class
+        concentrator = concentrator_class(
+            objectified_concentrator, *concentrator_args
+        )
+        concentrator.records = self.records
+        concentrator.fields = self.fields
+        concentrator.meter_names = self.meter_names
+        concentrator.time_range = self.time_range
+        concentrator.instrumentation = self.instrumentation
         return concentrator
 
     def get_rt_unit(self, objectified_rt_unit):
@@ -3203,25 +3449,32 @@ class Report(object):
 
         :return: a remote terminal unit object
         """
-        report_type_class = {
-            'S52': {
-                'class': RemoteTerminalUnitS52,
-                'args': [
-                    objectified_rt_unit,
-                    self.report_version,
-                    self.request_id
-                ],
-            }
-        }
+        if self._rt_unit_class is None:
+            self._rt_unit_class = self._get_element_class(RT_UNIT_CLASSES)
+        rt_unit_class, rt_unit_args = self._rt_unit_class
+        rt_unit = rt_unit_class(objectified_rt_unit, *rt_unit_args)
+        rt_unit.records = self.records
+        rt_unit.fields = self.fields
+        rt_unit.meter_names = self.meter_names
+        rt_unit.time_range = self.time_range
+        rt_unit.instrumentation = self.instrumentation
+        return rt_unit
+
+    def _get_element_class(self, report_type_class):
+        """
+        Gets the class for the elements of this report type and the \
+            arguments passed to it after the element.
 
+        :param report_type_class: a dict like CONCENTRATOR_CLASSES
+        :return: a tuple with the class and a list with the arguments
+        """
         if self.report_type not in report_type_class:
             raise NotImplementedError('Report type not implemented!')
 
         get = report_type_class.get(self.report_type).get
-        rt_unit_class = get('class')
-        rt_unit_args = get('args')
-        rt_unit = rt_unit_class(*rt_unit_args)
-        return rt_unit
+        element_class = get('class')
+        element_args = [getattr(self, name) for name in get('args')]
+        return element_class, element_args
 
     @property
     def supported(self):
@@ -3234,7 +3487,11 @@ class Report(object):
 
         :return: a list of concentrators of the report
         """
-        return map(self.get_concentrator, self.message.objectified.Cnc)
+        if self._concentrators is None:
+            self._concentrators = self._get_elements(
+                self.get_concentrator, 'Cnc'
+            )
+        return self._concentrators
 
     @property
     def rt_units(self):
@@ -3243,7 +3500,25 @@ class Report(object):
 
         :return: a list of remote terminals units of the report
         """
-        return map(self.get_rt_unit, self.message.objectified.Rtu)
+        if self._rt_units is None:
+            self._rt_units = self._get_elements(self.get_rt_unit, 'Rtu')
+        return self._rt_units
+
+    def _get_elements(self, get_element, tag):
+        """
+        Instances the objects of the children of the report with a tag.
+
+        :param get_element: the function that instances an object
+        :param tag: a string with the tag of the children
+        :return: a list with the objects
+        """
+        objectified = self.message.objectified
+        if self.instrumentation is None:
+            return list(map(get_element, get_children(objectified, tag)))
+        with self.instrumentation.stage(self.report_type, 'objects') as counts:
+            elements = list(map(get_element, get_children(objectified, tag)))
+            counts['elements'] = len(elements)
+        return elements
 
     @property
     def values(self):
@@ -3255,8 +3530,260 @@ class Report(object):
         values = []
         if self.report_type == 'S52':
             for rt_unit in self.rt_units:
-                values.extend(rt_unit.values)
+                values.extend(self._get_values(rt_unit))
         else:
             for concentrator in self.concentrators:
-                values.extend(concentrator.values)
+                values.extend(self._get_values(concentrator))
+        if self.records:
+            values = [as_record(value) for value in values]
         return values
+
+    def values_only(self, fields):
+        """
+        Values of the whole report with only some keys, without converting \
+            the attributes of the other keys.
+
+        :param fields: a list with the keys of the values to get
+        :return: a list with the values of the whole report
+        """
+        previous = self.fields
+        self.fields = fields
+        try:
+            return self.values
+        finally:
+            self.fields = previous
+
+    def _get_values(self, element):
+        """
+        Values of an element of the report with only the keys of fields. \
+            The values of most meters already have only these keys and are \
+            kept as they are, but not all the elements get their values \
+            from the measure sets of meters.
+
+        :param element: a concentrator, a remote terminal unit or a meter
+        :return: a list with the values of the element
+        """
+        if self.instrumentation is None:
+            values = element.values
+        else:
+            values = self._get_instrumented_values(element)
+        if self.fields is None:
+            return values
+        return [
+            project_values(value, self.fields)
+            if isinstance(value, dict) else value
+            for value in values
+        ]
+
+    def _get_instrumented_values(self, element):
+        """
+        Values of an element of the report, measuring the time creating \
+            the objects of its meters (or line supervisors) and measure sets \
+            apart from the time reading their values.
+
+        :param element: a concentrator, a remote terminal unit or a meter
+        :return: a list with the values of the element
+        """
+        instrumentation = self.instrumentation
+        report_type = self.report_type
+        with instrumentation.stage(report_type, 'objects') as counts:
+            if isinstance(element, ConcentratorWithMeters):
+                children = element.meters
+            elif isinstance(element, RemoteTerminalUnitDetails):
+                children = element.line_supervisors
+            elif hasattr(element, 'measures'):
+                children = [element]
+            else:
+                children = []
+            for child in children:
+                counts['elements'] += 1 + len(child.measures)
+        with instrumentation.stage(report_type, 'values') as counts:
+            values = element.values
+            counts['elements'] = len(values)
+            for child in children or [element]:
+                counts['warnings'] += count_warnings(child.warnings)
+        return values
+
+    def parse(self):
+        """
+        Reads the values and the warnings of the whole report at once.
+
+        The warnings are the ones fixing the XML of the message, the ones \
+            of the meters (or line supervisors) with warnings and the \
+            messages of the concentrators without meters. The errors count \
+            the fixes of the message, the concentrators and meters with \
+            warnings and the messages of their measure sets (or parameters).
+
+        :return: a ReportResult object
+        """
+        result = ReportResult(self.report_type)
+        if self.message.warnings:
+            result.warnings.extend(self.message.warnings)
+            result.errors['message'] = len(self.message.warnings)
+        if self.report_type == 'S52':
+            elements = self.rt_units
+        else:
+            elements = self.concentrators
+        for element in elements:
+            result.values.extend(self._get_values(element))
+            if isinstance(element, ConcentratorWithMeters):
+                children = element.meters
+            elif isinstance(element, RemoteTerminalUnitDetails):
+                children = element.line_supervisors
+            else:
+                warnings = [w for w in element.warnings if w]
+                result.add_warnings(warnings, 'concentrator')
+                continue
+            for child in children:
+                result.add_warnings(child.warnings, 'meter')
+        if self.records:
+            result.values = [as_record(value) for value in result.values]
+        return result
+
+    def to_columns(self):
+        """
+        Values of the whole report as NumPy arrays by column, only for the \
+            hourly reports S02 and G02. Needs NumPy.
+
+        :return: a dict with an array by column, see \
+            primestg.report.base.to_columns
+        """
+        report_type_class = {
+            'S02': MeterS02,
+            'G02': MeterG02,
+        }
+        meter_class = report_type_class.get(self.report_type)
+        if meter_class is None:
+            raise NotImplementedError('Report type not implemented!')
+        return to_columns(self.concentrators, meter_class)
+
+    def iter_values(self):
+        """
+        Iterates over the values of the whole report.
+
+        If the report was created with stream=True the XML is parsed \
+            incrementally: the values of every meter (or line supervisor) \
+            are yielded as soon as its element is read and the element is \
+            released afterwards, so the memory used doesn't depend on the \
+            size of the report. Reports without meters are yielded by \
+            concentrator.
+
+        :return: an iterator over the values of the whole report
+        """
+        for value in self._iter_values():
+            if self.records:
+                value = as_record(value)
+            yield value
+
+    def _iter_values(self):
+        """
+        Iterates over the values of the whole report as given by the \
+            concentrators, see iter_values.
+
+        :return: an iterator over the values of the whole report
+        """
+        if self._source is None:
+            for value in self._iter_tree_values():
+                yield value
+            return
+
+        source = self._source
+        self._source = None
+        # The sources that can't go back keep what is read, to read it again
+        # if the XML is broken
+        position = None
+        if hasattr(source, 'read'):
+            if is_seekable(source):
+                position = source.tell()
+            else:
+                source = RecordingReader(source)
+        read = 0
+        try:
+            for value in self._iter_stream_values(source):
+                read += 1
+                yield value
+        except XMLSyntaxError:
+            # The XML is broken (e.g. null chars), MessageS knows how to fix
+            # it but needs the whole content, so it's read again and the
+            # values already yielded are skipped
+            if isinstance(source, RecordingReader):
+                source = source.replay()
+            elif position is not None:
+                source.seek(position)
+            self._invalidate()
+            self._message = MessageS(
+                source, parser=self.parser, recover=self.recover,
+                instrumentation=self.instrumentation
+            )
+            for index, value in enumerate(self._iter_tree_values()):
+                if index >= read:
+                    yield value
+
+    def _iter_tree_values(self):
+        """
+        Iterates over the values of the whole report from the parsed message.
+
+        :return: an iterator over the values of the whole report
+        """
+        if self.report_type == 'S52':
+            elements = self.rt_units
+        else:
+            elements = self.concentrators
+        for element in elements:
+            with_children = isinstance(
+                element, (ConcentratorWithMeters, RemoteTerminalUnitDetails)
+            )
+            for value in self._get_values(element):
+                # Like _iter_stream_values, the empty values of the meters
+                # (or line supervisors) are skipped
+                if value or not with_children:
+                    yield value
+
+    def _iter_stream_values(self, source):
+        """
+        Iterates over the values of the whole report parsing the source \
+            incrementally.
+
+        :param source: a file object or a string with the XML
+        :return: an iterator over the values of the whole report
+        """
+        parent = None
+        depth = -1
+        for event, element in iterparse(source, parser=self.parser):
+            if event == 'start':
+                depth += 1
+                if depth == 0:
+                    self._header = dict(element.attrib)
+                elif depth == 1:
+                    if self.report_type == 'S52':
+                        parent = self.get_rt_unit(element)
+                    else:
+                        parent = self.get_concentrator(element)
+                continue
+
+            depth -= 1
+            if depth == 1 and element.tag in ('Cnt', 'LVSLine'):
+                if isinstance(parent, ConcentratorWithMeters):
+                    if not parent.selects_meter(element):
+                        release_element(element)
+                        continue
+                    child = parent.new_meter(element)
+                elif isinstance(parent, RemoteTerminalUnitDetails):
+                    if not parent.selects_line_supervisor(element):
+                        release_element(element)
+                        continue
+                    child = parent.new_line_supervisor(element)
+                else:
+                    continue
+                for value in self._get_values(child):
+                    if value:
+                        yield value
+                release_element(element)
+            elif depth == 0:
+                if not isinstance(
+                        parent,
+                        (ConcentratorWithMeters, RemoteTerminalUnitDetails)):
+                    for value in self._get_values(parent):
+                        yield value
+                release_element(element)
+                parent = None
@@ -0,0 +1,229 @@
+from collections import namedtuple
+
+
+Field = namedtuple('Field', ['source', 'key', 'converter'])
+"""
+A field of a report element: the attribute read, the key of the value and \
+    the function that converts the attribute, None to keep it as it is.
+"""
+
+SCHEMAS = {}
+"""
+Fields of the elements of the reports by (name, version), as registered by \
+    register_schema.
+"""
+
+EXTRACTORS = {}
+"""
+Extractors compiled from SCHEMAS, by (name, version).
+"""
+
+
+def get_integer_value(param):
+    try:
+        result = int(param)
+    except ValueError as e:
+        result = 0
+    except TypeError as e:
+        result = 0
+    return result
+
+
+def get_float_value(param):
+    try:
+        result = float(param)
+    except ValueError as e:
+        result = 0.0
+    except TypeError as e:
+        result = 0.0
+    return result
+
+
+def get_integer_or_zero(param):
+    """
+    Converts an attribute to an integer, 0 if it's missing or empty.
+
+    :param param: a string with the attribute or None
+    :return: an integer
+    """
+    return int(param or 0)
+
+
+def get_season(param):
+    """
+    Gets the season, the last letter of a timestamp attribute.
+
+    :param param: a string with the timestamp
+    :return: a string with the season ('S' or 'W')
+    """
+    return param[-1:]
+
+
+def get_boolean_value(param):
+    """
+    Converts a 'Y'/'N' attribute to a boolean.
+
+    :param param: a string with the attribute or None
+    :return: True if the attribute is 'Y'
+    """
+    return param == 'Y'
+
+
+def uses_name(converter):
+    """
+    Marks a converter that needs the name of the attribute as its second \
+        argument, like the timestamps to report the attribute in the errors.
+
+    :param converter: a function with the value and the name as arguments
+    :return: the same function
+    """
+    converter.uses_name = True
+    return converter
+
+
+def stage(name):
+    """
+    Marks a converter as a stage of reading the reports, like the \
+        timestamps, so it's measured when the report is instrumented, see \
+        primestg.report.instrumentation.
+
+    :param name: a string with the name of the stage
+    :return: a decorator that marks the converter
+    """
+    def mark(converter):
+        converter.stage = name
+        return converter
+    return mark
+
+
+def active_reactive_fields(suffix, converter, key_suffix=''):
+    """
+    Fields of the active and reactive measures.
+
+    :param suffix: the suffix of the attributes of the measures ('a', 'i', \
+        '' or a phase number)
+    :param converter: the function to convert the measures
+    :param key_suffix: the suffix of the keys of the measures
+    :return: a list of fields
+    """
+    return [
+        Field(
+            '{}{}'.format(source, suffix), '{}{}'.format(key, key_suffix),
+            converter
+        )
+        for source, key in (
+            ('AI', 'ai'), ('AE', 'ae'), ('R1', 'r1'),
+            ('R2', 'r2'), ('R3', 'r3'), ('R4', 'r4'),
+        )
+    ]
+
+
+def compile_schema(fields):
+    """
+    Compiles the fields of an element into an extractor.
+
+    The extractor is the source of a function with a dict literal, like \
+        the ones written by hand, built once for the fields, so the names \
+        of the attributes and the keys aren't formatted nor looked up for \
+        every element. The same attribute with the same converter is only \
+        converted once.
+
+    :param fields: a list of fields
+    :return: a function that gets a dict with the values of an element or \
+        of anything with a get method, like a dict with the attributes
+    """
+    namespace = {}
+    converters = {}
+    conversions = {}
+    lines = ['def extract(element):', '    get = element.get']
+    items = []
+    for source, key, converter in fields:
+        conversion = (source, converter)
+        if conversion not in conversions:
+            if converter is None:
+                expression = 'get({!r})'.format(source)
+            else:
+                if converter not in converters:
+                    converters[converter] = 'convert_{}'.format(
+                        len(converters)
+                    )
+                    namespace[converters[converter]] = converter
+                if getattr(converter, 'uses_name', False):
+                    expression = '{}(get({!r}), {!r})'.format(
+                        converters[converter], source, source
+                    )
+                else:
+                    expression = '{}(get({!r}))'.format(
+                        converters[converter], source
+                    )
+            conversions[conversion] = 'value_{}'.format(len(conversions))
+            lines.append('    {} = {}'.format(
+                conversions[conversion], expression
+            ))
+        items.append('        {!r}: {},'.format(key, conversions[conversion]))
+    lines.append('    return {')
+    lines.extend(items)
+    lines.append('    }')
+    exec('\n'.join(lines), namespace)
+
+    extract = namespace['extract']
+    extract.fields = tuple(fields)
+    extract.projections = {}
+    return extract
+
+
+def project_extractor(extract, fields):
+    """
+    Gets an extractor of only some keys of another one, so the attributes \
+        of the other keys aren't converted. The projections are compiled \
+        once and kept in the extractor.
+
+    :param extract: an extractor, see compile_schema
+    :param fields: a collection with the keys to get, None for all of them
+    :return: an extractor
+    """
+    if fields is None:
+        return extract
+    fields = frozenset(fields)
+    projection = extract.projections.get(fields)
+    if projection is None:
+        projection = compile_schema(
+            [field for field in extract.fields if field.key in fields]
+        )
+        extract.projections[fields] = projection
+    return projection
+
+
+def register_schema(name, fields, version=None):
+    """
+    Registers and compiles the fields of an element of a report.
+
+    :param name: a string with the report code, like 'S02', or the name of \
+        the element of a report
+    :param fields: a list of fields
+    :param version: a string with the version of the report, None for the \
+        fields of all the versions without their own
+    :return: the compiled extractor
+    """
+    SCHEMAS[(name, version)] = list(fields)
+    extractor = compile_schema(fields)
+    EXTRACTORS[(name, version)] = extractor
+    return extractor
+
+
+def get_extractor(name, version=None, fields=None):
+    """
+    Gets the extractor of an element of a report, the one of its version \
+        or the one for all the versions.
+
+    :param name: a string with the report code or the name of the element
+    :param version: a string with the version of the report
+    :param fields: a collection with the keys to get, None for all of them, \
+        see project_extractor
+    :raises KeyError: if there isn't a schema for the element
+    :return: the compiled extractor, see compile_schema
+    """
+    extractor = EXTRACTORS.get((name, version))
+    if extractor is None:
+        extractor = EXTRACTORS[(name, None)]
+    return project_extractor(extractor, fields)
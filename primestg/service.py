@@ -1,9 +1,21 @@
 # -*- coding: UTF-8 -*-
+import copy
+import os
+import re
+from multiprocessing.pool import ThreadPool
+from threading import Lock
+from lxml import etree
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from zeep import Client
+from zeep.exceptions import Fault, TransportError
 from zeep.transports import Transport
 from datetime import datetime
 import primestg
+from primestg.message import CHUNK_SIZE, ENCODING, delete_null_chars
 from primestg.order.orders import Order
+from primestg.report.reports import Report
 import calendar
 from .utils import PRIORITY_HIGH
 
@@ -34,8 +46,447 @@ def format_timestamp(dt):
     return '{}{}'.format(dt.strftime('%Y%m%d%H%M%S000'), season)
 
 
+WSDL = 'WS_DC.wsdl'
+
+BINDING = '{http://www.asais.fr/ns/Saturne/DC/ws}WS_DCSoap'
+
+SOAP_ACTION = 'http://www.asais.fr/ns/Saturne/DC/ws/{}'
+"""
+SOAPAction of the operations of the web service, by operation name.
+"""
+
+_CLIENTS = {}
+"""
+zeep clients by process, WSDL and timeouts, see get_client. It's only a \
+    memo of the process, there isn't a cache of the WSDL across processes.
+"""
+
+_SESSIONS = {}
+"""
+Default session of every process, see get_session.
+"""
+
+_CLIENTS_LOCK = Lock()
+
+
+def create_session(pool_connections=100, pool_maxsize=10, retries=2):
+    """
+    Creates a session that keeps the connections to the concentrators \
+        alive, to be shared by their services.
+
+    :param pool_connections: the number of concentrators (hosts) whose \
+        connections are kept
+    :param pool_maxsize: the number of connections kept by concentrator, \
+        the ones used at the same time by different threads
+    :param retries: the number of times connecting to a concentrator is \
+        retried. The requests already sent aren't retried, as the orders \
+        can't be sent twice
+    :return: a requests Session
+    """
+    session = Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=retries, read=False)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session():
+    """
+    Gets the default session of the process, see create_session.
+
+    :return: a requests Session
+    """
+    key = os.getpid()
+    session = _SESSIONS.get(key)
+    if session is None:
+        with _CLIENTS_LOCK:
+            session = _SESSIONS.get(key)
+            if session is None:
+                session = _SESSIONS[key] = create_session()
+    return session
+
+
+def get_client(wsdl=WSDL, timeout=20, operation_timeout=60, session=None):
+    """
+    Gets the zeep client of a WSDL, shared by all the services of the \
+        process with the same timeouts.
+
+    Loading the WSDL is the slowest part of creating a service, so it's \
+        done once by process: a process forked afterwards loads it again \
+        instead of sharing the connections of its parent. The services of \
+        every concentrator are cheap proxies of the client.
+
+    Nothing is kept across processes: every new process, like every run \
+        of the command line, loads and parses the WSDL file again, see \
+        primestg.get_data.
+
+    :param wsdl: a string with the name of the WSDL file, see \
+        primestg.get_data
+    :param timeout: the seconds to wait loading the WSDL
+    :param operation_timeout: the seconds to wait for the answer of an \
+        operation
+    :param session: the requests Session of the calls, the default one of \
+        the process by default, see get_session. With another one, the \
+        client is a copy of the shared one with its own transport, which \
+        isn't kept
+    :return: a zeep Client
+    """
+    key = (os.getpid(), wsdl, timeout, operation_timeout)
+    client = _CLIENTS.get(key)
+    if client is None:
+        default_session = get_session()
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(key)
+            if client is None:
+                transport = Transport(
+                    timeout=timeout, operation_timeout=operation_timeout,
+                    session=default_session
+                )
+                client = Client(
+                    wsdl=primestg.get_data(wsdl), transport=transport
+                )
+                client.set_ns_prefix(
+                    None, 'http://www.asais.fr/ns/Saturne/DC/ws'
+                )
+                _CLIENTS[key] = client
+    if session is not None and session is not client.transport.session:
+        client = copy.copy(client)
+        client.transport = Transport(
+            timeout=timeout, operation_timeout=operation_timeout,
+            session=session
+        )
+    return client
+
+
+def clear_clients():
+    """
+    Forgets the zeep clients of get_client, so the WSDL files are loaded \
+        again, and closes the default sessions.
+    """
+    with _CLIENTS_LOCK:
+        _CLIENTS.clear()
+        for session in _SESSIONS.values():
+            session.close()
+        _SESSIONS.clear()
+
+
+METER_SEPARATOR = ','
+"""
+Separator of the meters of a request.
+"""
+
+
+def split_meters(meters, batch_size):
+    """
+    Splits the meters of a request in batches.
+
+    :param meters: a string with the meters separated by METER_SEPARATOR \
+        or a list of them, an empty one for all of them
+    :param batch_size: the number of meters of a batch, all of them in one \
+        batch if None
+    :return: a list of strings with the meters of every batch
+    """
+    if not isinstance(meters, (list, tuple)):
+        if not meters or not batch_size:
+            return [meters]
+        meters = [meter for meter in meters.split(METER_SEPARATOR) if meter]
+    if not batch_size:
+        return [METER_SEPARATOR.join(meters)]
+    return [
+        METER_SEPARATOR.join(meters[index:index + batch_size])
+        for index in range(0, len(meters), batch_size)
+    ] or ['']
+
+
+XML_ENCODING = re.compile(
+    r'\s*<\?xml[^>]*?encoding=["\']([A-Za-z][A-Za-z0-9._-]*)["\']'
+)
+"""
+Encoding in the declaration of a XML, see get_xml_encoding.
+"""
+
+
+def get_xml_encoding(report):
+    """
+    Gets the encoding declared by a report.
+
+    :param report: bytes or a string with the XML of the report
+    :return: a string with the encoding or None if it isn't declared
+    """
+    head = report[:200]
+    if isinstance(head, bytes):
+        head = head.decode('ascii', 'replace')
+    match = XML_ENCODING.match(head)
+    return match and match.group(1)
+
+
+def parse_batch_report(report, encoding=None):
+    """
+    Parses the report of a batch to merge it, deleting its null chars like \
+        MessageS does if they break it.
+
+    :param report: bytes or a string with the XML of the report
+    :param encoding: a string with the encoding declared by the report, \
+        see get_xml_encoding
+    :raises ValueError: if the report can't be parsed
+    :return: the root lxml element of the report
+    """
+    if not isinstance(report, bytes):
+        # The text is encoded like it declares, to be read back by lxml
+        report = report.encode(encoding or 'utf-8')
+    try:
+        return etree.fromstring(report)
+    except etree.XMLSyntaxError as error:
+        fixed, deleted = delete_null_chars(report)
+        if not deleted:
+            raise ValueError('The report can\'t be merged: {}'.format(error))
+    try:
+        return etree.fromstring(fixed)
+    except etree.XMLSyntaxError as error:
+        raise ValueError('The report can\'t be merged: {}'.format(error))
+
+
+def merge_reports(reports):
+    """
+    Merges the results of the requests of some batches of meters.
+
+    The reports are merged in the first one, appending the meters of every \
+        concentrator to the one with the same Id, and the result keeps its \
+        type (bytes or text) and its declared encoding. The null chars of \
+        the reports are deleted, see parse_batch_report. Results that \
+        aren't reports, like the ones of the asynchronous requests, are \
+        merged as True only if all of them are.
+
+    :param reports: a list with the results of the batches
+    :raises ValueError: if a result isn't a report or a boolean, or if a \
+        report can't be parsed
+    :return: the merged result
+    """
+    if len(reports) == 1:
+        return reports[0]
+    if all(isinstance(report, bool) for report in reports):
+        return all(reports)
+    if not all(isinstance(report, (bytes, type(u''))) for report in reports):
+        raise ValueError('Only reports or booleans can be merged: {}'.format(
+            ', '.join(sorted(set(type(report).__name__ for report in reports)))
+        ))
+    encodings = [get_xml_encoding(report) for report in reports]
+    roots = [
+        parse_batch_report(report, encoding)
+        for report, encoding in zip(reports, encodings)
+    ]
+    merged = roots[0]
+    elements = dict(
+        ((element.tag, element.get('Id')), element) for element in merged
+    )
+    for root in roots[1:]:
+        for element in list(root):
+            target = elements.get((element.tag, element.get('Id')))
+            if target is None:
+                merged.append(element)
+                elements[(element.tag, element.get('Id'))] = element
+            else:
+                target.extend(list(element))
+    encoding = encodings[0]
+    result = etree.tostring(
+        merged, encoding=encoding or 'utf-8',
+        xml_declaration=encoding is not None
+    )
+    if not isinstance(reports[0], bytes):
+        result = result.decode(encoding or 'utf-8')
+    return result
+
+
+SOAP_ENV = 'http://schemas.xmlsoap.org/soap/envelope/'
+
+CONTROL_CHARS = re.compile(b'[\x00-\x08\x0B\x0C\x0E-\x1F]')
+"""
+Control chars not allowed in a XML, like the null chars, sent by some \
+    concentrators in their reports. See SoapResultReader.
+"""
+
+CONTROL_CHARS_OFFSET = 0xE000
+"""
+Private use code point where the control chars of the answers are moved \
+    to parse them, see SoapResultReader.
+"""
+
+_CONTROL_CHARS_RESTORE = dict(
+    (CONTROL_CHARS_OFFSET + code, code) for code in range(0x20)
+)
+
+
+def create_request(client, service, operation, *args):
+    """
+    Creates the HTTP request of an operation of a concentrator, to send it \
+        without zeep, like fetch_report does. The envelope is created by \
+        the client and the SOAPAction is the operation in the namespace of \
+        the web service, see SOAP_ACTION.
+
+    :param client: the zeep Client, see get_client
+    :param service: the zeep service of the concentrator
+    :param operation: a string with the name of the operation
+    :param args: the arguments of the operation
+    :return: a tuple with the body, bytes with the SOAP envelope, and a dict \
+        with the HTTP headers
+    """
+    envelope = client.create_message(service, operation, *args)
+    headers = {
+        'Content-Type': 'text/xml; charset=utf-8',
+        'SOAPAction': '"{}"'.format(SOAP_ACTION.format(operation)),
+    }
+    body = etree.tostring(envelope, encoding='utf-8', xml_declaration=True)
+    return body, headers
+
+
+def raise_answer_error(response):
+    """
+    Raises the error of an answer of a concentrator without a result, \
+        like zeep does.
+
+    :param response: the requests Response of the answer
+    :raises zeep.exceptions.Fault: if the answer is a SOAP fault
+    :raises zeep.exceptions.TransportError: if it isn't
+    """
+    fault = None
+    content = response.content
+    try:
+        parser = etree.XMLParser(resolve_entities=False, no_network=True)
+        fault = etree.fromstring(content, parser).find(
+            '{{{0}}}Body/{{{0}}}Fault'.format(SOAP_ENV)
+        )
+    except (etree.XMLSyntaxError, ValueError):
+        pass
+    if fault is None:
+        raise TransportError(
+            'Server returned HTTP status {}'.format(response.status_code),
+            status_code=response.status_code, content=content
+        )
+    raise Fault(
+        message=fault.findtext('faultstring'),
+        code=fault.findtext('faultcode'),
+        actor=fault.findtext('faultactor'),
+        detail=fault.find('detail'),
+    )
+
+
+class SoapResultReader(object):
+    """
+    File object with the report of a SOAP answer read as it's received.
+
+    The answer is parsed incrementally and the text of its result element, \
+        the report, is given as soon as it arrives, encoded like the \
+        reports uploaded by the concentrators, so it can be parsed while \
+        the rest of the answer is received. zeep only parses whole \
+        answers, so this is the one part of the call done by hand: the \
+        request is still created by the client, see create_request.
+
+    The CONTROL_CHARS of the answer would break it, so they are moved to \
+        CONTROL_CHARS_OFFSET to parse it and given back in the report, \
+        where the Report deletes them like in the uploaded ones.
+    """
+
+    def __init__(self, chunks, tag='RequestResult', close=None):
+        """
+        Creates a SoapResultReader object.
+
+        :param chunks: an iterator over the chunks of bytes of the answer
+        :param tag: the local name of the result element
+        :param close: a function called when the answer is read or closed, \
+            like the one releasing the connection
+        :return: a SoapResultReader object
+        """
+        self.chunks = iter(chunks)
+        self.tag = tag
+        self._close = close
+        self._inside = False
+        self._pending = []
+        self._buffer = b''
+        self._escaped = False
+        self._parser = etree.XMLParser(target=self)
+
+    def start(self, tag, attrib):
+        if etree.QName(tag).localname == self.tag:
+            self._inside = True
+
+    def end(self, tag):
+        if etree.QName(tag).localname == self.tag:
+            self._inside = False
+
+    def data(self, data):
+        if self._inside:
+            self._pending.append(data)
+
+    def close(self):
+        """
+        Releases the answer, called by the parser when it ends too.
+        """
+        if self._close is not None:
+            close, self._close = self._close, None
+            close()
+
+    def _fill(self, size):
+        """
+        Parses chunks of the answer until there are size bytes of the \
+            report or the answer ends.
+
+        :param size: the number of bytes, all of them if negative
+        """
+        while self._parser is not None and (
+                size < 0 or len(self._buffer) < size):
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                parser, self._parser = self._parser, None
+                parser.close()
+            elif chunk:
+                if CONTROL_CHARS.search(chunk):
+                    # The control chars are ASCII, they aren't part of the
+                    # multibyte chars of the answer
+                    self._escaped = True
+                    chunk = CONTROL_CHARS.sub(self._escape, chunk)
+                self._parser.feed(chunk)
+            if self._pending:
+                text = u''.join(self._pending)
+                if self._escaped:
+                    text = text.translate(_CONTROL_CHARS_RESTORE)
+                self._buffer += text.encode(ENCODING, 'replace')
+                self._pending = []
+
+    @staticmethod
+    def _escape(match):
+        """
+        Moves a control char to CONTROL_CHARS_OFFSET.
+
+        :param match: the match of CONTROL_CHARS
+        :return: bytes with the reference to the char moved
+        """
+        code = CONTROL_CHARS_OFFSET + ord(match.group())
+        return '&#x{:X};'.format(code).encode('ascii')
+
+    def read(self, size=-1):
+        """
+        Reads bytes of the report.
+
+        :param size: the number of bytes, all of them by default
+        :return: bytes, empty when the report ends
+        """
+        if size is None:
+            size = -1
+        if size:
+            self._fill(size)
+        if size < 0:
+            size = len(self._buffer)
+        result, self._buffer = self._buffer[:size], self._buffer[size:]
+        return result
+
+
 class Service(object):
-    def __init__(self, fact_id, cnc_url, sync=True, source=None, priority=None):
+    def __init__(self, fact_id, cnc_url, sync=True, source=None, priority=None,
+                 timeout=20, operation_timeout=60, session=None, wsdl=WSDL,
+                 batch_size=None, batch_workers=2):
         self.cnc_url = cnc_url
         self.fact_id = fact_id
         self.sync = sync
@@ -49,9 +500,80 @@ class Service(object):
         else:
             self.source = source
 
+        self.timeout = timeout
+        self.operation_timeout = operation_timeout
+        self.session = session
+        self.wsdl = wsdl
+        self.batch_size = batch_size
+        self.batch_workers = batch_workers
         self.DC_service = self.create_service()
 
     def send(self, report_id, meters, date_from='', date_to='', priority=None):
+        """
+        Asks for a report. With a batch_size the meters are asked in \
+            batches and their reports are merged, see send_batches.
+
+        :param report_id: S02, S05, etc.
+        :param meters: a string with the meters separated by \
+            METER_SEPARATOR or a list of them, an empty one for all of them
+        :param date_from: the first date
+        :param date_to: the last date
+        :param priority: the priority, the one of the service by default
+        :return: the result of the request, see merge_reports
+        """
+        batches = split_meters(meters, self.batch_size)
+        if len(batches) == 1:
+            return self._send(
+                report_id, batches[0], date_from, date_to, priority
+            )
+        return merge_reports(list(self._send_batches(
+            report_id, batches, date_from, date_to, priority
+        )))
+
+    def send_batches(self, report_id, meters, date_from='', date_to='',
+                     priority=None):
+        """
+        Asks for a report of the meters in batches of batch_size meters, \
+            batch_workers of them at the same time.
+
+        :param report_id: S02, S05, etc.
+        :param meters: a string with the meters separated by \
+            METER_SEPARATOR or a list of them, see split_meters
+        :param date_from: the first date
+        :param date_to: the last date
+        :param priority: the priority, the one of the service by default
+        :return: an iterator over the results of every batch, in order, as \
+            soon as they are ready
+        """
+        return self._send_batches(
+            report_id, split_meters(meters, self.batch_size), date_from,
+            date_to, priority
+        )
+
+    def _send_batches(self, report_id, batches, date_from, date_to,
+                      priority):
+        """
+        Asks for a report of some batches of meters, see send_batches.
+
+        :param batches: a list of strings with the meters of every batch
+        :return: an iterator over the results of every batch
+        """
+        def send_batch(batch):
+            return self._send(report_id, batch, date_from, date_to, priority)
+
+        if len(batches) == 1 or self.batch_workers <= 1:
+            for batch in batches:
+                yield send_batch(batch)
+            return
+        pool = ThreadPool(min(self.batch_workers, len(batches)))
+        try:
+            for result in pool.imap(send_batch, batches):
+                yield result
+        finally:
+            pool.terminate()
+
+    def _send(self, report_id, meters, date_from='', date_to='',
+              priority=None):
         if priority is None:
             priority = self.priority
 
@@ -64,6 +586,55 @@ class Service(object):
                                                     meters, priority, self.source)
         return results
 
+    def fetch_report(self, report_id, meters, date_from='', date_to='',
+                     priority=None, **kwargs):
+        """
+        Asks for a report synchronously, parsing it as it's received.
+
+        The answer isn't read as a whole: the report is read incrementally \
+            from the connection by the Report, see SoapResultReader and \
+            Report.iter_values. The reports with errors that need the \
+            whole XML to be fixed, like null chars, are read again from \
+            what was received.
+
+        :param report_id: S02, S05, etc.
+        :param meters: a string with the meters separated by \
+            METER_SEPARATOR, an empty one for all of them
+        :param date_from: the first date
+        :param date_to: the last date
+        :param priority: the priority, the one of the service by default
+        :param kwargs: the keyword arguments of the Report, like fields
+        :raises zeep.exceptions.Fault: if the answer is a SOAP fault
+        :raises zeep.exceptions.TransportError: if the answer isn't a report
+        :return: a Report streaming the answer
+        """
+        if priority is None:
+            priority = self.priority
+        if isinstance(meters, (list, tuple)):
+            meters = METER_SEPARATOR.join(meters)
+        client = get_client(
+            self.wsdl, timeout=self.timeout,
+            operation_timeout=self.operation_timeout, session=self.session
+        )
+        body, headers = create_request(
+            client, self.DC_service, 'Request', self.fact_id, report_id,
+            date_from, date_to, meters, priority
+        )
+        response = client.transport.session.post(
+            self.cnc_url, data=body, headers=headers,
+            timeout=client.transport.operation_timeout, stream=True
+        )
+        if response.status_code != 200:
+            try:
+                raise_answer_error(response)
+            finally:
+                response.close()
+        reader = SoapResultReader(
+            response.iter_content(CHUNK_SIZE), close=response.close
+        )
+        kwargs['stream'] = True
+        return Report(reader, **kwargs)
+
     def send_with_parameters(self, report_id, meters, date_from='', date_to='', parameters=None, priority=None):
         if priority is None:
             priority = self.priority
@@ -168,11 +739,11 @@ class Service(object):
         return self.send_order('B12', order)
 
     def create_service(self):
-        transport = Transport(timeout=20, operation_timeout=60)
-        binding = '{http://www.asais.fr/ns/Saturne/DC/ws}WS_DCSoap'
-        client = Client(wsdl=primestg.get_data('WS_DC.wsdl'), transport=transport)
-        client.set_ns_prefix(None, 'http://www.asais.fr/ns/Saturne/DC/ws')
-        return client.create_service(binding, self.cnc_url)
+        client = get_client(
+            self.wsdl, timeout=self.timeout,
+            operation_timeout=self.operation_timeout, session=self.session
+        )
+        return client.create_service(BINDING, self.cnc_url)
 
     def get_instant_data(self, meters):
         """
@@ -7,6 +7,7 @@ from .contract_templates import CONTRACT_TEMPLATES
 from .dlms_templates import DLMS_TEMPLATES
 from pytz import timezone
 from copy import copy
+from collections import OrderedDict
 from string import printable
 
 from datetime import datetime
@@ -76,6 +77,15 @@ def octet2number(txt):
 
 
 def octet2date(txt):
+    """
+    Converts a prime date string (hexadecimal or not) to a datetime.
+
+    The datetime is built directly from its fields, strptime is only used \
+        to raise the same errors as it did for dates out of range.
+
+    :param txt: a string with the date, like 07E504010400000
+    :return: a datetime
+    """
     hexadecimal = True
     year = octet2number(txt[0:4])
     if txt.startswith('FFFF'):
@@ -114,8 +124,87 @@ def octet2date(txt):
     else:
         second = hexadecimal and octet2number(txt[12:14]) or int(second_txt)
 
+    if year >= 1000:
+        try:
+            return datetime(year, month, day, hour, minute, second)
+        except ValueError:
+            pass
     return datetime.strptime('{}-{}-{} {}:{}:{}'.format(year, month, day, hour, minute, second), '%Y-%m-%d %H:%M:%S')
 
+
+class LRUCache(object):
+    """
+    A dict like cache with a maximum size that discards the least recently \
+        used items and counts its hits and misses.
+    """
+
+    def __init__(self, maxsize=4096):
+        """
+        Creates a cache.
+
+        :param maxsize: the maximum number of items of the cache
+        :return: a LRUCache object
+        """
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """
+        Gets an item of the cache and marks it as the most recently used.
+
+        :param key: the key of the item
+        :param default: the value returned if the key isn't in the cache
+        :return: the value of the item or default
+        """
+        try:
+            value = self._items.pop(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        self._items[key] = value
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """
+        Stores an item in the cache, discarding the least recently used one \
+            if the cache is full.
+
+        :param key: the key of the item
+        :param value: the value of the item
+        """
+        self._items.pop(key, None)
+        if len(self._items) >= self.maxsize:
+            self._items.popitem(last=False)
+        self._items[key] = value
+
+    def clear(self):
+        """
+        Removes all the items of the cache and resets the counters.
+        """
+        self._items.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """
+        The statistics of the cache.
+
+        :return: a dict with the hits, misses, size and maxsize of the cache
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._items),
+            'maxsize': self.maxsize,
+        }
+
+    def __len__(self):
+        return len(self._items)
+
+
 def prepare_params(payload):
         """
         Prepares payload to DLMS format
@@ -17,6 +17,9 @@ setup(
         'libcomxml',
         'python-dateutil'
     ],
+    extras_require={
+        'numpy': ['numpy'],
+    },
     description='Prime STG-DC Interface Specification',
     long_description=readme,
     long_description_content_type='text/x-rst',
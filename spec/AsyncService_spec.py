@@ -0,0 +1,117 @@
+import os
+import threading
+
+import responses
+from expects import expect, equal, be_false, raise_error
+from primestg.async_service import AsyncService, asyncio
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = None
+from primestg.service import clear_clients
+
+WSDL = os.path.abspath('spec/data/WS_DC_minimal.wsdl')
+
+RESPONSE = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<soap:Envelope '
+    'xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+    '<soap:Body>'
+    '<RequestResponse xmlns="http://www.asais.fr/ns/Saturne/DC/ws">'
+    '<RequestResult>true</RequestResult>'
+    '</RequestResponse>'
+    '</soap:Body>'
+    '</soap:Envelope>'
+)
+
+
+def answer(wait=None):
+    def callback(request):
+        if wait is not None:
+            wait()
+        return 200, {'Content-Type': 'text/xml'}, RESPONSE
+    return callback
+
+
+def run(get_awaitable):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(get_awaitable())
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+with description('Asyncio concentrator services'):
+    with before.each:
+        clear_clients()
+
+    with it('asks many concentrators at the same time'):
+        # Only with asyncio (Python 3)
+        if asyncio is not None:
+            urls = ['http://cnc{}:8080/'.format(index) for index in range(8)]
+            # Every answer waits for all the calls, so they must be made
+            # at the same time or the barrier breaks
+            barrier = threading.Barrier(len(urls), timeout=10)
+            with responses.RequestsMock() as rsps:
+                for url in urls:
+                    rsps.add_callback(
+                        responses.POST, url, callback=answer(barrier.wait)
+                    )
+                services = [AsyncService(1, url, wsdl=WSDL) for url in urls]
+                results = run(lambda: asyncio.gather(*[
+                    service.get_daily_absolute('ZIV0040318130', '', '')
+                    for service in services
+                ]))
+            expect(results).to(equal(['true'] * len(urls)))
+            expect(barrier.broken).to(be_false)
+
+    with it('gives up on a concentrator after its timeout'):
+        if asyncio is not None:
+            # The answer doesn't come until the call has timed out
+            answered = threading.Event()
+            executor = ThreadPoolExecutor(1)
+            with responses.RequestsMock(
+                    assert_all_requests_are_fired=False) as rsps:
+                rsps.add_callback(
+                    responses.POST, 'http://cnc:8080/',
+                    callback=answer(lambda: answered.wait(10))
+                )
+                service = AsyncService(
+                    1, 'http://cnc:8080/', wsdl=WSDL, executor=executor
+                )
+
+                def ask():
+                    return run(lambda: service.get_daily_absolute(
+                        'ZIV0040318130', '', '', timeout=0.05
+                    ))
+                try:
+                    expect(ask).to(raise_error(asyncio.TimeoutError))
+                finally:
+                    answered.set()
+                    executor.shutdown(wait=True)
+
+    with it('creates the service in the executor'):
+        if asyncio is not None:
+            with responses.RequestsMock() as rsps:
+                rsps.add_callback(
+                    responses.POST, 'http://cnc:8080/', callback=answer()
+                )
+                service = AsyncService(1, 'http://cnc:8080/', wsdl=WSDL)
+                expect(service._service).to(equal(None))
+                result = run(lambda: service.get_daily_absolute(
+                    'ZIV0040318130', '', ''
+                ))
+            expect(result).to(equal('true'))
+            expect(service.get_service().cnc_url).to(equal('http://cnc:8080/'))
+
+    with it('doesn\'t give the methods reading from the connection'):
+        if asyncio is not None:
+            service = AsyncService(1, 'http://cnc:8080/', wsdl=WSDL)
+            expect(lambda: service.send_batches).to(raise_error(AttributeError))
+            expect(lambda: service.fetch_report).to(raise_error(AttributeError))
+            expect(lambda: service.call('fetch_report', 'S02', '')).to(
+                raise_error(ValueError)
+            )
+            expect(service._service).to(equal(None))
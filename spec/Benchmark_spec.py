@@ -0,0 +1,61 @@
+
+from expects import expect, equal, be_none, be_above
+from primestg.benchmark import (
+    REPORT_TYPES, generate_report, measure_command, run_benchmark
+)
+from primestg.benchmark.startup import get_import_seconds
+from primestg.report import Report
+
+
+with description('Benchmark of the reports'):
+
+    with it('generates reports with the rows asked'):
+        rows = {
+            'S02': 2 * 3 * 2 * 24,
+            'S04': 2 * 3 * 2 * 7 * 2,
+            'S05': 2 * 3 * 2 * 7,
+            'S09': 2 * 3 * 2 * 4,
+            'S12': 2 * 2,
+            'S23': 2 * 3 * 2,
+            'S52': 2 * 3 * 2 * 24,
+            'G02': 2 * 3 * 2,
+        }
+        for report_type in REPORT_TYPES:
+            report = Report(generate_report(
+                report_type, meters=3, days=2, concentrators=2
+            ))
+            result = report.parse()
+            expect(len(result.values)).to(equal(rows[report_type]))
+            expect(result.warnings).to(equal([]))
+
+    with it('corrupts measure sets with null chars'):
+        report = Report(generate_report('S02', meters=3, corrupt=0.5))
+        result = report.parse()
+        expect(len(result.values)).to(equal(3 * 24))
+        expect(result.errors['message']).to(be_above(0))
+
+    with it('measures every case'):
+        results = list(run_benchmark(
+            report_types=['S02', 'S05'], modes=['values', 'stream'],
+            meters=2, compress=True, isolate=False
+        ))
+        expect(len(results)).to(equal(4))
+        for result in results:
+            expect(result['error']).to(be_none)
+            expect(result['rows_per_second']).to(be_above(0))
+        expect([result['rows'] for result in results]).to(
+            equal([48, 48, 14, 14])
+        )
+
+    with it('measures the imports of the commands'):
+        output = '\n'.join([
+            'import time: self [us] | cumulative | imported package',
+            'import time:       100 |        100 |   _io',
+            'import time:       200 |        300 | site',
+            'import time:       500 |        500 |   primestg.utils',
+            'import time:      1000 |       1500 | primestg.cli',
+        ])
+        expect(get_import_seconds(output)).to(equal((0.0018, 4)))
+        expect(get_import_seconds('')).to(equal((None, 0)))
+        result = measure_command(['missing', '--help'], repeat=1)
+        expect(result['error']).not_to(be_none)
@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+
+import responses
+from expects import expect, equal, be_none, contain, be_below
+from requests.exceptions import ConnectionError
+from primestg.fleet import FleetScheduler
+from primestg.service import clear_clients
+from primestg.utils import PRIORITY_VERYHIGH, PRIORITY_HIGH, PRIORITY_NORMAL
+
+WSDL = os.path.abspath('spec/data/WS_DC_minimal.wsdl')
+
+RESPONSE = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<soap:Envelope '
+    'xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+    '<soap:Body>'
+    '<RequestResponse xmlns="http://www.asais.fr/ns/Saturne/DC/ws">'
+    '<RequestResult>true</RequestResult>'
+    '</RequestResponse>'
+    '</soap:Body>'
+    '</soap:Envelope>'
+)
+
+
+with description('Asking for reports to a fleet of concentrators'):
+    with before.each:
+        clear_clients()
+        self.calls = []
+        self.active = {'now': 0, 'max': 0}
+        self.lock = threading.Lock()
+
+        def answer(request):
+            with self.lock:
+                self.calls.append(request.url)
+                self.active['now'] += 1
+                self.active['max'] = max(
+                    self.active['max'], self.active['now']
+                )
+            time.sleep(0.05)
+            with self.lock:
+                self.active['now'] -= 1
+            return 200, {'Content-Type': 'text/xml'}, RESPONSE
+        self.answer = answer
+
+    with it('asks by priority'):
+        scheduler = FleetScheduler(workers=1, wsdl=WSDL)
+        urls = {
+            'http://cnc1:8080/': PRIORITY_NORMAL,
+            'http://cnc2:8080/': PRIORITY_VERYHIGH,
+            'http://cnc3:8080/': PRIORITY_HIGH,
+        }
+        with responses.RequestsMock() as rsps:
+            for url, priority in sorted(urls.items()):
+                rsps.add_callback(responses.POST, url, callback=self.answer)
+                scheduler.add(url, 'S05', priority=priority)
+            results = list(scheduler.run())
+        expect([result['cnc_url'] for result in results]).to(equal([
+            'http://cnc2:8080/', 'http://cnc3:8080/', 'http://cnc1:8080/'
+        ]))
+        for result in results:
+            expect(result['result']).to(equal('true'))
+            expect(result['error']).to(be_none)
+
+    with it('limits the calls to the same host'):
+        scheduler = FleetScheduler(workers=4, per_host=1, wsdl=WSDL)
+        with responses.RequestsMock() as rsps:
+            rsps.add_callback(
+                responses.POST, 'http://cnc:8080/', callback=self.answer
+            )
+            for meter in range(4):
+                scheduler.add('http://cnc:8080/', 'S02', 'ZIV{}'.format(meter))
+            results = list(scheduler.run())
+        expect(len(results)).to(equal(4))
+        expect(self.active['max']).to(equal(1))
+
+    with it('asks many hosts at the same time'):
+        scheduler = FleetScheduler(workers=4, wsdl=WSDL)
+        urls = ['http://cnc{}:8080/'.format(index) for index in range(4)]
+        with responses.RequestsMock() as rsps:
+            for url in urls:
+                rsps.add_callback(responses.POST, url, callback=self.answer)
+            scheduler.add_all(urls, 'S05', '20170610010000', '20170611000000')
+            results = list(scheduler.run())
+        expect(sorted(result['cnc_url'] for result in results)).to(
+            equal(urls)
+        )
+        expect(self.active['max']).to(be_below(5))
+        expect(self.active['max'] > 1).to(equal(True))
+
+    with it('retries the failed calls with backoff'):
+        scheduler = FleetScheduler(retries=2, backoff=0.01, wsdl=WSDL)
+        with responses.RequestsMock() as rsps:
+            rsps.add(responses.POST, 'http://cnc1:8080/',
+                     body=ConnectionError('refused'))
+            rsps.add_callback(
+                responses.POST, 'http://cnc1:8080/', callback=self.answer
+            )
+            rsps.add(responses.POST, 'http://cnc2:8080/',
+                     body=ConnectionError('refused'))
+            scheduler.add('http://cnc1:8080/', 'S05')
+            scheduler.add('http://cnc2:8080/', 'S05')
+            results = dict(
+                (result['cnc_url'], result) for result in scheduler.run()
+            )
+        expect(results['http://cnc1:8080/']['attempts']).to(equal(2))
+        expect(results['http://cnc1:8080/']['result']).to(equal('true'))
+        expect(results['http://cnc2:8080/']['attempts']).to(equal(3))
+        expect(results['http://cnc2:8080/']['error']).to(
+            contain('ConnectionError')
+        )
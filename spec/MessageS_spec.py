@@ -1,7 +1,8 @@
-from expects import expect, raise_error, be_a
+from expects import expect, raise_error, be_a, equal, contain
 from primestg.message import MessageS
 from lxml.objectify import ObjectifiedElement
-from lxml.etree import XMLSyntaxError
+from lxml.etree import XMLSyntaxError, _Element, tostring
+from io import BytesIO
 
 
 with description('MessageS'):
@@ -21,3 +22,69 @@ with description('MessageS'):
         with open(filename) as data_file:
             message_s = MessageS(data_file)
         expect(message_s.objectified).to(be_a(ObjectifiedElement))
+
+    with it('can parse an XML with the etree parser'):
+        filename = 'spec/data/CIR4621247027_0_S02_0_20150901111051'
+        with open(filename) as data_file:
+            message_s = MessageS(data_file, parser='etree')
+        expect(message_s.objectified).to(be_a(_Element))
+        expect(message_s.objectified).not_to(be_a(ObjectifiedElement))
+
+    with it('raise an error if the parser isn\'t supported'):
+
+        def callback():
+            MessageS('<xml><tag attr="var"/></xml>', parser='foo')
+
+        expect(callback).to(raise_error(ValueError))
+
+    with context('bytes'):
+        with before.all:
+            self.filenames = [
+                'spec/data/CIR4621247027_0_S02_0_20150901111051',
+                'spec/data/CIR4621802303_4F39_S05_1_20190221014548',
+            ]
+
+        with it('gives the same XML from bytes, binary files and mmap'):
+            for filename in self.filenames:
+                with open(filename, 'rb') as data_file:
+                    expected = MessageS(data_file, keep_text=True)
+                    data_file.seek(0)
+                    content = data_file.read()
+                    data_file.seek(0)
+                    from_file = MessageS(data_file)
+                    data_file.seek(0)
+                    from_mmap = MessageS(data_file, use_mmap=True)
+                from_bytes = MessageS(content)
+                for message_s in (from_file, from_mmap, from_bytes):
+                    expect(tostring(message_s.objectified)).to(
+                        equal(tostring(expected.objectified))
+                    )
+                    expect(message_s.text).to(equal(None))
+                expect(expected.text).to(contain('<Report'))
+
+        with it('deletes the null chars of a binary file'):
+            filename = 'spec/data/CIR4621247027_0_S02_0_20150901111051'
+            with open(filename, 'rb') as data_file:
+                xml = data_file.read()
+            position = xml.index(b'Bc="00"', len(xml) // 2)
+            xml = xml[:position] + b'Bc="0\x00X"' + xml[position + 7:]
+            expected = MessageS(xml, keep_text=True)
+            for message_s in (MessageS(xml), MessageS(BytesIO(xml))):
+                expect(tostring(message_s.objectified)).to(
+                    equal(tostring(expected.objectified))
+                )
+                expect(message_s.warnings).to(equal([
+                    'WARNING: Deleted 2 chars from a null char at offset '
+                    '{}'.format(position + 5)
+                ]))
+
+        with it('recovers the XML errors that aren\'t null chars'):
+            filename = 'spec/data/CIR4621247027_0_S02_0_20150901111051'
+            with open(filename, 'rb') as data_file:
+                xml = data_file.read()
+            position = xml.index(b'Bc="00"')
+            xml = xml[:position] + b'Bc="00" Bc="00"' + xml[position + 7:]
+            expect(lambda: MessageS(xml)).to(raise_error(XMLSyntaxError))
+            message_s = MessageS(xml, recover=True)
+            expect(message_s.objectified.tag).to(equal('Report'))
+            expect(message_s.warnings[0]).to(contain('Recovered from'))
@@ -1,4 +1,5 @@
 from expects import expect, equal
+from datetime import datetime
 from primestg.report import Report
 from ast import literal_eval
 
@@ -66,3 +67,17 @@ with description('Report G01 example'):
                 expect(len(list(warning.values())[0])).to(equal(1))
                 total_warnings += 1
         expect(total_warnings).to(equal(3))
+
+    with it('gives the same values by columns'):
+        for report in self.report:
+            values = report.values
+            columns = report.to_columns()
+            expect(len(columns['timestamp'])).to(equal(len(values)))
+            for index, value in enumerate(values):
+                meter = columns['meter_names'][columns['meter'][index]]
+                timestamp = columns['timestamp'][index].astype(datetime)
+                expect(meter).to(equal(value['name']))
+                expect(timestamp.strftime('%Y-%m-%d %H:%M:%S'))\
+                    .to(equal(value['timestamp']))
+                for name in ('atime', 'nchanges', 'aconc', 'atimeperc'):
+                    expect(columns[name][index]).to(equal(value[name]))
@@ -1,5 +1,7 @@
 from expects import expect, equal
+from datetime import datetime
 from primestg.report import Report
+from primestg.report.base import ValueWithTime, decode_timestamps
 from ast import literal_eval
 
 
@@ -84,3 +86,46 @@ with description('Report S02 example'):
                 expect(len(list(warning.values())[0])).to(equal(1))
                 meter_found += 1
         expect(meter_found).to(equal(2))
+
+    with it('gives the same values by columns'):
+        for report in self.report:
+            values = report.values
+            columns = report.to_columns()
+            expect(len(columns['timestamp'])).to(equal(len(values)))
+            for index, value in enumerate(values):
+                meter = columns['meter_names'][columns['meter'][index]]
+                cnc = columns['cnc_names'][columns['cnc'][index]]
+                timestamp = columns['timestamp'][index].astype(datetime)
+                row = {
+                    'name': meter,
+                    'cnc_name': cnc,
+                    'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                    'season': columns['season'][index],
+                    'bc': '{:02X}'.format(columns['bc'][index]),
+                    'magn': columns['magn'][index],
+                }
+                for name in ('ai', 'ae', 'r1', 'r2', 'r3', 'r4'):
+                    row[name] = columns[name][index]
+                expect(row).to(equal(value))
+
+    with it('decodes the timestamps at once like one by one'):
+        raw = [
+            '20150901010000000S', '20151025020000000W', '00001228230000W',
+            'FFFFFFFFFFFFFFFFFFFFFFFF', '07DF09010100000000S',
+            '20150230000000S', '2015090125', '',
+        ]
+        timestamps, seasons = decode_timestamps(raw)
+        for index, value in enumerate(raw):
+            try:
+                expected = ValueWithTime._to_timestamp(value, 'Fh')
+            except Exception:
+                expected = None
+            timestamp = timestamps[index]
+            if str(timestamp) == 'NaT':
+                timestamp = None
+            else:
+                timestamp = timestamp.astype(datetime).strftime(
+                    '%Y-%m-%d %H:%M:%S'
+                )
+            expect(timestamp).to(equal(expected))
+            expect(seasons[index]).to(equal(value[-1:]))
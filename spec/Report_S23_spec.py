@@ -394,3 +394,25 @@ with description('Report S23 examples'):
                             contrato = powers_act['contrato3']
                             expect(contrato).not_to(be_empty)
                             expect(len(contrato.keys())).to(equal(6))
+
+    with it('gives the values of the meters of the whole report'):
+        for filename in self.data_filenames:
+            with open(filename) as data_file:
+                report = Report(data_file)
+            expected = []
+            for cnc in report.concentrators:
+                for meter in cnc.meters:
+                    expected.extend(meter.values)
+            expect(expected).not_to(be_empty)
+            expect(report.values).to(equal(expected))
+
+    with it('gives the values of the meters of every concentrator'):
+        for filename in self.data_filenames:
+            with open(filename) as data_file:
+                report = Report(data_file)
+            for cnc in report.concentrators:
+                expected = []
+                for meter in cnc.meters:
+                    expected.extend(meter.values)
+                expect(expected).not_to(be_empty)
+                expect(cnc.values).to(equal(expected))
@@ -0,0 +1,64 @@
+from expects import expect, equal, contain, have_key, be_none
+from primestg.report import Report
+from primestg.report.bulk import read_reports
+from primestg.report.bulk import get_report_type
+
+
+with description('Reading reports in bulk'):
+    with before.all:
+
+        self.paths = [
+            'spec/data/CIR4621247027_0_S02_0_20150901111051',
+            'spec/data/CIR4621247027_0_S05_0_20150901072044_warnings',
+            'spec/data/S0*.xml',
+        ]
+        self.filenames = [
+            'spec/data/CIR4621247027_0_S02_0_20150901111051',
+            'spec/data/CIR4621247027_0_S05_0_20150901072044_warnings',
+            'spec/data/S01.xml',
+            'spec/data/S01_empty.xml',
+            'spec/data/S06.xml',
+            'spec/data/S06_empty.xml',
+            'spec/data/S06_empty_datetime.xml',
+            'spec/data/S06_with_error.xml',
+        ]
+
+    with it('infers the report type from the filename or the report'):
+        expect(get_report_type(self.filenames[0])).to(equal('S02'))
+        expect(get_report_type('spec/data/S06.xml')).to(equal('S06'))
+
+    with it('gives the same values as the report, in order'):
+        for workers in (1, 2):
+            results = list(read_reports(self.paths, workers=workers))
+            filenames = [result['filename'] for result in results]
+            expect(filenames).to(equal(self.filenames))
+            for result in results:
+                expect(result['error']).to(be_none)
+                with open(result['filename'], 'rb') as data_file:
+                    report = Report(data_file)
+                expect(result['report_type']).to(equal(report.report_type))
+                expect(result['values']).to(equal(report.values))
+
+    with it('gives the warnings of the meters'):
+        results = list(read_reports(self.paths[1], workers=1))
+        warnings = results[0]['warnings']
+        expect(len(warnings)).to(equal(1))
+        expect(warnings[0]).to(have_key('CIR0141433184'))
+        expect(results[0]['errors']).to(equal(
+            {'message': 0, 'concentrator': 0, 'meter': 1, 'measure': 2}
+        ))
+
+    with it('skips the files of other report types'):
+        results = read_reports(
+            self.paths, report_types=['S06'], ordered=False, chunksize=2
+        )
+        filenames = sorted(result['filename'] for result in results)
+        expect(filenames).to(equal(self.filenames[4:]))
+
+    with it('gives the errors of every file'):
+        results = list(read_reports(
+            'spec/data/Ciclo_instant_data_minute_20241129_124027.csv',
+            workers=1
+        ))
+        expect(results[0]['error']).to(contain('XMLSyntaxError'))
+        expect(results[0]['values']).to(equal([]))
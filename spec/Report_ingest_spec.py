@@ -0,0 +1,87 @@
+import os
+import re
+import shutil
+import tempfile
+
+from expects import expect, equal, be_none, be_true, be_false
+from primestg.benchmark import write_report
+from primestg.report.ingest import (
+    IngestionIndex, fingerprint_report, ingest_reports
+)
+
+
+with description('Ingesting reports incrementally'):
+    with before.each:
+        self.directory = tempfile.mkdtemp()
+        self.index_filename = os.path.join(self.directory, 'index.sqlite')
+        self.filenames = []
+        for day, days in enumerate((2, 3)):
+            filename = os.path.join(
+                self.directory,
+                'CIR0000000000_0_S02_0_2015090{}000000'.format(day)
+            )
+            write_report(filename, 'S02', meters=2, days=days)
+            self.filenames.append(filename)
+
+    with after.each:
+        shutil.rmtree(self.directory)
+
+    with it('fingerprints the content and the header of the files'):
+        with open(self.filenames[0], 'rb') as report_file:
+            header = fingerprint_report(report_file.read())
+        expect(header['report_type']).to(equal('S02'))
+        expect(header['request_id']).to(equal('0'))
+        expect(header['fingerprint'].startswith('S02:0:CIR')).to(be_true)
+
+    with it('gives only the values not ingested yet'):
+        index = IngestionIndex(self.index_filename)
+        results = list(ingest_reports(self.filenames, index))
+        expect([len(result['values']) for result in results]).to(
+            equal([2 * 2 * 24, 2 * 24])
+        )
+        expect([result['duplicates'] for result in results]).to(
+            equal([0, 2 * 2 * 24])
+        )
+        ingested = max(value['timestamp'] for value in results[0]['values'])
+        for value in results[1]['values']:
+            expect(value['timestamp'] > ingested).to(be_true)
+        index.close()
+
+        index = IngestionIndex(self.index_filename)
+        results = list(ingest_reports(self.directory + '/CIR*', index))
+        for result in results:
+            expect(result['skipped']).to(be_true)
+            expect(result['values']).to(equal([]))
+        index.close()
+
+    with it('gives the older values uploaded later'):
+        with open(self.filenames[1], 'rb') as report_file:
+            content = report_file.read()
+        with open(self.filenames[1], 'wb') as report_file:
+            report_file.write(
+                re.sub(b'<S02 Fh="20150902[^>]*/>\n', b'', content)
+            )
+        index = IngestionIndex(self.index_filename)
+        list(ingest_reports(self.filenames[1], index))
+        with open(self.filenames[1], 'wb') as report_file:
+            report_file.write(content)
+        results = list(ingest_reports(self.filenames[1], index))
+        expect(results[0]['skipped']).to(be_false)
+        expect(len(results[0]['values'])).to(equal(2 * 24))
+        for value in results[0]['values']:
+            expect(value['timestamp'].startswith('2015-09-02')).to(be_true)
+        index.close()
+
+    with it('records a file before giving its values'):
+        index = IngestionIndex(self.index_filename)
+        results = ingest_reports(self.filenames, index)
+        first = next(results)
+        expect(first['error']).to(be_none)
+        index.close()
+
+        index = IngestionIndex(self.index_filename)
+        results = list(ingest_reports(self.filenames, index))
+        expect(results[0]['skipped']).to(be_true)
+        expect(results[1]['skipped']).to(be_false)
+        expect(results[1]['duplicates']).to(equal(2 * 2 * 24))
+        index.close()
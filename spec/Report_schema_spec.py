@@ -0,0 +1,63 @@
+from expects import expect, equal, raise_error
+from primestg.report.schema import (
+    Field, compile_schema, register_schema, get_extractor, uses_name,
+    get_integer_value, SCHEMAS, EXTRACTORS
+)
+from primestg.report.reports import Report
+
+
+with description('Report schemas'):
+    with it('extracts the fields of an element'):
+        extract = compile_schema([
+            Field('A', 'a', int),
+            Field('B', 'b', None),
+            Field('C', 'c', get_integer_value),
+        ])
+        expect(extract({'A': '1', 'B': 'x', 'C': 'wrong'})).to(equal(
+            {'a': 1, 'b': 'x', 'c': 0}
+        ))
+        expect(lambda: extract({})).to(raise_error(TypeError))
+
+    with it('converts the same attribute once'):
+        calls = []
+
+        @uses_name
+        def convert(value, name):
+            calls.append(name)
+            return value.lower()
+
+        extract = compile_schema([
+            Field('Fh', 'date_begin', convert),
+            Field('Fh', 'date_end', convert),
+        ])
+        expect(extract({'Fh': 'X'})).to(equal(
+            {'date_begin': 'x', 'date_end': 'x'}
+        ))
+        expect(calls).to(equal(['Fh']))
+
+    with it('gets the fields of a version or the ones of all versions'):
+        try:
+            register_schema('S99', [Field('A', 'a', int)])
+            register_schema('S99', [Field('A', 'a', float)], version='2.0')
+            expect(get_extractor('S99', '1.0')({'A': '1'})).to(equal(
+                {'a': 1}
+            ))
+            expect(get_extractor('S99', '2.0')({'A': '1'})).to(equal(
+                {'a': 1.0}
+            ))
+            expect(lambda: get_extractor('S98')).to(raise_error(KeyError))
+        finally:
+            for key in (('S99', None), ('S99', '2.0')):
+                SCHEMAS.pop(key)
+                EXTRACTORS.pop(key)
+
+    with it('gives the values of the reports'):
+        filename = 'spec/data/CIR4621247027_0_S02_0_20150901111051'
+        with open(filename, 'rb') as data_file:
+            report = Report(data_file)
+        measure = report.concentrators[0].meters[0].measures[0]
+        values = get_extractor('S02')(measure.objectified)
+        expect(measure.values).to(equal([values]))
+        expect(sorted(values)).to(equal(sorted([
+            'ai', 'ae', 'r1', 'r2', 'r3', 'r4', 'timestamp', 'season', 'bc'
+        ])))
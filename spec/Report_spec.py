@@ -1,6 +1,12 @@
-from expects import expect, raise_error, be_a
+from expects import expect, raise_error, be_a, be, equal
 from primestg.report import Report
 from primestg.message import MessageS
+from primestg.report.base import (
+    Record, make_record, get_time_range, in_time_range
+)
+from primestg.report.instrumentation import Instrumentation, count_warnings
+from datetime import datetime
+from io import BytesIO
 
 
 with description('Report'):
@@ -27,3 +33,395 @@ with description('Report'):
             message_s = MessageS(f)
         report = Report(message_s)
         expect(report.message).to(be_a(MessageS))
+
+    with context('etree parser'):
+        with it('gives the same values and warnings as objectify'):
+            data_filenames = [
+                'spec/data/CIR4621247027_0_S02_0_20150901111051_warnings',
+                'spec/data/CIR4621247027_0_S04_0_20150901110412_warnings',
+                'spec/data/CIR4621802303_4F39_S05_1_20190221014548',
+                'spec/data/CIR4621247027_0_S12_0_20150903140000_warnings',
+                'spec/data/S26.xml',
+                'spec/data/MRTR000000822522_0_S52_1_20200929001048',
+            ]
+            for data_filename in data_filenames:
+                results = []
+                for parser in ('objectify', 'etree'):
+                    with open(data_filename, 'rb') as data_file:
+                        report = Report(data_file, parser=parser)
+                    if report.report_type == 'S52':
+                        elements = list(report.rt_units)
+                    else:
+                        elements = list(report.concentrators)
+                    values = []
+                    for element in elements:
+                        values.extend(element.values)
+                    warnings = [element.warnings for element in elements]
+                    results.append((values, warnings))
+                expect(results[1]).to(equal(results[0]))
+
+        with it('gives the same S26 values with empty data values'):
+            report = (
+                b'<Report IdRpt="S26" IdPet="0" Version="3.1.c">'
+                b'<Cnc Id="ZIV0004366654"><Cnt Id="ZIV0044548861">'
+                b'<S26 Fh="20240909115858000S">'
+                b'<DataId>PP</DataId><DataValue>1,,1</DataValue>'
+                b'<DataId>Qimp</DataId><DataValue/>'
+                b'<DataId>L2i</DataId><DataValue>12.50</DataValue>'
+                b'</S26></Cnt></Cnc></Report>'
+            )
+            values = [
+                Report(BytesIO(report), parser=parser).values
+                for parser in ('objectify', 'etree')
+            ]
+            expect(values[1]).to(equal(values[0]))
+            expect(values[0][0]['phase_presence']).to(equal([1, 0, 1]))
+            expect(values[0][0]['reactive_power_import1']).to(equal(0))
+            expect(values[0][0]['current2']).to(equal(12.5))
+
+    with context('records'):
+        with it('gives records with the same values'):
+            data_filenames = [
+                'spec/data/CIR4621247027_0_S02_0_20150901111051',
+                'spec/data/CIR4621247027_0_S05_0_20150901072044_warnings',
+                'spec/data/S01.xml',
+                'spec/data/MRTR000000822522_0_S52_1_20200929001048',
+            ]
+            for data_filename in data_filenames:
+                with open(data_filename, 'rb') as data_file:
+                    values = Report(data_file).values
+                with open(data_filename, 'rb') as data_file:
+                    records = Report(data_file, records=True).values
+                expect(records).to(equal(values))
+                for record, value in zip(records, values):
+                    expect(record).to(be_a(Record))
+                    expect(record.as_dict()).to(equal(value))
+                    expect(record['name']).to(equal(value['name']))
+
+        with it('can be used like a dict'):
+            record = make_record({'ai': 1.0, 'ae': 0.0}, {'name': 'a'})
+            expect(record.ai).to(equal(1.0))
+            expect(record.keys()).to(equal(['ai', 'ae', 'name']))
+            expect(dict(record)).to(equal({'ai': 1.0, 'ae': 0.0, 'name': 'a'}))
+            record['ae'] = 2.0
+            expect(record.get('ae')).to(equal(2.0))
+            expect(record.get('r1')).to(equal(None))
+            expect(type(record)).to(equal(type(make_record(
+                {'ai': 2.0, 'ae': 1.0, 'name': 'b'}
+            ))))
+
+    with context('fields'):
+        with it('gives only the keys of fields'):
+            fields = ['name', 'timestamp', 'ai', 'ae']
+            data_filenames = [
+                'spec/data/CIR4621247027_0_S02_0_20150901111051',
+                'spec/data/CIR4621247027_0_S05_0_20150901072044',
+                'spec/data/ZIV0004342071_0_S06_0_20231229102339',
+            ]
+            for data_filename in data_filenames:
+                with open(data_filename, 'rb') as data_file:
+                    report = Report(data_file)
+                expected = [
+                    dict((k, v) for k, v in value.items() if k in fields)
+                    for value in report.values
+                ]
+                expect(report.values_only(fields)).to(equal(expected))
+                with open(data_filename, 'rb') as data_file:
+                    report = Report(data_file, fields=fields, records=True)
+                expect(report.values).to(equal(expected))
+                with open(data_filename, 'rb') as data_file:
+                    report = Report(data_file, fields=fields, stream=True)
+                    expect(list(report.iter_values())).to(equal(expected))
+
+        with it('doesn\'t convert the other attributes'):
+            filename = 'spec/data/CIR4621247027_0_S02_0_20150901111051'
+            with open(filename, 'rb') as data_file:
+                xml = data_file.read()
+            xml = xml.replace(b'R4="0"', b'R4="wrong"', 1)
+            expect(Report(xml).parse().errors['meter']).to(equal(1))
+            result = Report(xml, fields=['name', 'ai']).parse()
+            expect(result.errors['meter']).to(equal(0))
+            expect(len(result.values)).to(equal(len(Report(xml).values) + 1))
+
+    with context('filters'):
+        with it('reads only the meters and the time range asked'):
+            data_filenames = [
+                'spec/data/CIR4621247027_0_S02_0_20150901111051',
+                'spec/data/ZIV0000034180_0_S09_0_20161216080308',
+            ]
+            for data_filename in data_filenames:
+                with open(data_filename, 'rb') as data_file:
+                    values = Report(data_file).values
+                names = sorted(set(value['name'] for value in values))[1::2]
+                timestamps = sorted(value['timestamp'] for value in values)
+                date_from = timestamps[len(timestamps) // 4]
+                date_to = timestamps[len(timestamps) // 2]
+                expected = [
+                    value for value in values
+                    if value['name'] in names and
+                    date_from <= value['timestamp'] <= date_to
+                ]
+                expect(expected).not_to(equal([]))
+                for stream in (False, True):
+                    with open(data_filename, 'rb') as data_file:
+                        report = Report(
+                            data_file, stream=stream, meters=names,
+                            date_from=date_from,
+                            date_to=datetime.strptime(
+                                date_to, '%Y-%m-%d %H:%M:%S'
+                            )
+                        )
+                        expect(list(report.iter_values())).to(
+                            equal(expected)
+                        )
+
+        with it('skips the measure sets out of the range before reading them'):
+            filename = 'spec/data/CIR4621247027_0_S02_0_20150901111051'
+            with open(filename, 'rb') as data_file:
+                report = Report(
+                    data_file, date_from='2015-08-31',
+                    date_to='2015-08-31 02:00:00'
+                )
+            meter = report.concentrators[0].meters[0]
+            expect(len(meter.measures)).to(equal(1))
+            expect(meter.values[0]['timestamp']).to(
+                equal('2015-08-31 02:00:00')
+            )
+
+        with it('includes the whole day of a last date without time'):
+            for date_to in ('2015-08-31', datetime(2015, 8, 31).date()):
+                time_range = get_time_range('2015-08-31', date_to)
+                expect(in_time_range('20150831000000000S', time_range)).to(
+                    equal(True)
+                )
+                expect(in_time_range('20150831235959000S', time_range)).to(
+                    equal(True)
+                )
+                expect(in_time_range('20150901000000000S', time_range)).to(
+                    equal(False)
+                )
+            time_range = get_time_range(None, '2015-08-31 12:00:00')
+            expect(in_time_range('20150831120000000S', time_range)).to(
+                equal(True)
+            )
+            expect(in_time_range('20150831120001000S', time_range)).to(
+                equal(False)
+            )
+
+        with it('decodes the hexadecimal dates before comparing them'):
+            time_range = get_time_range('2021-01-01', '2021-12-31')
+            expect(in_time_range('07E5040104000000W', time_range)).to(
+                equal(True)
+            )
+            expect(in_time_range('0021040104000000W', time_range)).to(
+                equal(True)
+            )
+            expect(in_time_range('07E6040104000000W', time_range)).to(
+                equal(False)
+            )
+            filename = 'spec/data/CIR4621247027_0_S02_0_20150901111051'
+            with open(filename, 'rb') as data_file:
+                xml = data_file.read()
+            xml = xml.replace(
+                b'Fh="20150831020000000S"', b'Fh="07DF081F020000000S"', 1
+            )
+            report = Report(
+                xml, date_from='2015-08-31', date_to='2015-08-31 02:00:00'
+            )
+            meter = report.concentrators[0].meters[0]
+            expect(len(meter.measures)).to(equal(1))
+            expect(meter.values[0]['timestamp']).to(
+                equal('2015-08-31 02:00:00')
+            )
+
+    with context('parse'):
+        with it('gives the values, warnings and errors at once'):
+            filename = 'spec/data/CIR4621247027_0_S02_0_20150901111051_warnings'
+            with open(filename, 'rb') as data_file:
+                values = Report(data_file).values
+            with open(filename, 'rb') as data_file:
+                result = Report(data_file).parse()
+            expect(result.report_type).to(equal('S02'))
+            expect(result.values).to(equal(values))
+            names = [list(warning.keys())[0] for warning in result.warnings]
+            expect(names).to(equal(['CIR0141433184', 'CIR0308247071']))
+            expect(result.errors).to(equal(
+                {'message': 0, 'concentrator': 0, 'meter': 2, 'measure': 5}
+            ))
+
+        with it('counts the warnings of concentrators without meters'):
+            filename = 'spec/data/CIR4621531018_0_G01_0_20250531063000_warnings'
+            with open(filename, 'rb') as data_file:
+                result = Report(data_file).parse()
+            expect(len(result.warnings)).to(equal(2))
+            expect(result.errors).to(equal(
+                {'message': 0, 'concentrator': 1, 'meter': 0, 'measure': 2}
+            ))
+
+        with it('counts the null chars deleted from the message'):
+            filename = 'spec/data/CIR4621247027_0_S02_0_20150901111051'
+            with open(filename, 'rb') as data_file:
+                xml = data_file.read()
+            values = Report(xml).values
+            position = xml.index(b'Bc="00"')
+            xml = xml[:position] + b'Bc="00\x00"' + xml[position + 7:]
+            result = Report(xml).parse()
+            expect(result.values).to(equal(values))
+            expect(result.warnings[0]).to(equal(
+                'WARNING: Deleted 1 chars from a null char at offset {}'.format(
+                    position + 6
+                )
+            ))
+            expect(result.errors['message']).to(equal(1))
+
+    with context('cache'):
+        with it('builds the concentrators, meters and measures once'):
+            filename = 'spec/data/CIR4621247027_0_S05_0_20150901072044_warnings'
+            with open(filename, 'rb') as data_file:
+                report = Report(data_file)
+            concentrator = report.concentrators[0]
+            meter = concentrator.meters[0]
+            expect(report.concentrators[0]).to(be(concentrator))
+            expect(concentrator.meters[0]).to(be(meter))
+            expect(meter.measures[0]).to(be(meter.measures[0]))
+
+        with it('doesn\'t repeat the warnings reading the values again'):
+            filename = 'spec/data/CIR4621247027_0_S05_0_20150901072044_warnings'
+            with open(filename, 'rb') as data_file:
+                report = Report(data_file)
+            concentrator = report.concentrators[0]
+            values = concentrator.values
+            warnings = repr(concentrator.warnings)
+            expect(concentrator.values).to(equal(values))
+            expect(repr(concentrator.warnings)).to(equal(warnings))
+
+        with it('doesn\'t repeat the warnings of the parameters'):
+            filenames = [
+                'spec/data/CIR4621247027_0_S12_0_20150903140000_warnings',
+                'spec/data/ZIV0000035545_0_S15_0_20161203040002_warnings',
+                'spec/data/ZIV0004311822_0_S17_0_20161215040002_warnings',
+                'spec/data/CIR4621707229_0_S24_0_20180529200000_warnings',
+                'spec/data/CIR4621531018_0_G01_0_20250531063000_warnings',
+                'spec/data/S06_with_error.xml',
+            ]
+            for filename in filenames:
+                with open(filename, 'rb') as data_file:
+                    report = Report(data_file)
+                values = report.values
+                warnings = repr([c.warnings for c in report.concentrators])
+                expect(count_warnings(report.concentrators[0].warnings) +
+                       count_warnings(report.concentrators[-1].warnings)
+                       ).not_to(equal(0))
+                expect(report.values).to(equal(values))
+                expect(repr(
+                    [c.warnings for c in report.concentrators]
+                )).to(equal(warnings))
+
+        with it('forgets everything when the message is replaced'):
+            filename = 'spec/data/CIR4621247027_0_S02_0_20150901111051'
+            with open(filename, 'rb') as data_file:
+                report = Report(data_file)
+            concentrators = report.concentrators
+            expect(report.report_type).to(equal('S02'))
+            with open('spec/data/S01.xml', 'rb') as data_file:
+                report.message = MessageS(data_file)
+            expect(report.report_type).to(equal('S01'))
+            expect(report.concentrators).not_to(equal(concentrators))
+            with open('spec/data/S01.xml', 'rb') as data_file:
+                expect(report.values).to(equal(Report(data_file).values))
+
+    with context('iter_values'):
+        with before.all:
+            self.data_filenames = [
+                'spec/data/CIR4621247027_0_S02_0_20150901111051',
+                'spec/data/CIR4621247027_0_S05_0_20150901072044_warnings',
+                'spec/data/CIR4621802303_4F39_S05_1_20190221014548',
+                'spec/data/CIR4621247027_0_S12_0_20150903140000',
+                'spec/data/MRTR000000822522_0_S52_1_20200929001048',
+            ]
+
+        with it('yields the same values of the report'):
+            for data_filename in self.data_filenames:
+                with open(data_filename, 'rb') as data_file:
+                    expected = Report(data_file).values
+                with open(data_filename, 'rb') as data_file:
+                    report = Report(data_file)
+                values = list(report.iter_values())
+                expect(values).to(equal(expected))
+
+        with it('yields the same values parsing the report incrementally'):
+            for data_filename in self.data_filenames:
+                with open(data_filename, 'rb') as data_file:
+                    expected = Report(data_file).values
+                with open(data_filename, 'rb') as data_file:
+                    report = Report(data_file, stream=True)
+                    values = list(report.iter_values())
+                expect(values).to(equal(expected))
+
+        with it('yields the values of a report with null chars'):
+            filename = 'spec/data/CIR4621247027_0_S02_0_20150901111051'
+            with open(filename) as data_file:
+                xml = data_file.read()
+            position = xml.index('Bc="00"', len(xml) // 2)
+            xml = xml[:position] + 'Bc="0\x00X"' + xml[position + 7:]
+            expected = Report(xml).values
+            values = list(Report(xml, stream=True).iter_values())
+            expect(values).to(equal(expected))
+
+        with it('reads again the null chars of sources that can\'t go back'):
+            class Stream(object):
+                def __init__(self, content):
+                    self.content = BytesIO(content)
+
+                def read(self, size=-1):
+                    return self.content.read(size)
+
+            filename = 'spec/data/CIR4621247027_0_S02_0_20150901111051'
+            with open(filename, 'rb') as data_file:
+                xml = data_file.read()
+            position = xml.index(b'Bc="00"', len(xml) // 2)
+            xml = xml[:position] + b'Bc="0\x00X"' + xml[position + 7:]
+            expected = Report(xml).values
+            fields = ['name', 'timestamp', 'ai']
+            for source in (Stream(xml), BytesIO(b'  ' + xml)):
+                source.read(2 if isinstance(source, BytesIO) else 0)
+                values = list(Report(source, stream=True).iter_values())
+                expect(values).to(equal(expected))
+            values = list(
+                Report(Stream(xml), stream=True, fields=fields).iter_values()
+            )
+            expect(values).to(equal(Report(xml).values_only(fields)))
+
+    with context('instrumentation'):
+        with it('measures every stage without changing the values'):
+            filename = 'spec/data/CIR4621247027_0_S02_0_20150901111051'
+            with open(filename, 'rb') as data_file:
+                expected = Report(data_file).values
+            measures = []
+            instrumentation = Instrumentation(
+                lambda *measure: measures.append(measure)
+            )
+            with open(filename, 'rb') as data_file:
+                report = Report(data_file, instrumentation=instrumentation)
+            expect(report.values).to(equal(expected))
+            stages = instrumentation.as_dict()['S02']
+            expect(sorted(stages)).to(equal(
+                ['decompress', 'objects', 'parse', 'timestamps', 'values']
+            ))
+            expect(stages['values']['elements']).to(equal(len(expected)))
+            expect(stages['timestamps']['elements']).to(equal(len(expected)))
+            expect(len(measures)).to(equal(
+                sum(stage['calls'] for stage in stages.values())
+            ))
+
+        with it('counts the warnings of the message and the meters'):
+            filename = 'spec/data/CIR4621247027_0_S05_0_20150901072044_warnings'
+            with open(filename) as data_file:
+                xml = data_file.read()
+            position = xml.index('Pt="6"')
+            xml = xml[:position] + 'Pt="6\x00X"' + xml[position + 6:]
+            instrumentation = Instrumentation()
+            Report(xml, instrumentation=instrumentation).values
+            stages = instrumentation.as_dict()['S05']
+            expect(stages['parse']['warnings']).to(equal(1))
+            expect(stages['values']['warnings']).to(equal(2))
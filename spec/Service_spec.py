@@ -0,0 +1,281 @@
+import os
+import re
+
+import responses
+from expects import expect, equal, be, be_a, raise_error
+from lxml import etree
+from zeep.exceptions import Fault, TransportError
+from xml.sax.saxutils import escape
+from primestg.report import Report
+import primestg
+from primestg.service import (
+    BINDING, Service, get_client, clear_clients, create_session, get_session,
+    split_meters, merge_reports
+)
+
+WSDL = os.path.abspath('spec/data/WS_DC_minimal.wsdl')
+
+
+with description('Clients of the web services'):
+    with before.each:
+        clear_clients()
+
+    with after.each:
+        clear_clients()
+
+    with it('loads the WSDL once by timeouts'):
+        client = get_client(WSDL)
+        expect(get_client(WSDL)).to(be(client))
+        other = get_client(WSDL, timeout=5, operation_timeout=10)
+        expect(other).not_to(be(client))
+        expect(other.transport.operation_timeout).to(equal(10))
+
+    with it('creates a service by concentrator from the same client'):
+        client = get_client(WSDL)
+        first = client.create_service(BINDING, 'http://cnc1:8080/')
+        second = get_client(WSDL).create_service(BINDING, 'http://cnc2:8080/')
+        expect(first._binding_options['address']).to(
+            equal('http://cnc1:8080/')
+        )
+        expect(second._binding_options['address']).to(
+            equal('http://cnc2:8080/')
+        )
+        expect(second._client).to(be(client))
+
+    with it('finds the data files once'):
+        primestg._DATA.pop(WSDL, None)
+        expect(primestg.get_data(WSDL)).to(equal(WSDL))
+        expect(primestg._DATA[WSDL]).to(equal(WSDL))
+        expect(primestg.get_data('missing.wsdl')).to(equal(False))
+        expect('missing.wsdl' in primestg._DATA).to(equal(False))
+
+    with it('loads the WSDL again when forgotten'):
+        client = get_client(WSDL)
+        clear_clients()
+        expect(get_client(WSDL)).not_to(be(client))
+
+    with it('shares a pooled session between the clients'):
+        client = get_client(WSDL)
+        other = get_client(WSDL, timeout=5)
+        expect(client.transport.session).to(be(get_session()))
+        expect(other.transport.session).to(be(get_session()))
+        adapter = get_session().get_adapter('http://cnc1:8080/')
+        expect(adapter._pool_connections).to(equal(100))
+        expect(adapter.max_retries.total).to(equal(2))
+        expect(adapter.max_retries.read).to(equal(False))
+
+    with it('uses the session given'):
+        session = create_session(pool_connections=5, pool_maxsize=2)
+        client = get_client(WSDL, session=session)
+        expect(client).not_to(be(get_client(WSDL)))
+        expect(client.transport.session).to(be(session))
+        expect(client.wsdl).to(be(get_client(WSDL).wsdl))
+        expect(get_client(WSDL).transport.session).to(be(get_session()))
+        expect(get_client(WSDL, session=get_session())).to(
+            be(get_client(WSDL))
+        )
+        adapter = session.get_adapter('https://cnc1/')
+        expect(adapter._pool_maxsize).to(equal(2))
+
+    with it('doesn\'t keep the clients of the sessions given'):
+        for index in range(3):
+            get_client(WSDL, session=create_session())
+        expect(len(primestg.service._CLIENTS)).to(equal(1))
+
+
+with description('Requests in batches of meters'):
+    with before.each:
+        clear_clients()
+        self.requests = []
+
+        def answer(request):
+            body = request.body
+            if not isinstance(body, str):
+                body = body.decode('utf-8')
+            meters = re.search('IdMeters>([^<]*)<', body).group(1)
+            self.requests.append(meters)
+            report = '<Report IdRpt="S02" IdPet="1" Version="3.1.c">'
+            report += '<Cnc Id="CIR1">'
+            for meter in meters.split(','):
+                report += '<Cnt Id="{}"/>'.format(meter)
+            report += '</Cnc></Report>'
+            return 200, {'Content-Type': 'text/xml'}, (
+                '<soap:Envelope '
+                'xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+                '<soap:Body>'
+                '<RequestResponse xmlns="http://www.asais.fr/ns/Saturne/DC/ws">'
+                '<RequestResult>{}</RequestResult>'
+                '</RequestResponse>'
+                '</soap:Body>'
+                '</soap:Envelope>'
+            ).format(escape(report))
+        self.answer = answer
+
+    with it('splits the meters in batches'):
+        expect(split_meters('ZIV1,ZIV2,ZIV3', 2)).to(
+            equal(['ZIV1,ZIV2', 'ZIV3'])
+        )
+        expect(split_meters(['ZIV1', 'ZIV2'], None)).to(equal(['ZIV1,ZIV2']))
+        expect(split_meters('ZIV1,ZIV2', None)).to(equal(['ZIV1,ZIV2']))
+        expect(split_meters('', 2)).to(equal(['']))
+
+    with it('merges the reports of the batches'):
+        merged = merge_reports([
+            '<Report IdRpt="S02"><Cnc Id="CIR1"><Cnt Id="ZIV1"/></Cnc>'
+            '</Report>',
+            '<Report IdRpt="S02"><Cnc Id="CIR1"><Cnt Id="ZIV2"/></Cnc>'
+            '<Cnc Id="CIR2"><Cnt Id="ZIV3"/></Cnc></Report>',
+        ])
+        expect(merged).to(equal(
+            '<Report IdRpt="S02"><Cnc Id="CIR1"><Cnt Id="ZIV1"/>'
+            '<Cnt Id="ZIV2"/></Cnc><Cnc Id="CIR2"><Cnt Id="ZIV3"/></Cnc>'
+            '</Report>'
+        ))
+        expect(merge_reports([True, True])).to(equal(True))
+        expect(merge_reports([True, False])).to(equal(False))
+
+    with it('merges the reports with null chars'):
+        with open(
+                'spec/data/CIR4621247027_0_S02_0_20150901111051', 'rb'
+        ) as data_file:
+            first = data_file.read()
+        position = first.index(b'Bc="00"', len(first) // 2)
+        first = first[:position] + b'Bc="0\x00X"' + first[position + 7:]
+        with open(
+                'spec/data/CIR4621247027_0_S02_0_20150901111051_warnings',
+                'rb'
+        ) as data_file:
+            second = data_file.read()
+        expected = len(Report(first).values) + len(Report(second).values)
+        for reports in ([first, second],
+                        [first.decode('iso-8859-15'),
+                         second.decode('iso-8859-15')]):
+            merged = merge_reports(reports)
+            expect(merged).to(be_a(type(reports[0])))
+            expect(len(Report(merged).values)).to(equal(expected))
+        expect(lambda: merge_reports([first, '<Report'])).to(
+            raise_error(ValueError)
+        )
+        expect(lambda: merge_reports([first, None])).to(
+            raise_error(ValueError)
+        )
+
+    with it('keeps the encoding of the reports merged'):
+        reports = [
+            u'<?xml version="1.0" encoding="ISO-8859-15"?>'
+            u'<Report IdRpt="S02"><Cnc Id="CIR1"><Cnt Id="{}"/></Cnc>'
+            u'</Report>'.format(name)
+            for name in (u'ZIV\u00e91', u'ZIV\u00f12')
+        ]
+        for as_bytes in (False, True):
+            if as_bytes:
+                merged = merge_reports([
+                    report.encode('iso-8859-15') for report in reports
+                ])
+            else:
+                merged = merge_reports(reports).encode('iso-8859-15')
+            expect(b"encoding='ISO-8859-15'" in merged).to(equal(True))
+            root = etree.fromstring(merged)
+            expect([cnt.get('Id') for cnt in root.iter('Cnt')]).to(
+                equal([u'ZIV\u00e91', u'ZIV\u00f12'])
+            )
+
+    with it('asks for the meters in batches'):
+        meters = ['ZIV{}'.format(index) for index in range(5)]
+        with responses.RequestsMock() as rsps:
+            rsps.add_callback(
+                responses.POST, 'http://cnc:8080/', callback=self.answer
+            )
+            service = Service(
+                1, 'http://cnc:8080/', wsdl=WSDL, batch_size=2
+            )
+            report = service.send('S02', ','.join(meters))
+        expect(sorted(self.requests)).to(equal([
+            'ZIV0,ZIV1', 'ZIV2,ZIV3', 'ZIV4'
+        ]))
+        root = etree.fromstring(report.encode('utf-8'))
+        expect([cnt.get('Id') for cnt in root.iter('Cnt')]).to(equal(meters))
+
+
+with description('Reports streamed from the answers'):
+    with before.each:
+        clear_clients()
+
+    with it('gives the same values as the whole answer'):
+        filename = 'spec/data/CIR4621247027_0_S02_0_20150901111051'
+        with open(filename, 'rb') as data_file:
+            content = data_file.read()
+        answer = (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            '<soap:Envelope '
+            'xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+            '<soap:Body>'
+            '<RequestResponse xmlns="http://www.asais.fr/ns/Saturne/DC/ws">'
+            '<RequestResult>{}</RequestResult>'
+            '</RequestResponse>'
+            '</soap:Body>'
+            '</soap:Envelope>'
+        ).format(escape(content.decode('iso-8859-15'))).encode('utf-8')
+        with responses.RequestsMock() as rsps:
+            rsps.add(responses.POST, 'http://cnc:8080/', body=answer,
+                     content_type='text/xml')
+            service = Service(1, 'http://cnc:8080/', wsdl=WSDL)
+            report = service.fetch_report('S02', '')
+            values = list(report.iter_values())
+        expect(values).to(equal(Report(content).values))
+        expect(len(values) > 0).to(equal(True))
+
+    with it('reads again the answers with null chars'):
+        filename = 'spec/data/CIR4621247027_0_S02_0_20150901111051'
+        with open(filename, 'rb') as data_file:
+            content = data_file.read()
+        position = content.index(b'Bc="00"', len(content) // 2)
+        content = (
+            content[:position] + b'Bc="0\x00X"' + content[position + 7:]
+        )
+        answer = (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            '<soap:Envelope '
+            'xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+            '<soap:Body>'
+            '<RequestResponse xmlns="http://www.asais.fr/ns/Saturne/DC/ws">'
+            '<RequestResult>{}</RequestResult>'
+            '</RequestResponse>'
+            '</soap:Body>'
+            '</soap:Envelope>'
+        ).format(escape(content.decode('iso-8859-15'))).encode('utf-8')
+        with responses.RequestsMock() as rsps:
+            rsps.add(responses.POST, 'http://cnc:8080/', body=answer,
+                     content_type='text/xml')
+            service = Service(1, 'http://cnc:8080/', wsdl=WSDL)
+            report = service.fetch_report('S02', '')
+            values = list(report.iter_values())
+        expect(values).to(equal(Report(content).values))
+        expect(len(values) > 0).to(equal(True))
+
+    with it('raises the errors of the answers without a report'):
+        fault = (
+            '<soap:Envelope '
+            'xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+            '<soap:Body><soap:Fault>'
+            '<faultcode>soap:Server</faultcode>'
+            '<faultstring>Busy</faultstring>'
+            '</soap:Fault></soap:Body>'
+            '</soap:Envelope>'
+        )
+        with responses.RequestsMock() as rsps:
+            rsps.add(responses.POST, 'http://cnc:8080/', body=fault,
+                     status=500, content_type='text/xml')
+            rsps.add(responses.POST, 'http://cnc:8080/', body='Not found',
+                     status=404)
+            service = Service(1, 'http://cnc:8080/', wsdl=WSDL)
+            expect(lambda: service.fetch_report('S02', '')).to(
+                raise_error(Fault, 'Busy')
+            )
+            expect(lambda: service.fetch_report('S02', '')).to(
+                raise_error(TransportError)
+            )
+            request = rsps.calls[0].request
+        expect(request.headers['SOAPAction']).to(equal(
+            '"http://www.asais.fr/ns/Saturne/DC/ws/Request"'
+        ))
@@ -2,7 +2,7 @@
 from expects import expect, raise_error, be_a, equal, match
 
 from primestg.contract_templates import CONTRACT_TEMPLATES
-from primestg.utils import DLMSTemplates, ContractTemplates, datetohexprime, octet2name, name2octet, octet2date
+from primestg.utils import DLMSTemplates, ContractTemplates, datetohexprime, octet2name, name2octet, octet2date, LRUCache
 from primestg.dlms_templates import DLMS_TEMPLATES
 from datetime import date, datetime
 import six
@@ -140,6 +140,31 @@ with description('Utils'):
                     result_date = octet2date(octet)
                     expect(dt).to(equal(result_date))
 
+    with context("LRUCache"):
+        with it("counts hits and misses"):
+            cache = LRUCache(maxsize=2)
+            expect(cache.get('07E504010400000')).to(equal(None))
+            cache.set('07E504010400000', '2021-04-01 04:00:00')
+            expect(cache.get('07E504010400000')).to(equal('2021-04-01 04:00:00'))
+            expect(cache.info()).to(equal(
+                {'hits': 1, 'misses': 1, 'size': 1, 'maxsize': 2}
+            ))
+
+        with it("discards the least recently used item"):
+            cache = LRUCache(maxsize=2)
+            cache.set('a', 1)
+            cache.set('b', 2)
+            cache.get('a')
+            cache.set('c', 3)
+            expect(len(cache)).to(equal(2))
+            expect(cache.get('b')).to(equal(None))
+            expect(cache.get('a')).to(equal(1))
+            expect(cache.get('c')).to(equal(3))
+            cache.clear()
+            expect(cache.info()).to(equal(
+                {'hits': 0, 'misses': 0, 'size': 0, 'maxsize': 2}
+            ))
+
     with context("ContractTemplates"):
         with context('get_available_templates'):
             with it('returns all templates list of tuples'):